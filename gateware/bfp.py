@@ -0,0 +1,227 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+from gateware.frame_buffer import FrameBuffer
+
+# Constants ----------------------------------------------------------------------------------------
+
+BFP_HEADER_MAGIC = 0xbf5a
+BFP_HEADER_BITS  = 64 # Exponent, magic, mantissa width, order, magic (even 32-bit words per frame).
+
+# Utils --------------------------------------------------------------------------------------------
+
+def header_words(word_width=32):
+    """Words of a frame header in a word_width stream."""
+    return BFP_HEADER_BITS // word_width
+
+def frame_words(order_log2=10, mantissa_width=16, word_width=32):
+    """Words of a frame (header + mantissas) in a word_width stream."""
+    return header_words(word_width) + 2**order_log2 // (word_width // (2 * mantissa_width))
+
+def header(exponent, order_log2=10, mantissa_width=16, word_width=32):
+    """Frame header words (as emitted by BlockFloatingPoint, LSBs first):
+
+    - [15: 0]: Exponent.
+    - [31:16]: BFP_HEADER_MAGIC.
+    - [39:32]: mantissa_width.
+    - [47:40]: order_log2.
+    - [63:48]: BFP_HEADER_MAGIC.
+    """
+    value = exponent | BFP_HEADER_MAGIC << 16 | mantissa_width << 32 | order_log2 << 40 | BFP_HEADER_MAGIC << 48
+    mask  = 2**word_width - 1
+    return [(value >> (i * word_width)) & mask for i in range(header_words(word_width))]
+
+def exponent(re, im, mantissa_width=16):
+    """Block exponent of a frame: smallest shift that fits all its re/im samples (signed) in
+    mantissa_width bits."""
+    values = np.concatenate([np.asarray(re, dtype=np.int64), np.asarray(im, dtype=np.int64)])
+    mag    = int(np.bitwise_or.reduce(np.where(values < 0, ~values, values)))
+    return max(mag.bit_length() - (mantissa_width - 1), 0)
+
+def decode(words, order_log2=10, mantissa_width=16, word_width=32):
+    """Split a stream of BlockFloatingPoint words in (exponent, complex samples) frames.
+
+    Words before the first header (partial capture) are skipped, frames whose header is corrupted
+    end the parsing (the stream is out of sync). Samples are scaled back by 2**exponent.
+    """
+    ratio  = word_width // (2 * mantissa_width)
+    nhdr   = header_words(word_width)
+    length = frame_words(order_log2, mantissa_width, word_width)
+    words  = [int(w) for w in words]
+    def exponent_at(i):
+        value = sum(w << (k * word_width) for k, w in enumerate(words[i:i + nhdr]))
+        e     = value & 0xffff
+        return e if header(e, order_log2, mantissa_width, word_width) == words[i:i + nhdr] else None
+    frames = []
+    i      = 0
+    while i + nhdr <= len(words) and exponent_at(i) is None:
+        i += 1
+    while i + length <= len(words):
+        e = exponent_at(i)
+        if e is None:
+            break
+        samples = []
+        for w in words[i + nhdr:i + length]:
+            for k in range(ratio):
+                v  = w >> (2 * mantissa_width * k)
+                re = (v + 2**(mantissa_width - 1)) % 2**mantissa_width - 2**(mantissa_width - 1)
+                v  = v >> mantissa_width
+                im = (v + 2**(mantissa_width - 1)) % 2**mantissa_width - 2**(mantissa_width - 1)
+                samples.append(complex(re << e, im << e))
+        frames.append((e, np.array(samples)))
+        i += length
+    return frames
+
+# Block Floating Point Model -----------------------------------------------------------------------
+
+def model(re_in, im_in, order_log2=10, mantissa_width=16, word_width=32):
+    """Bit-exact model of BlockFloatingPoint, returns the output words of the complete frames.
+
+    Each frame of 2**order_log2 re/im samples (signed) gives its header (see header() and
+    exponent()) followed by the samples shifted right (floor) by the exponent, word_width / (2 x
+    mantissa_width) re/im mantissa pairs per word (LSBs first).
+    """
+    n     = 2**order_log2
+    ratio = word_width // (2 * mantissa_width)
+    mask  = 2**mantissa_width - 1
+    re_in = np.asarray(re_in, dtype=np.int64)
+    im_in = np.asarray(im_in, dtype=np.int64)
+    words = []
+    for s in range(0, len(re_in) - n + 1, n):
+        re, im = re_in[s:s + n], im_in[s:s + n]
+        e      = exponent(re, im, mantissa_width)
+        words += header(e, order_log2, mantissa_width, word_width)
+        for i in range(0, n, ratio):
+            word = 0
+            for k in range(ratio):
+                pair  = (int(re[i + k] >> e) & mask) | (int(im[i + k] >> e) & mask) << mantissa_width
+                word |= pair << (2 * mantissa_width * k)
+            words.append(word)
+    return words
+
+# Block Floating Point -----------------------------------------------------------------------------
+
+class BlockFloatingPoint(FrameBuffer):
+    """Block floating point of the MaiaSDRFFT frames (full out_width samples) into the DMA words.
+
+    Each frame is written in a FrameBuffer while the magnitude of its samples is accumulated, its
+    exponent (see exponent()) is then known at the end of the frame and the frame is emitted as its
+    64-bit header (see header()) followed by the mantissas (samples >> exponent, floor, signed
+    mantissa_width bits), word_width / (2 x mantissa_width) re/im pairs per word (LSBs first, `last`
+    on the frame's last word), see model(). Frames are an even number of 32-bit words (packed in
+    64-bit DMA words without padding). With 8-bit mantissas in 32-bit words, 2**order_log2 / 2 + 2
+    words per frame are emitted, so full rate frames are sustained, with 16-bit ones the frames
+    must leave two idle cycles. `exponent` is the one of the last frame handed over. Samples
+    narrower than the mantissas are sign-extended (exponent 0).
+    """
+    def __init__(self, data_width=24, order_log2=10, mantissa_width=16, word_width=32, with_csr=True):
+        if word_width not in [32, 64] or word_width % (2 * mantissa_width):
+            raise ValueError(f"BlockFloatingPoint: {mantissa_width}-bit re/im mantissas don't pack in "
+                f"{word_width}-bit words (32 or 64-bit words only).")
+        ratio        = word_width // (2 * mantissa_width)
+        ratio_log2   = log2_int(ratio)
+        nwords       = 2**order_log2 // ratio
+        nhdr         = header_words(word_width)
+        max_exponent = max(data_width - mantissa_width, 0)
+        FrameBuffer.__init__(self,
+            sink_layout    = [("re", data_width), ("im", data_width)],
+            source_layout  = [("data", word_width)],
+            frame_len      = 2**order_log2,
+            width          = ratio * 2 * data_width,
+            depth          = nwords,
+            index_width    = bits_for(nhdr + nwords - 1),
+            we_granularity = 2 * data_width if ratio > 1 else 0,
+        )
+        sink   = self.sink
+        source = self.source
+
+        # Signals ----------------------------------------------------------------------------------
+        self.exponent = Signal(bits_for(max_exponent))
+
+        # # #
+
+        # Frame: `ratio` samples per word (write lanes).
+        windex = self.windex
+        self.comb += [
+            self.wadr.eq(windex[ratio_log2:]),
+            self.wport.dat_w.eq(Replicate(Cat(sink.re, sink.im), ratio)),
+        ]
+        if ratio > 1:
+            for k in range(ratio):
+                self.comb += self.wport.we[k].eq(self.write & (windex[:ratio_log2] == k))
+
+        # Magnitude: OR of the samples (one's complement of the negative ones), its MSB gives the
+        # exponent of the frame (same as the max), handed over with the frame.
+        magnitude      = Signal(data_width - 1)
+        magnitude_next = Signal(data_width - 1)
+        exponent_next  = Signal(bits_for(max_exponent))
+        self.comb += magnitude_next.eq(magnitude |
+            Mux(sink.re[-1], ~sink.re, sink.re)[:-1] |
+            Mux(sink.im[-1], ~sink.im, sink.im)[:-1])
+        for i in range(mantissa_width - 1, data_width - 1):
+            self.comb += If(magnitude_next[i], exponent_next.eq(i - mantissa_width + 2))
+        self.sync += [
+            If(self.reset | (sink.valid & sink.last),
+                magnitude.eq(0),
+            ).Elif(sink.valid,
+                magnitude.eq(magnitude_next),
+            ),
+            If(self.handover,
+                self.exponent.eq(exponent_next),
+            )
+        ]
+
+        # Read: header (index 0 to nhdr - 1) then the words of the frame.
+        s1_exp = Signal(bits_for(max_exponent))
+        hdr    = Cat(s1_exp, C(0, 16 - len(s1_exp)), C(BFP_HEADER_MAGIC, 16), C(mantissa_width, 8),
+            C(order_log2, 8), C(BFP_HEADER_MAGIC, 16))
+        self.comb += [
+            self.last_index.eq(nhdr + nwords - 1),
+            self.radr.eq(self.index - nhdr),
+        ]
+
+        # Mantissas (arithmetic shift of the signed samples).
+        mantissas = []
+        for k in range(ratio):
+            for j in range(2):
+                sample = Signal((data_width, True))
+                shift  = Signal((max(data_width, mantissa_width), True))
+                offset = (2 * k + j) * data_width
+                self.comb += [
+                    sample.eq(self.rport.dat_r[offset:offset + data_width]),
+                    shift.eq(sample >> s1_exp),
+                ]
+                mantissas.append(shift[:mantissa_width])
+        self.sync += If(self.ce,
+            s1_exp.eq(self.exponent),
+            If(self.s1_index < nhdr,
+                source.data.eq(Array(hdr[i * word_width:(i + 1) * word_width] for i in range(nhdr))[self.s1_index]),
+            ).Else(
+                source.data.eq(Cat(*mantissas)),
+            )
+        )
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._exponent = CSRStatus(8,  name="exponent", description="Exponent of the last frame.")
+        self._dropped  = CSRStatus(32, name="dropped",  description="Frames dropped (output stalled).")
+
+        self.comb += [
+            self._exponent.status.eq(self.exponent),
+            self._dropped.status.eq(self.dropped),
+        ]
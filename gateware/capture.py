@@ -0,0 +1,379 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+from gateware.maia_sdr_fft import digit_reversed
+
+# Snapshot Model -----------------------------------------------------------------------------------
+
+def model(samples, trigger, pre, post, ratio=4):
+    """Snapshot drained by SnapshotCapture for a trigger on samples[trigger], returns the snapshot
+    samples and the trigger offset in it.
+
+    The window (`pre` samples before the trigger, `post` samples from it) is extended to whole DRAM
+    words of `ratio` samples on both sides.
+    """
+    assert pre <= trigger and post >= 1
+    start = (trigger - pre) // ratio * ratio
+    end   = ((trigger + post - 1) // ratio + 1) * ratio
+    return list(samples[start:end]), trigger - start
+
+# Bin Trigger --------------------------------------------------------------------------------------
+
+class BinTrigger(LiteXModule):
+    """FFT bin power trigger.
+
+    Pulses `trigger` when |X|^2 of a bin in [bin_min, bin_max] (natural order: the digit-reversed
+    output index of MaiaSDRFFT is reordered by wiring) reaches `threshold`. Frames are aligned on
+    sink.last, sink is a tap (always ready).
+    """
+    def __init__(self, data_width=16, order_log2=10, radix=2, with_csr=True):
+        # Streams ----------------------------------------------------------------------------------
+        self.sink = sink = stream.Endpoint([("re", data_width), ("im", data_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset     = Signal()
+        self.bin_min   = Signal(order_log2)
+        self.bin_max   = Signal(order_log2)
+        self.threshold = Signal(2 * data_width)
+        self.trigger   = Signal()
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        # Output index -> natural bin (digits reversal).
+        index = Signal(order_log2)
+        self.sync += [
+            If(self.reset,
+                index.eq(0),
+            ).Elif(sink.valid,
+                index.eq(index + 1),
+                If(sink.last,
+                    index.eq(0),
+                )
+            )
+        ]
+
+        # Power/range check.
+        re    = Signal((data_width, True))
+        im    = Signal((data_width, True))
+        power = Signal(2 * data_width)
+        bin   = Signal(order_log2)
+        self.comb += [
+            re.eq(sink.re),
+            im.eq(sink.im),
+            power.eq(re*re + im*im),
+            bin.eq(digit_reversed(index, radix)),
+        ]
+        self.sync += self.trigger.eq(sink.valid & ~self.reset &
+            (bin >= self.bin_min) & (bin <= self.bin_max) & (power >= self.threshold))
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._bin_min   = CSRStorage(len(self.bin_min),   name="bin_min",   description="First bin of the trigger range (natural order).")
+        self._bin_max   = CSRStorage(len(self.bin_max),   name="bin_max",   description="Last bin of the trigger range (natural order).")
+        self._threshold = CSRStorage(len(self.threshold), name="threshold", description="|X|^2 threshold.")
+
+        self.comb += [
+            self.bin_min.eq(self._bin_min.storage),
+            self.bin_max.eq(self._bin_max.storage),
+            self.threshold.eq(self._threshold.storage),
+        ]
+
+# Snapshot Capture ---------------------------------------------------------------------------------
+
+class SnapshotCapture(LiteXModule):
+    """Triggered snapshot capture with a DRAM circular pre-trigger buffer.
+
+    Once armed, the sink samples (a tap, always ready) are packed in `port_data_width` words and
+    written circularly in the `depth` bytes at `base` of the DRAM (`dram_write`: LiteDRAMDMAWriter
+    sink). A trigger (|x|^2 of a sample reaching `power_threshold`, `time` reaching `time_trigger`,
+    an `ext_trigger` pulse such as BinTrigger, or `force`) freezes the buffer once `post` samples
+    (from the trigger one) have been written, then the window of `pre` + `post` samples (extended to
+    whole DRAM words, see model()) is read back (`dram_read_cmd`/`dram_read_data`: LiteDRAMDMAReader
+    sink/source) and drained on source, `last` on the final sample. `offset` gives the trigger
+    sample in the snapshot, `trigger_time` its `time`.
+
+    Triggers are ignored until `pre` samples have been written, non-sample triggers (time, external,
+    force) apply to the next sample. `pre` + `post` must stay below the buffer size minus one word.
+    `overflow` reports words lost while the DRAM was busy (`fifo_depth` words are buffered).
+    """
+    def __init__(self, data_width=16, port_data_width=128, base=0x0000_0000, depth=0x0400_0000,
+        fifo_depth = 64,
+        with_csr   = True,
+        ):
+        sample_width = 2 * data_width
+        ratio        = port_data_width // sample_width
+        ratio_log2   = log2_int(ratio)
+        depth_words  = depth // (port_data_width // 8)
+        depth_log2   = log2_int(depth_words)
+        base_word    = base // (port_data_width // 8)
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink           = sink           = stream.Endpoint([("re", data_width), ("im", data_width)])
+        self.source         = source         = stream.Endpoint([("data", sample_width)])
+        self.dram_write     = dram_write     = stream.Endpoint([("address", 32), ("data", port_data_width)])
+        self.dram_read_cmd  = dram_read_cmd  = stream.Endpoint([("address", 32)])
+        self.dram_read_data = dram_read_data = stream.Endpoint([("data", port_data_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset           = Signal()
+        self.time            = Signal(64)
+        self.write_busy      = Signal() # Writes still pending after dram_write (LiteDRAMDMAWriter FIFO).
+
+        # Control.
+        self.arm             = Signal()
+        self.force           = Signal()
+        self.pre             = Signal(32)
+        self.post            = Signal(32)
+        self.power_enable    = Signal()
+        self.power_threshold = Signal(sample_width)
+        self.time_enable     = Signal()
+        self.time_trigger    = Signal(64)
+        self.ext_enable      = Signal()
+        self.ext_trigger     = Signal()
+
+        # Status.
+        self.armed           = Signal()
+        self.triggered       = Signal()
+        self.done            = Signal()
+        self.overflow        = Signal()
+        self.offset          = Signal(32)
+        self.length          = Signal(32)
+        self.trigger_time    = Signal(64)
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        # Tap (registered with |x|^2).
+        re       = Signal((data_width, True))
+        im       = Signal((data_width, True))
+        s1_valid = Signal()
+        s1_data  = Signal(sample_width)
+        s1_power = Signal(sample_width)
+        self.comb += [
+            re.eq(sink.re),
+            im.eq(sink.im),
+        ]
+        self.sync += [
+            s1_valid.eq(sink.valid & ~self.reset),
+            s1_data.eq(Cat(sink.re, sink.im)),
+            s1_power.eq(re*re + im*im),
+        ]
+
+        # Packing (first sample in the LSBs, as stream.Converter) and DRAM writes.
+        self.fifo = fifo = ResetInserter()(stream.SyncFIFO(dram_write.description, fifo_depth))
+        self.comb += [
+            fifo.reset.eq(self.reset),
+            fifo.source.connect(dram_write),
+        ]
+        restart = Signal()
+        tap     = Signal()
+        accept  = Signal()
+        sub     = Signal(max(ratio_log2, 1))
+        word    = Signal(port_data_width)
+        in_word = Signal(depth_log2)
+        packed  = Cat(word[sample_width:], s1_data) if ratio > 1 else s1_data
+        self.comb += [
+            accept.eq(s1_valid & tap),
+            fifo.sink.valid.eq(accept & (sub == (ratio - 1))),
+            fifo.sink.address.eq(base_word + in_word),
+            fifo.sink.data.eq(packed),
+        ]
+        self.sync += [
+            If(self.reset | restart,
+                sub.eq(0),
+                in_word.eq(0),
+            ).Elif(accept,
+                word.eq(packed),
+                sub.eq(sub + 1),
+                If(sub == (ratio - 1),
+                    sub.eq(0),
+                    in_word.eq(in_word + 1),
+                )
+            ),
+            If(self.reset | restart,
+                self.overflow.eq(0),
+            ).Elif(fifo.sink.valid & ~fifo.sink.ready,
+                self.overflow.eq(1),
+            )
+        ]
+
+        # Triggers.
+        fill    = Signal(32)
+        filled  = Signal()
+        pending = Signal()
+        trigger = Signal()
+        self.comb += [
+            filled.eq(fill >= self.pre),
+            trigger.eq(accept & filled & (pending |
+                (self.power_enable & (s1_power >= self.power_threshold)) |
+                (self.time_enable  & (self.time >= self.time_trigger)))),
+        ]
+        self.sync += [
+            If(self.reset | restart,
+                fill.eq(0),
+            ).Elif(accept & ~filled,
+                fill.eq(fill + 1),
+            )
+        ]
+
+        # Window (in samples modulo the buffer, DRAM words from start_word to end_word excluded).
+        in_sample  = Signal(ratio_log2 + depth_log2)
+        start      = Signal(ratio_log2 + depth_log2)
+        last       = Signal(ratio_log2 + depth_log2)
+        start_word = Signal(depth_log2)
+        end_word   = Signal(depth_log2)
+        nwords     = Signal(depth_log2)
+        self.comb += [
+            in_sample.eq(Cat(sub[:ratio_log2], in_word) if ratio > 1 else in_word),
+            start.eq(in_sample - self.pre),
+            last.eq(in_sample + self.post - 1),
+            nwords.eq(end_word - start_word),
+            self.length.eq(nwords << ratio_log2),
+        ]
+
+        # Drain (read commands, then read data unpacked to source).
+        self.converter = converter = ResetInserter()(stream.Converter(port_data_width, sample_width))
+        rd_word  = Signal(depth_log2)
+        cmd_left = Signal(depth_log2 + 1)
+        dat_left = Signal(depth_log2 + 1)
+        self.comb += [
+            converter.reset.eq(self.reset),
+            dram_read_cmd.address.eq(base_word + rd_word),
+            converter.sink.data.eq(dram_read_data.data),
+            converter.sink.last.eq(dat_left == 1),
+            converter.source.connect(source),
+        ]
+
+        # FSM.
+        self.fsm = fsm = ResetInserter()(FSM(reset_state="IDLE"))
+        self.comb += fsm.reset.eq(self.reset)
+        fsm.act("IDLE",
+            dram_read_data.ready.eq(1), # Discard reads aborted by a reset.
+            If(self.arm,
+                restart.eq(1),
+                NextValue(pending, 0),
+                NextState("ARMED"),
+            )
+        )
+        fsm.act("ARMED",
+            self.armed.eq(1),
+            dram_read_data.ready.eq(1),
+            tap.eq(1),
+            If(self.force | (self.ext_enable & self.ext_trigger),
+                NextValue(pending, 1),
+            ),
+            If(trigger,
+                NextValue(start_word,        start[ratio_log2:]),
+                NextValue(end_word,          last[ratio_log2:] + 1),
+                NextValue(self.offset,       self.pre + (start[:ratio_log2] if ratio > 1 else 0)),
+                NextValue(self.trigger_time, self.time),
+                NextState("TRIGGERED"),
+            )
+        )
+        fsm.act("TRIGGERED",
+            self.armed.eq(1),
+            self.triggered.eq(1),
+            dram_read_data.ready.eq(1),
+            tap.eq(in_word != end_word),
+            If(in_word == end_word,
+                NextState("FLUSH"),
+            )
+        )
+        fsm.act("FLUSH",
+            self.triggered.eq(1),
+            dram_read_data.ready.eq(1),
+            If(~fifo.source.valid & ~self.write_busy,
+                NextValue(rd_word,  start_word),
+                NextValue(cmd_left, nwords),
+                NextValue(dat_left, nwords),
+                NextState("DRAIN"),
+            )
+        )
+        fsm.act("DRAIN",
+            self.triggered.eq(1),
+            dram_read_cmd.valid.eq(cmd_left != 0),
+            If(dram_read_cmd.valid & dram_read_cmd.ready,
+                NextValue(rd_word,  rd_word  + 1),
+                NextValue(cmd_left, cmd_left - 1),
+            ),
+            converter.sink.valid.eq(dram_read_data.valid & (dat_left != 0)),
+            dram_read_data.ready.eq(converter.sink.ready | (dat_left == 0)),
+            If(dram_read_data.valid & dram_read_data.ready,
+                NextValue(dat_left, dat_left - 1),
+            ),
+            If(source.valid & source.ready & source.last,
+                NextState("DONE"),
+            )
+        )
+        fsm.act("DONE",
+            self.triggered.eq(1),
+            self.done.eq(1),
+            dram_read_data.ready.eq(1),
+            If(self.arm,
+                restart.eq(1),
+                NextValue(pending, 0),
+                NextState("ARMED"),
+            )
+        )
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._control = CSRStorage(fields=[
+            CSRField("arm",   size=1, offset=0, pulse=True, description="Arm the capture (restart from an empty buffer, in IDLE/DONE)."),
+            CSRField("force", size=1, offset=1, pulse=True, description="Trigger on the next sample."),
+        ], name="control")
+        self._trigger = CSRStorage(fields=[
+            CSRField("power", size=1, offset=0, description="Trigger on |x|^2 >= power_threshold."),
+            CSRField("ext",   size=1, offset=1, description="Trigger on the external trigger (FFT bin)."),
+            CSRField("time",  size=1, offset=2, description="Trigger on time >= time_trigger."),
+        ], name="trigger")
+        self._pre             = CSRStorage(32, name="pre",             description="Samples captured before the trigger.")
+        self._post            = CSRStorage(32, name="post",            description="Samples captured from the trigger.", reset=1)
+        self._power_threshold = CSRStorage(len(self.power_threshold), name="power_threshold", description="|x|^2 trigger threshold.")
+        self._time_trigger    = CSRStorage(64, name="time_trigger",    description="Time trigger.")
+        self._status = CSRStatus(fields=[
+            CSRField("armed",     size=1, offset=0, description="Writing the pre-trigger buffer."),
+            CSRField("triggered", size=1, offset=1, description="Triggered (writing the post-trigger samples or draining)."),
+            CSRField("done",      size=1, offset=2, description="Snapshot drained."),
+            CSRField("overflow",  size=1, offset=3, description="DRAM words lost (DRAM too slow)."),
+        ], name="status")
+        self._offset          = CSRStatus(32, name="offset",       description="Trigger sample position in the snapshot.")
+        self._length          = CSRStatus(32, name="length",       description="Snapshot samples.")
+        self._trigger_time    = CSRStatus(64, name="trigger_time", description="Time of the trigger sample.")
+
+        self.comb += [
+            self.arm.eq(self._control.fields.arm),
+            self.force.eq(self._control.fields.force),
+            self.power_enable.eq(self._trigger.fields.power),
+            self.ext_enable.eq(self._trigger.fields.ext),
+            self.time_enable.eq(self._trigger.fields.time),
+            self.pre.eq(self._pre.storage),
+            self.post.eq(self._post.storage),
+            self.power_threshold.eq(self._power_threshold.storage),
+            self.time_trigger.eq(self._time_trigger.storage),
+            self._status.fields.armed.eq(self.armed),
+            self._status.fields.triggered.eq(self.triggered),
+            self._status.fields.done.eq(self.done),
+            self._status.fields.overflow.eq(self.overflow),
+            self._offset.status.eq(self.offset),
+            self._length.status.eq(self.length),
+            self._trigger_time.status.eq(self.trigger_time),
+        ]
@@ -0,0 +1,121 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+from migen.genlib.roundrobin import *
+
+from litex.gen import *
+
+from litex.soc.interconnect import stream
+
+# Constants ----------------------------------------------------------------------------------------
+
+CHANNEL_TAG_MAGIC = 0x5aa5
+
+# Channel Interleaver ------------------------------------------------------------------------------
+
+class ChannelInterleaver(LiteXModule):
+    """Interleave the packets of `n` channel streams in one stream of 2 x data_width words.
+
+    Each channel is cut in packets on sink.last (FFT frames) or every `packet_len` samples (streams
+    without frames), packed two samples per word (first sample in the LSBs) and buffered in a
+    `fifo_depth` words FIFO (the channels have no backpressure: the FIFO must absorb a packet of
+    the other channels). Packets are forwarded in round-robin, each one preceded by a tag word:
+
+    - [63:48]: CHANNEL_TAG_MAGIC.
+    - [47:32]: Channel.
+    - [31: 0]: Packet count of the channel (wraps, cleared on reset).
+    """
+    def __init__(self, n=2, data_width=32, packet_len=1024, fifo_depth=1024):
+        assert data_width == 32 # 64-bit tag words.
+        assert packet_len % 2 == 0
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sinks  = sinks  = [stream.Endpoint([("data", data_width)]) for _ in range(n)]
+        self.source = source = stream.Endpoint([("data", 2 * data_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset = Signal()
+
+        # # #
+
+        fifos   = []
+        packets = []
+        for i, sink in enumerate(sinks):
+            # Packetizer (last forced every packet_len samples).
+            count = Signal(max=packet_len)
+            last  = Signal()
+            self.comb += last.eq(sink.last | (count == (packet_len - 1)))
+            self.sync += [
+                If(self.reset,
+                    count.eq(0),
+                ).Elif(sink.valid & sink.ready,
+                    count.eq(count + 1),
+                    If(last,
+                        count.eq(0),
+                    )
+                )
+            ]
+
+            # Converter/FIFO.
+            conv = ResetInserter()(stream.Converter(data_width, 2 * data_width))
+            fifo = ResetInserter()(stream.SyncFIFO([("data", 2 * data_width)], fifo_depth, buffered=True))
+            self.add_module(name=f"conv{i}", module=conv)
+            self.add_module(name=f"fifo{i}", module=fifo)
+            self.comb += [
+                conv.reset.eq(self.reset),
+                fifo.reset.eq(self.reset),
+                sink.connect(conv.sink, omit=["last"]),
+                conv.sink.last.eq(last),
+                conv.source.connect(fifo.sink, omit=["valid_token_count"]),
+            ]
+            fifos.append(fifo)
+
+            # Packet count.
+            packet = Signal(32)
+            self.sync += [
+                If(self.reset,
+                    packet.eq(0),
+                ).Elif(fifo.source.valid & fifo.source.ready & fifo.source.last,
+                    packet.eq(packet + 1),
+                )
+            ]
+            packets.append(packet)
+
+        # Round-Robin Arbiter (on packets).
+        self.rr = rr = RoundRobin(n, SP_CE)
+        channel = Signal(16)
+        request = Array(fifo.source.valid for fifo in fifos)[rr.grant]
+        self.comb += [rr.request[i].eq(fifo.source.valid) for i, fifo in enumerate(fifos)]
+        self.comb += channel.eq(rr.grant)
+
+        self.fsm = fsm = ResetInserter()(FSM(reset_state="IDLE"))
+        self.comb += fsm.reset.eq(self.reset)
+        fsm.act("IDLE",
+            If(request,
+                NextState("TAG"),
+            ).Else(
+                rr.ce.eq(1),
+            )
+        )
+        fsm.act("TAG",
+            source.valid.eq(1),
+            source.data.eq(Cat(Array(packets)[rr.grant], channel, C(CHANNEL_TAG_MAGIC, 16))),
+            If(source.ready,
+                NextState("DATA"),
+            )
+        )
+        cases = {}
+        for i, fifo in enumerate(fifos):
+            cases[i] = fifo.source.connect(source)
+        fsm.act("DATA",
+            Case(rr.grant, cases),
+            If(source.valid & source.ready & source.last,
+                rr.ce.eq(1),
+                NextState("IDLE"),
+            )
+        )
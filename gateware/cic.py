@@ -0,0 +1,242 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+# Utils --------------------------------------------------------------------------------------------
+
+def gain_bits(decimation, stages=4, diff_delay=1):
+    """Bit growth of a CIC decimator: ceil(stages * log2(decimation * diff_delay))."""
+    return ((decimation * diff_delay)**stages - 1).bit_length()
+
+def response(f, decimation, stages=4, diff_delay=1):
+    """Normalized magnitude response of a CIC decimator, `f` relative to the output rate."""
+    f   = np.asarray(f, dtype=np.float64)
+    num = np.sin(np.pi * diff_delay * f)
+    den = decimation * np.sin(np.pi * diff_delay * f / decimation)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        h = np.where(f == 0, 1.0, num / den)
+    return np.abs(h)**stages
+
+@lru_cache(maxsize=None)
+def pruning(data_in_width=16, data_out_width=16, stages=4, max_decimation=1024, diff_delay=1):
+    """LSBs discarded at each of the 2 x stages (integrators then combs) stages (Hogenauer).
+
+    Computed for max_decimation so that the total error variance of the pruned stages doesn't
+    exceed the output truncation one. Returns (max_width, pruned) where max_width is the full
+    precision register width.
+    """
+    N, RM     = stages, max_decimation * diff_delay
+    max_width = data_in_width + gain_bits(max_decimation, stages, diff_delay)
+    def variance_gain(j):
+        if j <= N:
+            h = [sum((-1)**l * math.comb(N, l) * math.comb(N - j + k - RM*l, k - RM*l)
+                for l in range(k // RM + 1)) for k in range((RM - 1)*N + j)]
+        else:
+            h = [math.comb(2*N + 1 - j, k) for k in range(2*N + 2 - j)]
+        return sum(v*v for v in h)
+    out_lsbs = max(max_width - data_out_width, 0)
+    log2_out = out_lsbs - 0.5 * math.log2(12) + 0.5 * math.log2(6 / N)
+    pruned   = [max(0, math.floor(log2_out - 0.5 * math.log2(variance_gain(j)))) for j in range(1, 2*N + 1)]
+    pruned   = [min(p, out_lsbs) for p in pruned]
+    return max_width, pruned
+
+def _wrap(x, width):
+    return ((x + (1 << (width - 1))) & ((1 << width) - 1)) - (1 << (width - 1))
+
+def _shift(x, n):
+    return x >> n if n >= 0 else x << -n
+
+# CIC Model ----------------------------------------------------------------------------------------
+
+def model(re_in, im_in, decimation, stages=4, diff_delay=1, data_in_width=16, data_out_width=16,
+    max_decimation=1024, shift=None):
+    """Bit-exact model of CICDecimator (from reset), returns the (re, im) outputs.
+
+    `shift` is the bit growth to compensate (default: gain_bits(decimation)), the output being the
+    data_out_width MSBs of the data_in_width + shift bits result.
+    """
+    max_width, pruned = pruning(data_in_width, data_out_width, stages, max_decimation, diff_delay)
+    assert max_width <= 63
+    if shift is None:
+        shift = gain_bits(decimation, stages, diff_delay)
+    widths = [max_width - p for p in pruned]
+    lsbs   = [0] + pruned
+    outs   = []
+    for x in [re_in, im_in]:
+        v = np.asarray(x, dtype=np.int64)
+        # Integrators (pipelined: each stage adds the previous value of the preceding one).
+        for j in range(stages):
+            u = _shift(v, lsbs[j + 1] - lsbs[j])
+            if j > 0:
+                u = np.concatenate([[0], u[:-1]])
+            v = _wrap(np.cumsum(u), widths[j])
+        # Decimation.
+        v = v[decimation - 1::decimation]
+        # Combs.
+        for j in range(stages, 2*stages):
+            u = _shift(v, lsbs[j + 1] - lsbs[j])
+            v = _wrap(u - np.concatenate([np.zeros(diff_delay, dtype=np.int64), u[:-diff_delay]]), widths[j])
+        # Output (data_out_width MSBs of the data_in_width + shift bits result).
+        v = _shift(v, data_in_width + shift - data_out_width - lsbs[-1])
+        outs.append(_wrap(v, data_out_width))
+    return outs[0], outs[1]
+
+# CIC Decimator ------------------------------------------------------------------------------------
+
+class CICDecimator(LiteXModule):
+    """Multiplier-free CIC decimator (stages integrators at the input rate, stages combs at the
+    output rate), on both re/im.
+
+    The decimation (`decimation_minus_one + 1`, up to max_decimation) is set at runtime, the stages
+    count at build time. Registers are pruned (Hogenauer, for max_decimation, see pruning) and the
+    output is the data_out_width MSBs of the data_in_width + `shift` bits result: `shift` must be
+    set to gain_bits(decimation) (the default for a max_decimation rate). model() is bit-exact.
+
+    sink is always ready (one sample per clock cycle), source.valid is held until accepted (an
+    output not accepted before the next one is overwritten).
+    """
+    def __init__(self, data_in_width=16, data_out_width=16, stages=4, max_decimation=1024,
+        diff_delay = 1,
+        with_csr   = True,
+        ):
+        max_width, pruned = pruning(data_in_width, data_out_width, stages, max_decimation, diff_delay)
+        widths = [max_width - p for p in pruned]
+        lsbs   = [0] + pruned
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint([("re", data_in_width),  ("im", data_in_width)])
+        self.source = source = stream.Endpoint([("re", data_out_width), ("im", data_out_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset                = Signal()
+        self.decimation_minus_one = Signal(bits_for(max_decimation - 1))
+        self.shift                = Signal(bits_for(max_width - data_in_width),
+            reset=gain_bits(max_decimation, stages, diff_delay))
+
+        # Parameters/Locals ------------------------------------------------------------------------
+        self.stages         = stages
+        self.max_decimation = max_decimation
+        self.max_width      = max_width
+        self.pruned         = pruned
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        def shifted(x, n):
+            return (x >> n) if n >= 0 else (x << -n)
+
+        # Decimation phase.
+        count = Signal(bits_for(max_decimation - 1))
+        take  = Signal()
+        self.comb += take.eq(sink.valid & (count >= self.decimation_minus_one))
+        self.sync += [
+            If(self.reset,
+                count.eq(0),
+            ).Elif(sink.valid,
+                count.eq(count + 1),
+                If(take,
+                    count.eq(0),
+                )
+            )
+        ]
+
+        # Comb pipeline strobes (one per comb stage + output).
+        strobes = [Signal() for _ in range(stages + 1)]
+        self.sync += [
+            strobes[0].eq(take & ~self.reset),
+            [strobes[i + 1].eq(strobes[i] & ~self.reset) for i in range(stages)],
+        ]
+
+        outputs = []
+        for data in [sink.re, sink.im]:
+            x = Signal((data_in_width, True))
+            self.comb += x.eq(data)
+
+            # Integrators.
+            integrators = [Signal((w, True)) for w in widths[:stages]]
+            sums        = []
+            value       = x
+            for j, integrator in enumerate(integrators):
+                sums.append(integrator + shifted(value, lsbs[j + 1] - lsbs[j]))
+                value = integrator
+            self.sync += [
+                If(self.reset,
+                    [integrator.eq(0) for integrator in integrators],
+                ).Elif(sink.valid,
+                    [integrator.eq(s) for integrator, s in zip(integrators, sums)],
+                )
+            ]
+
+            # Decimation (integrator output after the update).
+            sample = Signal((widths[stages - 1], True))
+            self.sync += If(take, sample.eq(sums[-1]))
+
+            # Combs.
+            value = sample
+            for j in range(stages, 2*stages):
+                comb  = Signal((widths[j], True))
+                delay = [Signal((widths[j], True)) for _ in range(diff_delay)]
+                u     = Signal((widths[j], True))
+                self.comb += u.eq(shifted(value, lsbs[j + 1] - lsbs[j]))
+                self.sync += [
+                    If(self.reset,
+                        comb.eq(0),
+                        [d.eq(0) for d in delay],
+                    ).Elif(strobes[j - stages],
+                        comb.eq(u - delay[-1]),
+                        delay[0].eq(u),
+                        [delay[i + 1].eq(delay[i]) for i in range(diff_delay - 1)],
+                    )
+                ]
+                value = comb
+            outputs.append(value)
+
+        # Output (data_out_width MSBs of the data_in_width + shift bits result).
+        pad    = max(0, data_out_width + lsbs[-1] - data_in_width)
+        offset = data_in_width - data_out_width - lsbs[-1] + pad
+        self.sync += [
+            If(source.ready,
+                source.valid.eq(0),
+            ),
+            If(self.reset,
+                source.valid.eq(0),
+            ).Elif(strobes[stages],
+                source.valid.eq(1),
+            )
+        ]
+        for output, data in zip(outputs, [source.re, source.im]):
+            ext = Signal((len(output) + pad, True))
+            self.comb += ext.eq(output << pad)
+            self.sync += If(strobes[stages], data.eq(ext >> (self.shift + offset)))
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._decimation_minus_one = CSRStorage(len(self.decimation_minus_one), name="decimation_minus_one",
+            reset       = self.max_decimation - 1,
+            description = "Decimation minus one.")
+        self._shift                = CSRStorage(len(self.shift), name="shift",
+            reset       = self.shift.reset.value,
+            description = "Bit growth to compensate (gain_bits(decimation)).")
+
+        self.comb += [
+            self.decimation_minus_one.eq(self._decimation_minus_one.storage),
+            self.shift.eq(self._shift.storage),
+        ]
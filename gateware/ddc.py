@@ -0,0 +1,181 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+# Utils --------------------------------------------------------------------------------------------
+
+def phase_increment(frequency, sample_rate, phase_width=32):
+    """Phase increment shifting `frequency` (signed, in Hz) to DC at `sample_rate`."""
+    return round(frequency / sample_rate * 2**phase_width) % 2**phase_width
+
+def lut(addr_width=10, width=18):
+    """NCO cos/sin LUT (one full period, 2**addr_width entries, signed width-bit amplitude)."""
+    k   = np.arange(2**addr_width)
+    a   = 2**(width - 1) - 1
+    cos = np.round(a * np.cos(2 * np.pi * k / 2**addr_width)).astype(np.int64)
+    sin = np.round(a * np.sin(2 * np.pi * k / 2**addr_width)).astype(np.int64)
+    return cos, sin
+
+# DDC Model ----------------------------------------------------------------------------------------
+
+def model(re_in, im_in, phase_inc, data_in_width=16, data_out_width=16, lut_addr_width=10,
+    lut_width=18, phase_width=32):
+    """Bit-exact model of DDC (from reset), returns the (re, im) outputs.
+
+    Sample n is multiplied by exp(-j * 2 * pi * n * phase_inc / 2**phase_width), the phase being
+    truncated to its lut_addr_width MSBs (spurs around -6 dBc per address bit).
+    """
+    n     = np.arange(len(re_in), dtype=np.uint64)
+    phase = (n * np.uint64(phase_inc)) & np.uint64(2**phase_width - 1)
+    addr  = (phase >> np.uint64(phase_width - lut_addr_width)).astype(np.int64)
+    cos, sin = lut(lut_addr_width, lut_width)
+    c, s  = cos[addr], sin[addr]
+    x     = np.asarray(re_in, dtype=np.int64)
+    y     = np.asarray(im_in, dtype=np.int64)
+    rnd   = 1 << (lut_width - 2)
+    re    = (x * c + y * s + rnd) >> (lut_width - 1)
+    im    = (y * c - x * s + rnd) >> (lut_width - 1)
+    lo, hi = -2**(data_out_width - 1), 2**(data_out_width - 1) - 1
+    return np.clip(re, lo, hi), np.clip(im, lo, hi)
+
+# DDC ----------------------------------------------------------------------------------------------
+
+class DDC(LiteXModule):
+    """Digital Down-Converter: LUT-based NCO and complex mixer on re/im.
+
+    Each accepted sample is multiplied by exp(-j * phase) (rounded, saturated to data_out_width),
+    the phase advancing by `phase_inc` (phase_width bits, see phase_increment) per sample: a tone at
+    phase_inc / 2**phase_width x sample rate is moved to DC. The NCO is a one period cos/sin LUT of
+    2**lut_addr_width entries (one BRAM for the defaults) addressed by the phase MSBs and the mixer
+    uses 4 multipliers. 3 cycles latency, one sample per clock cycle, backpressure is propagated.
+    model() is bit-exact.
+    """
+    def __init__(self, data_in_width=16, data_out_width=16, lut_addr_width=10, lut_width=18,
+        phase_width = 32,
+        with_csr    = True,
+        ):
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint([("re", data_in_width),  ("im", data_in_width)])
+        self.source = source = stream.Endpoint([("re", data_out_width), ("im", data_out_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset     = Signal()
+        self.phase_inc = Signal(phase_width)
+
+        # # #
+
+        # Pipeline control (all the stages advance when the output is free or accepted).
+        ce = Signal()
+        self.comb += [
+            ce.eq(~source.valid | source.ready),
+            sink.ready.eq(ce),
+        ]
+
+        # NCO.
+        phase = Signal(phase_width)
+        self.sync += [
+            If(self.reset,
+                phase.eq(0),
+            ).Elif(sink.valid & ce,
+                phase.eq(phase + self.phase_inc),
+            )
+        ]
+        cos, sin  = lut(lut_addr_width, lut_width)
+        mask      = 2**lut_width - 1
+        self.mem  = Memory(2 * lut_width, 2**lut_addr_width,
+            init=[(int(c) & mask) | ((int(s) & mask) << lut_width) for c, s in zip(cos, sin)])
+        port      = self.mem.get_port(has_re=True)
+        self.specials += port
+        self.comb += [
+            port.adr.eq(phase[phase_width - lut_addr_width:]),
+            port.re.eq(ce),
+        ]
+
+        # Stage 1: LUT read, input samples registered.
+        s1_valid = Signal()
+        s1_last  = Signal()
+        s1_re    = Signal((data_in_width, True))
+        s1_im    = Signal((data_in_width, True))
+        s1_cos   = Signal((lut_width, True))
+        s1_sin   = Signal((lut_width, True))
+        self.comb += [
+            s1_cos.eq(port.dat_r[:lut_width]),
+            s1_sin.eq(port.dat_r[lut_width:]),
+        ]
+        self.sync += [
+            If(self.reset,
+                s1_valid.eq(0),
+            ).Elif(ce,
+                s1_valid.eq(sink.valid),
+                s1_last.eq(sink.last),
+                s1_re.eq(sink.re),
+                s1_im.eq(sink.im),
+            )
+        ]
+
+        # Stage 2: Products.
+        s2_valid = Signal()
+        s2_last  = Signal()
+        s2_rc    = Signal((data_in_width + lut_width, True))
+        s2_is    = Signal((data_in_width + lut_width, True))
+        s2_ic    = Signal((data_in_width + lut_width, True))
+        s2_rs    = Signal((data_in_width + lut_width, True))
+        self.sync += [
+            If(self.reset,
+                s2_valid.eq(0),
+            ).Elif(ce,
+                s2_valid.eq(s1_valid),
+                s2_last.eq(s1_last),
+                s2_rc.eq(s1_re * s1_cos),
+                s2_is.eq(s1_im * s1_sin),
+                s2_ic.eq(s1_im * s1_cos),
+                s2_rs.eq(s1_re * s1_sin),
+            )
+        ]
+
+        # Stage 3: Sums, rounding and saturation (x * exp(-j * phase)).
+        rnd    = 1 << (lut_width - 2)
+        re_sum = Signal((data_in_width + lut_width + 1, True))
+        im_sum = Signal((data_in_width + lut_width + 1, True))
+        re_out = Signal((data_in_width + 2, True))
+        im_out = Signal((data_in_width + 2, True))
+        self.comb += [
+            re_sum.eq(s2_rc + s2_is + rnd),
+            im_sum.eq(s2_ic - s2_rs + rnd),
+            re_out.eq(re_sum >> (lut_width - 1)),
+            im_out.eq(im_sum >> (lut_width - 1)),
+        ]
+        def saturate(x):
+            lo, hi = -2**(data_out_width - 1), 2**(data_out_width - 1) - 1
+            return Mux(x > hi, hi, Mux(x < lo, lo, x))
+        self.sync += [
+            If(self.reset,
+                source.valid.eq(0),
+            ).Elif(ce,
+                source.valid.eq(s2_valid),
+                source.last.eq(s2_last),
+                source.re.eq(saturate(re_out)),
+                source.im.eq(saturate(im_out)),
+            )
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._phase_inc = CSRStorage(len(self.phase_inc), name="phase_inc",
+            description="NCO phase increment per sample (frequency / sample_rate x 2**phase_width).")
+
+        self.comb += self.phase_inc.eq(self._phase_inc.storage)
@@ -0,0 +1,134 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect import stream
+
+# Frame Buffer -------------------------------------------------------------------------------------
+
+class FrameBuffer(LiteXModule):
+    """Ping-pong frame BRAM between a frame stream without backpressure and a source.
+
+    Each frame (aligned on sink.last) is written in one bank (`depth` words of `width` bits) while
+    the other one is read. A completed frame is handed over to the read side (`handover` pulse)
+    when it is free, words 0 to `last_index` are then issued at one per clock cycle while the source
+    is free or accepted. Full rate frames are sustained (the bank is released on its last read), a
+    frame completed while the previous one is still emitted (source stalls) is dropped (counted in
+    `dropped`).
+
+    Subclasses drive the bank addresses (`wadr` from `windex`, the sample index in the frame, and
+    `radr` from `index`, or from `index_next` through a registered lookup), `wport.dat_w`,
+    `last_index` and the source payload, registered on `ce` from `s1_index` and `rport.dat_r`.
+    `wport.we` is driven from `write` unless `we_granularity` is set (per lane writes).
+    """
+    def __init__(self, sink_layout, source_layout, frame_len, width, depth, index_width,
+        we_granularity=0):
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint(sink_layout)
+        self.source = source = stream.Endpoint(source_layout)
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset    = Signal()
+        self.dropped  = Signal(32)
+        self.handover = Signal()
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        # Frames (2 banks).
+        mem        = Memory(width, 2 * depth)
+        self.wport = wport = mem.get_port(write_capable=True, we_granularity=we_granularity)
+        self.rport = rport = mem.get_port(has_re=True, mode=READ_FIRST) # Data registered (bank reused).
+        self.specials += mem, wport, rport
+
+        # Write side (the completed frame is handed over to the read side when it is free).
+        self.write  = write  = Signal()
+        self.windex = windex = Signal(log2_int(frame_len))
+        self.wadr   = Signal(log2_int(depth))
+        self.wbank  = wbank  = Signal()
+        self.rbank  = rbank  = Signal()
+        rbusy    = Signal()
+        handover = self.handover
+        self.comb += [
+            write.eq(sink.valid & ~self.reset),
+            wport.adr.eq(Cat(self.wadr, wbank)),
+            handover.eq(sink.valid & sink.last & ~rbusy),
+        ]
+        if not we_granularity:
+            self.comb += wport.we.eq(write)
+        self.sync += [
+            If(self.reset,
+                windex.eq(0),
+                wbank.eq(0),
+                self.dropped.eq(0),
+            ).Elif(sink.valid,
+                windex.eq(windex + 1),
+                If(sink.last,
+                    windex.eq(0),
+                    If(rbusy,
+                        self.dropped.eq(self.dropped + 1),
+                    ).Else(
+                        wbank.eq(~wbank),
+                    )
+                )
+            )
+        ]
+
+        # Read side (issue -> frame -> source, all the stages advance when the output is free or
+        # accepted). `index_next` allows registered lookups so that the frame is read at issue.
+        self.ce         = ce         = Signal()
+        self.last_index = last_index = Signal(index_width)
+        self.index      = index      = Signal(index_width)
+        self.index_next = index_next = Signal(index_width)
+        self.radr       = Signal(log2_int(depth))
+        self.s1_index   = s1_index   = Signal(index_width)
+        issue      = Signal()
+        issue_last = Signal()
+        s1_valid   = Signal()
+        s1_last    = Signal()
+        self.comb += [
+            ce.eq(~source.valid | source.ready),
+            issue_last.eq(issue & (index == last_index)),
+            rbusy.eq(issue & ~(ce & issue_last)),
+            If(handover | (ce & issue_last),
+                index_next.eq(0),
+            ).Elif(ce & issue,
+                index_next.eq(index + 1),
+            ).Else(
+                index_next.eq(index),
+            ),
+            rport.adr.eq(Cat(self.radr, rbank)),
+            rport.re.eq(ce),
+        ]
+        self.sync += [
+            index.eq(index_next),
+            If(self.reset,
+                issue.eq(0),
+                s1_valid.eq(0),
+                source.valid.eq(0),
+            ).Else(
+                If(ce,
+                    If(issue_last,
+                        issue.eq(0),
+                    ),
+                    s1_valid.eq(issue),
+                    s1_last.eq(issue_last),
+                    s1_index.eq(index),
+                    source.valid.eq(s1_valid),
+                    source.last.eq(s1_last),
+                ),
+                If(handover,
+                    issue.eq(1),
+                    rbank.eq(wbank),
+                )
+            )
+        ]
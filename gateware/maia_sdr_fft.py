@@ -8,12 +8,216 @@ import os
 import numpy as np
 
 from migen import *
+from migen.genlib.cdc import MultiReg
 
 from litex.gen import *
 
-from litex.soc.interconnect import stream
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
 
 from .clk_nx_common_edge import ClkNxCommonEdge
+from .frame_buffer       import FrameBuffer
+from .verilog_cache      import VerilogJob
+
+# Utils --------------------------------------------------------------------------------------------
+
+def compute_widths(data_width=12, order_log2=12, radix=2, truncates=None):
+    """Per-stage truncates and datapath widths of the FFT (same computation as maia_hdl FFT).
+
+    By default all the stages truncate their bit growth, as the FFT generated by `fft_generator`.
+    Returns the truncates and the nstages + 1 widths (input width first, output width last).
+    """
+    radix      = radix if radix == "R22" else int(radix)
+    bfly_trunc = {2: 1, 4: 2, "R22": [1, 1]}[radix]
+    radix_log2 = {2: 1, 4: 2, "R22": 2}[radix]
+    nstages    = order_log2 // radix_log2
+    if truncates is None:
+        truncates = [bfly_trunc] * nstages
+    widths     = [data_width]
+    w          = data_width
+    for j in range(nstages):
+        w += radix_log2 - int(np.sum(truncates[j]))
+        widths.append(w)
+    return truncates, widths
+
+def digit_reversed_order(order_log2=12, radix=2):
+    """Output order of the FFT: bin k of the spectrum is output at index `order[k]` (and conversely,
+    digit reversal being an involution), so `out[..., order]` is in natural order. Radix 4 reverses
+    base-4 digits, radix 2 and R22 reverse bits.
+    """
+    radix      = radix if radix == "R22" else int(radix)
+    digit_log2 = {2: 1, 4: 2, "R22": 1}[radix]
+    n          = np.arange(2**order_log2)
+    order      = np.zeros_like(n)
+    for j in range(order_log2 // digit_log2):
+        digit  = (n >> (j * digit_log2)) & (2**digit_log2 - 1)
+        order |= digit << (order_log2 - (j + 1) * digit_log2)
+    return order
+
+def digit_reversed(index, radix=2):
+    """Digit reversal of an index Signal (wiring): output index <-> natural bin, see
+    digit_reversed_order."""
+    radix      = radix if radix == "R22" else int(radix)
+    digit_log2 = {2: 1, 4: 2, "R22": 1}[radix]
+    return Cat(*reversed([index[i:i + digit_log2] for i in range(0, len(index), digit_log2)]))
+
+# FFT Model ----------------------------------------------------------------------------------------
+
+class MaiaSDRFFTModel:
+    """Batched bit-exact model of MaiaSDRFFT (maia_hdl FFT).
+
+    Reproduces the optional window (9-bit coefficients), the radix 2/4/R22 single-delay-feedback
+    butterflies with their truncates, the twiddle multiplications (`twiddle_width` bits, wrapped to
+    the stage width) and the digit-reversed output order (see `digit_reversed_order`).
+
+    `process` accepts any number of frames at once (flat or (frames, 2**order_log2) arrays) and
+    returns arrays of the same shape. Tables are computed once and frames are processed in cache
+    sized batches of complex128 samples: all intermediate values are integers below 2**53, so
+    additions and complex products are exact and truncations are exact power-of-two floor divisions.
+    """
+    def __init__(self, data_width=12, order_log2=12, radix=2, window=None, truncates=None,
+        twiddle_width = 16,
+        ):
+        self.radix      = radix if radix == "R22" else int(radix)
+        self.radix_log2 = {2: 1, 4: 2, "R22": 2}[self.radix]
+        self.order_log2 = order_log2
+        self.nstages    = nstages = order_log2 // self.radix_log2
+        self.truncates, self.widths = compute_widths(data_width, order_log2, self.radix, truncates)
+        assert window in [None, "blackmanharris"]
+        assert order_log2 % self.radix_log2 == 0
+        assert max(self.widths) + twiddle_width <= 52
+
+        # Window coefficients (symmetric window, 9-bit unsigned coefficients), pre-scaled by the
+        # 9-bit truncation and repeated for the re/im float view.
+        self._window = None
+        if window is not None:
+            from scipy.signal import get_window
+            w = get_window(window, 2**order_log2, fftbins=False)
+            self._window = np.repeat(np.round((2**9 - 1) * w) * 2.0**-9, 2).reshape(-1, 2)
+
+        # Twiddle factors (integer valued, pre-scaled by their truncation), "I" for the multiplication
+        # by -i that replaces the last radix 2 twiddle. The first row (twiddle factor 1) is skipped.
+        self._twiddles = []
+        for j in range(nstages - 1):
+            if self.radix_log2 == 1 and j == nstages - 2:
+                self._twiddles.append("I")
+                continue
+            order = nstages - j
+            rows  = range(2**self.radix_log2) if self.radix != "R22" else [0, 2, 1, 3]
+            k     = np.arange(2**(self.radix_log2 * (order - 1)))
+            tw    = np.concatenate([np.exp(-1j*np.pi*r*k/2**(self.radix_log2*order - 1)) for r in rows])
+            scale = 2**(twiddle_width - 2)
+            tw    = (np.round(scale * tw.real) + 1j*np.round(scale * tw.imag)) / scale
+            self._twiddles.append(tw.reshape(2**self.radix_log2, -1, 1)[1:])
+
+    @staticmethod
+    def _floor(x, trunc=0):
+        # x >> trunc on integer valued complex samples (in place).
+        f = x.view(np.float64)
+        if trunc:
+            f *= 2.0**-trunc
+        np.floor(f, out=f)
+        return x
+
+    @staticmethod
+    def _wrap(x, width):
+        # Two's complement wrap to width bits (in place), only computed when a sample is out of range.
+        f = x.view(np.float64)
+        if f.max() >= 2**(width - 1) or f.min() < -2**(width - 1):
+            k  = f + 2**(width - 1)
+            k *= 2.0**-width
+            np.floor(k, out=k)
+            k *= 2**width
+            f -= k
+        return x
+
+    def _butterfly(self, x, j):
+        # Butterflies of stage j on (frames, blocks, radix, v // radix, B) samples, outputs can't
+        # overflow the stage width.
+        y     = np.empty_like(x)
+        trunc = self.truncates[j]
+        if self.radix == 2:
+            np.add(x[:, :, 0], x[:, :, 1], out=y[:, :, 0])
+            np.subtract(x[:, :, 0], x[:, :, 1], out=y[:, :, 1])
+        elif self.radix == 4:
+            s02 = x[:, :, 0] + x[:, :, 2]
+            d02 = x[:, :, 0] - x[:, :, 2]
+            s13 = x[:, :, 1] + x[:, :, 3]
+            d13 = x[:, :, 1] - x[:, :, 3]
+            d13 *= -1j
+            np.add(s02, s13, out=y[:, :, 0])
+            np.add(d02, d13, out=y[:, :, 1])
+            np.subtract(s02, s13, out=y[:, :, 2])
+            np.subtract(d02, d13, out=y[:, :, 3])
+        else:
+            # First R2SDF: the multiplication by -i is a re/im swap, its sign is absorbed by the
+            # second R2SDF.
+            z = np.empty_like(x)
+            np.add(x[:, :, 0], x[:, :, 2], out=z[:, :, 0])
+            np.add(x[:, :, 1], x[:, :, 3], out=z[:, :, 1])
+            np.subtract(x[:, :, 0], x[:, :, 2], out=z[:, :, 2])
+            np.subtract(x[:, :, 1], x[:, :, 3], out=z[:, :, 3])
+            np.conjugate(z[:, :, 3], out=z[:, :, 3])
+            z[:, :, 3] *= 1j
+            self._floor(z, trunc[0])
+            np.add(z[:, :, 0], z[:, :, 1], out=y[:, :, 0])
+            np.subtract(z[:, :, 0], z[:, :, 1], out=y[:, :, 1])
+            np.conjugate(z[:, :, 3], out=z[:, :, 3])
+            np.add(z[:, :, 2], z[:, :, 3], out=y[:, :, 2])
+            np.subtract(z[:, :, 2], z[:, :, 3], out=y[:, :, 3])
+            trunc = trunc[1]
+        if trunc:
+            self._floor(y, trunc)
+        return y
+
+    def _twiddle(self, x, j):
+        tw = self._twiddles[j]
+        if isinstance(tw, str):
+            # Radix 2 stage of order 2: the last sample of each 4 (x[:, :, 1, 1]) is multiplied by -i.
+            x[:, :, -1, -1] *= -1j
+        else:
+            y  = x[:, :, 1:]
+            y *= tw
+            self._floor(y)
+            self._wrap(y, self.widths[j + 1])
+        return x
+
+    def _frames(self, x):
+        # Sample n of a frame is stored at [n % C, n // C] of a (C, B) array: the blocks of the late
+        # stages are moved to the contiguous axis (B) so that short butterflies still vectorize.
+        frames, n = x.shape
+        r         = 2**self.radix_log2
+        x         = x.reshape(frames, n, 1)
+        for j in range(self.nstages):
+            v = 2**(self.radix_log2 * (self.nstages - j))
+            if x.shape[2] == 1 and v // r < 32 and v < n:
+                x = np.ascontiguousarray(x.reshape(frames, n // v, v).transpose(0, 2, 1))
+            c, b = x.shape[1:]
+            x    = self._butterfly(x.reshape(frames, c // v, r, v // r, b), j)
+            if j != self.nstages - 1:
+                x = self._twiddle(x, j)
+            x = x.reshape(frames, c, b)
+        return x.transpose(0, 2, 1).reshape(frames, n)
+
+    def process(self, re_in, im_in):
+        shape = np.shape(re_in)
+        n     = 2**self.order_log2
+        re_in = np.asarray(re_in, np.float64).reshape(-1, n)
+        im_in = np.asarray(im_in, np.float64).reshape(-1, n)
+        out   = np.empty(re_in.shape, np.complex128)
+        batch = max(1, 2**14 // n)
+        for b in range(0, out.shape[0], batch):
+            x = out[b:b + batch]
+            x.real = re_in[b:b + batch]
+            x.imag = im_in[b:b + batch]
+            if self._window is not None:
+                x.view(np.float64).reshape(x.shape[0], n, 2)[:] *= self._window
+                self._floor(x)
+            out[b:b + batch] = self._frames(x)
+        return out.real.astype('int').reshape(shape), out.imag.astype('int').reshape(shape)
+
+def model(data_width, order_log2, radix, re_in, im_in, window=None, truncates=None, twiddle_width=16):
+    return MaiaSDRFFTModel(data_width, order_log2, radix, window, truncates, twiddle_width).process(re_in, im_in)
 
 # Generator ----------------------------------------------------------------------------------------
 
@@ -57,6 +261,7 @@ def fft_generator(output_path, data_width=12, order_log2=12, radix=4, window=Non
                 emit_src=False))
     print('wrote verilog to', file_out)
     print(f"Delay: {m.delay}")
+    return m.delay
 
 # MaiaSDRFFT ---------------------------------------------------------------------------------------
 
@@ -72,16 +277,8 @@ class MaiaSDRFFT(LiteXModule):
 
         # Prepare/Compute output data width --------------------------------------------------------
         # FIXME: considerer truncates is not used
-        # FIXME: copied from FFT constructor
-        bfly_trunc = {'2': 1, '4': 2, 'R22': [1, 1]}[radix]
-        radix_log2 = {'2': 1, '4': 2, 'R22': 2}[radix]
-        nstages    = order_log2 // radix_log2
-        truncates  = [bfly_trunc] * nstages # FIXME: must be coherent with fft_generator
-        widths     = [data_width]
-        w          = data_width
-        for j in range(nstages):
-            w += radix_log2 - int(np.sum(truncates[j]))
-            widths.append(w)
+        radix_log2 = {'2': 1, '4': 2, 'R22': 2}[str(radix)]
+        truncates, widths = compute_widths(data_width, order_log2, radix) # FIXME: must be coherent with fft_generator
 
         self.out_width = out_width = widths[-1]
 
@@ -116,23 +313,51 @@ class MaiaSDRFFT(LiteXModule):
             cmult3x = {True:"_cmult3x",  False: ""}[cmult3x],
         )
 
+        # Clock Domain Crossing --------------------------------------------------------------------
+        # FFT clocked by clk_domain (faster DSP clock): samples through async FIFOs, reset through a
+        # MultiReg. The output FIFO has no backpressure either (drained at the input rate).
+        ip_sink   = sink
+        ip_source = source
+        ip_reset  = self.reset
+        if clk_domain != "sys":
+            ip_sink   = stream.Endpoint(sink.description)
+            ip_source = stream.Endpoint(source.description)
+            ip_reset  = Signal()
+            self.cdc_sink   = stream.ClockDomainCrossing(sink.description,
+                cd_from = "sys",
+                cd_to   = clk_domain,
+                depth   = 16,
+            )
+            self.cdc_source = stream.ClockDomainCrossing(source.description,
+                cd_from = clk_domain,
+                cd_to   = "sys",
+                depth   = 16,
+            )
+            self.comb += [
+                sink.connect(self.cdc_sink.sink),
+                self.cdc_sink.source.connect(ip_sink),
+                ip_source.connect(self.cdc_source.sink),
+                self.cdc_source.source.connect(source),
+            ]
+            self.specials += MultiReg(self.reset, ip_reset, odomain=clk_domain)
+
         # FFT Instance -----------------------------------------------------------------------------
 
         self.ip_params = dict()
         self.ip_params.update(
             # Clk/Reset.
             i_clk      = ClockSignal(clk_domain),
-            i_rst      = (ResetSignal(clk_domain) | self.reset),
+            i_rst      = (ResetSignal(clk_domain) | ip_reset),
 
             # Input
-            i_re_in    = self.sink.re,
-            i_im_in    = self.sink.im,
-            i_clken    = self.sink.valid,
+            i_re_in    = ip_sink.re,
+            i_im_in    = ip_sink.im,
+            i_clken    = ip_sink.valid,
 
             # Output
-            o_re_out   = self.source.re,
-            o_im_out   = self.source.im,
-            o_out_last = self.source.last,
+            o_re_out   = ip_source.re,
+            o_im_out   = ip_source.im,
+            o_out_last = ip_source.last,
         )
 
         # Windowing.
@@ -165,22 +390,34 @@ class MaiaSDRFFT(LiteXModule):
 
         self.specials += Instance(self.ip_name, **self.ip_params)
 
+        # Verilog generation (in background, joined in do_finalize).
+        self.verilog_job = VerilogJob(fft_generator, self.ip_name + ".v",
+            output_dir = True,
+            params     = dict(
+                data_width = self.data_width,
+                order_log2 = self.order_log2,
+                radix      = self.radix,
+                window     = self.window,
+                cmult3x    = self.cmult3x,
+            ),
+        )
+
         # Logic ------------------------------------------------------------------------------------
 
         # FFT module has no ready nor output valid (but re_out/im_out are updated one clock cycle after
         # clken/valid goes high).
-        self.comb += sink.ready.eq(1)
+        self.comb += ip_sink.ready.eq(1)
 
-        self.fsm = fsm = FSM(reset_state="IDLE")
+        self.fsm = fsm = ClockDomainsRenamer(clk_domain)(FSM(reset_state="IDLE"))
         fsm.act("IDLE",
-            NextValue(source.valid, 0),
-            If(source.last,
+            NextValue(ip_source.valid, 0),
+            If(ip_source.last,
                NextState("TRANSMIT")
             )
         )
         fsm.act("TRANSMIT",
-            NextValue(source.valid, sink.valid),
-            If(self.reset,
+            NextValue(ip_source.valid, ip_sink.valid),
+            If(ip_reset,
                NextState("IDLE"),
             )
         )
@@ -193,18 +430,59 @@ class MaiaSDRFFT(LiteXModule):
 
     def do_finalize(self):
         src_dir  = os.path.join(self.platform.output_dir, "maia_hdl_fft")
-        curr_dir = os.getcwd()
 
         # Create verilog files when not present.
         if not os.path.exists(src_dir):
             os.mkdir(src_dir)
 
-        fft_generator(output_path=src_dir,
-            data_width = self.data_width,
-            order_log2 = self.order_log2,
-            radix      = self.radix,
-            window     = self.window,
-            cmult3x    = self.cmult3x
+        self.platform.add_source(self.verilog_job.join(src_dir))
+
+# FFT Reorder --------------------------------------------------------------------------------------
+
+class FFTReorder(FrameBuffer):
+    """Natural order frames of MaiaSDRFFT (digit-reversed output, see digit_reversed_order).
+
+    Each frame is written at its natural bin in a FrameBuffer, then read sequentially (`last` on the
+    final bin) from the bin 0, or from the bin 2**(order_log2 - 1) with `fftshift` (negative
+    frequencies first, DC in the middle).
+    """
+    def __init__(self, data_width=16, order_log2=10, radix=2, with_csr=True):
+        n = 2**order_log2
+        FrameBuffer.__init__(self,
+            sink_layout   = [("re", data_width), ("im", data_width)],
+            source_layout = [("re", data_width), ("im", data_width)],
+            frame_len     = n,
+            width         = 2 * data_width,
+            depth         = n,
+            index_width   = order_log2,
         )
+        source = self.source
+
+        # Signals ----------------------------------------------------------------------------------
+        self.fftshift = Signal()
+
+        # # #
+
+        index = self.index
+        self.comb += [
+            self.wadr.eq(digit_reversed(self.windex, radix)),
+            self.wport.dat_w.eq(Cat(self.sink.re, self.sink.im)),
+            self.last_index.eq(n - 1),
+            self.radr.eq(Cat(index[:-1], index[-1] ^ self.fftshift)),
+        ]
+        self.sync += If(self.ce,
+            source.re.eq(self.rport.dat_r[:data_width]),
+            source.im.eq(self.rport.dat_r[data_width:]),
+        )
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._fftshift = CSRStorage(1, name="fftshift", description="Output from the bin 2**(order_log2 - 1) (negative frequencies first).")
+        self._dropped  = CSRStatus(32, name="dropped",  description="Frames dropped (output stalled).")
 
-        self.platform.add_source(os.path.join(src_dir, self.ip_name + ".v"))
+        self.comb += [
+            self.fftshift.eq(self._fftshift.storage),
+            self._dropped.status.eq(self.dropped),
+        ]
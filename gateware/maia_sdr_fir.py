@@ -8,6 +8,7 @@ import os
 import numpy as np
 
 from migen import *
+from migen.genlib.cdc import MultiReg
 
 from litex.gen import *
 
@@ -15,6 +16,7 @@ from litex.soc.interconnect     import stream
 from litex.soc.interconnect.csr import *
 
 from .clk_nx_common_edge import ClkNxCommonEdge
+from .verilog_cache      import VerilogJob
 
 # Utils --------------------------------------------------------------------------------------------
 def clamp_nbits(x, nbits):
@@ -48,55 +50,257 @@ def compute_coefficients(operations=16, decimation=1, odd_operations=False, num_
 
     return (len(taps), taps, coeffs)
 
+def coefficient_words(coeffs):
+    """32-bit words loading `coeffs` (from address 0) through SDRProcessing.fir_coeff_sink.
+
+    [31]: Write (words with this bit cleared are ignored, to pad DMA buffers), [30:20]: Address,
+    [19:0]: Coefficient.
+    """
+    if len(coeffs) > 2**11:
+        raise ValueError(f"coefficient_words: {len(coeffs)} coefficients exceed the 11-bit address field.")
+    return [(1 << 31) | (addr << 20) | (int(coeff) & 0xfffff) for addr, coeff in enumerate(coeffs)]
+
 # FIR Model ----------------------------------------------------------------------------------------
 
-def model(macc_trunc, ow, taps, decimation, re_in, im_in):
-    assert len(taps) % decimation == 0
-    taps    = np.array(taps).reshape(-1, decimation)
-    history = np.zeros(taps.size - 1, 'int')
-    re_out  = np.zeros(len(re_in) // decimation, 'int')
-    im_out  = np.zeros(len(re_in) // decimation, 'int')
-    re_in   = np.concatenate((history, re_in))
-    im_in   = np.concatenate((history, im_in))
-    for j in range(re_out.size):
-        # initial values for rounding
-        acc_init           = (2**(macc_trunc - 1) if macc_trunc >= 1 else 0)
-        re0, im0, re1, im1 = [acc_init] * 4
-        for k in range(taps.shape[0]):
-            wr = re_in[(j + taps.shape[0] - k - 1) * decimation:][:decimation]
-            wi = im_in[(j + taps.shape[0] - k - 1) * decimation:][:decimation]
-            sr = np.sum(wr[::-1] * taps[k])
-            si = np.sum(wi[::-1] * taps[k])
-            if k % 2 == 0:
-                re0 += sr
-                im0 += si
-            else:
-                re1 += sr
-                im1 += si
-        re0       = clamp_nbits(int(re0) >> macc_trunc, ow)
-        im0       = clamp_nbits(int(im0) >> macc_trunc, ow)
-        re1       = clamp_nbits(int(re1) >> macc_trunc, ow)
-        im1       = clamp_nbits(int(im1) >> macc_trunc, ow)
-        re_out[j] = clamp_nbits(re0 + re1, ow)
-        im_out[j] = clamp_nbits(im0 + im1, ow)
-    return re_out, im_out
+def _macc_dtype(taps, x, macc_trunc):
+    # Use int64 when the accumulators can't overflow it, Python integers otherwise (slower but exact).
+    x_max = int(np.max(np.abs(x))) if x.size else 0
+    bound = x_max * int(np.sum(np.abs(taps))) + 2**max(macc_trunc - 1, 0)
+    return np.int64 if bound < 2**62 else object
+
+def _macc_direct(taps, decimation, x, nout):
+    """Polyphase MACC accumulation (direct form).
+
+    `taps` is the (operations, decimation) tap array, `x` the (2, n) re/im input preceded by
+    `taps.size - 1` history samples. Returns the (2, 2, nout) MACC0/MACC1 accumulators: even polyphase
+    branches go to MACC0, odd ones to MACC1 (as FIR4DSP does).
+    """
+    nbranch = taps.shape[0]
+    length  = (nout + nbranch) * decimation
+    blocks  = np.zeros((x.shape[0], length), x.dtype)
+    blocks[:, :min(length, x.shape[1])] = x[:, :length]
+    # Row r holds x[r*decimation + decimation - 1 - m] in column m.
+    blocks  = blocks.reshape(x.shape[0], nout + nbranch, decimation)[..., ::-1]
+    acc     = np.zeros((2, x.shape[0], nout), x.dtype)
+    prod    = np.empty((x.shape[0], nout), x.dtype)
+    for k in range(nbranch):
+        window = blocks[:, nbranch - 1 - k:][:, :nout]
+        if decimation == 1:
+            np.multiply(window[..., 0], taps[k, 0], out=prod)
+        else:
+            np.matmul(window, taps[k], out=prod)
+        acc[k % 2] += prod
+    return acc
+
+def _macc_fft_size(taps):
+    # Overlap-save block size: 4x the filter length keeps the per-output FFT cost low.
+    return max(256, 2**int(np.ceil(np.log2(4 * taps.size))))
+
+def _macc_fft_exact(taps, x, nfft):
+    """Check that a float64 overlap-save convolution of `x` by `taps` rounds back to exact integers.
+
+    Uses the FFT convolution error bound from C. Percival, "Rapid multiplication modulo the sum and
+    difference of highly composite numbers" (Math. Comp. 2003):
+        |err| <= |x|_2 * |h|_2 * ((1 + e)**(3n) * (1 + e*sqrt(5))**(3n + 1) * (1 + b)**(3n) - 1)
+    with n = log2(nfft), e = 2**-53 and b the twiddle factor error (taken as 2e). |x|_2 is bounded by
+    a full block of max-amplitude complex samples. The result is exact once rounded when the bound
+    stays below 0.5 (0.25 is used for margin); this also keeps all partial sums below 2**53.
+    """
+    if x.size == 0:
+        return True
+    n     = np.log2(nfft)
+    e     = 2.0**-53
+    b     = 2 * e
+    x_max = float(np.max(np.abs(x)))
+    x_l2  = np.sqrt(2 * nfft) * x_max
+    h_l2  = float(np.sqrt(np.sum(taps.astype(float)**2)))
+    err   = x_l2 * h_l2 * ((1 + e)**(3*n) * (1 + e*np.sqrt(5))**(3*n + 1) * (1 + b)**(3*n) - 1)
+    return err < 0.25
+
+def _macc_fft(taps, decimation, x, nout, nfft):
+    """Polyphase MACC accumulation (float64 FFT overlap-save).
+
+    Same interface and results as `_macc_direct`, only valid when `_macc_fft_exact` holds. Both MACC
+    filters (even/odd polyphase branches) are applied at full rate to re + 1j*im and decimated.
+    """
+    length = taps.size
+    step   = nfft - (length - 1)
+    acc    = np.zeros((2, 2, nout), np.int64)
+    if nout == 0:
+        return acc
+    # MACC0/MACC1 filters: taps of the even/odd polyphase branches, zeros elsewhere.
+    h      = np.zeros((2, length))
+    for k in range(2):
+        h[k].reshape(-1, decimation)[k::2] = taps[k::2]
+    h      = np.fft.fft(h, nfft)
+    # Outputs are at positions (length - 1) + j*decimation of x, block b covers step positions.
+    npos    = (nout - 1) * decimation + 1
+    nblocks = (npos + step - 1) // step
+    xc      = np.zeros(nblocks * step + length - 1, complex)
+    xc[:min(xc.size, x.shape[1])] = (x[0] + 1j * x[1])[:xc.size]
+    frames  = np.lib.stride_tricks.sliding_window_view(xc, nfft)[::step]
+    y       = np.empty((2, nblocks * step), complex)
+    batch   = max(1, 2**22 // nfft)
+    for b in range(0, nblocks, batch):
+        f = np.fft.fft(frames[b:b + batch], axis=-1)
+        f = np.fft.ifft(f[:, None, :] * h[None, :, :], axis=-1)[..., length - 1:]
+        y[:, b*step:(b + f.shape[0])*step] = f.transpose(1, 0, 2).reshape(2, -1)
+    y      = y[:, :npos:decimation]
+    acc[:, 0] = np.rint(y.real)
+    acc[:, 1] = np.rint(y.imag)
+    return acc
+
+def _macc_output(acc, macc_trunc, ow, maccs=2):
+    # Rounding, truncation and clamping of each MACC, then sum of the MACCs.
+    if maccs == 1:
+        acc = acc[:1] + acc[1:]
+    acc_init = (2**(macc_trunc - 1) if macc_trunc >= 1 else 0)
+    out      = clamp_nbits((acc + acc_init) >> macc_trunc, ow)
+    return clamp_nbits(np.sum(out, axis=0), ow)
+
+class MaiaSDRFIRModel:
+    """Streaming bit-exact model of MaiaSDRFIR.
+
+    Chunks of any size can be fed to `process`: the delay line and the decimation phase are kept
+    between calls, so concatenated outputs are identical to a single `model` call on the whole
+    capture while memory stays bounded by the chunk size.
+
+    `method` selects the MACC computation: "direct" (polyphase direct form), "fft" (float64 FFT
+    overlap-save, used only when proven exact for the processed data, direct form otherwise) or
+    "auto" ("fft" for long polyphase branches, where it is faster).
+
+    `maccs` is the number of MACCs per component: 2 for FIR4DSP (MaiaSDRFIR), 1 for FIR2DSP (second
+    stage of FIRDecimator3Stage).
+
+    `skip` leading input samples only fill the delay line: the first output is computed on input
+    sample `skip` (0 like `model`, `decimation - 1` like the gateware after reset).
+    """
+    def __init__(self, macc_trunc, ow, taps, decimation, method="auto", maccs=2, skip=0):
+        assert len(taps) % decimation == 0
+        assert method in ["auto", "direct", "fft"]
+        assert maccs in [1, 2]
+        assert 0 <= skip < decimation
+        self.macc_trunc = macc_trunc
+        self.ow         = ow
+        self.decimation = decimation
+        self.taps       = np.array(taps, 'int').reshape(-1, decimation)
+        self.method     = method
+        self.maccs      = maccs
+        self.skip       = skip
+        self.reset()
+
+    def reset(self):
+        # History (taps - 1 samples) followed by the samples of the current decimation phase.
+        self._buffer = np.zeros((2, self.taps.size - 1 - self.skip), 'int')
+
+    def _use_fft(self, x):
+        if self.method == "direct" or (self.method == "auto" and self.taps.shape[0] < 32):
+            return False
+        return _macc_fft_exact(self.taps, x, _macc_fft_size(self.taps))
+
+    def process(self, re_in, im_in):
+        x     = np.concatenate((self._buffer, np.array([re_in, im_in], 'int').reshape(2, -1)), axis=1)
+        nout  = max(x.shape[1] - (self.taps.size - 1), 0) // self.decimation
+        if self._use_fft(x):
+            acc = _macc_fft(self.taps, self.decimation, x, nout, _macc_fft_size(self.taps))
+        else:
+            dtype = _macc_dtype(self.taps, x, self.macc_trunc)
+            acc   = _macc_direct(self.taps.astype(dtype), self.decimation, x.astype(dtype), nout)
+        self._buffer = x[:, nout * self.decimation:]
+        re_out, im_out = _macc_output(acc, self.macc_trunc, self.ow, self.maccs).astype('int')
+        return re_out, im_out
+
+def model(macc_trunc, ow, taps, decimation, re_in, im_in, method="auto"):
+    return MaiaSDRFIRModel(macc_trunc, ow, taps, decimation, method).process(re_in, im_in)
+
+# Coefficient Banks --------------------------------------------------------------------------------
+
+def fir4dsp_banks(**kwargs):
+    """FIR4DSP with two coefficient banks (`coeff_wbank` written, `coeff_rbank` used).
+
+    Each coefficient RAM gets a bank address bit (for the default len_log2, both banks fit in the
+    BRAM18 already used). coeff_rbank is sampled when the coefficient read address is 0 (first
+    operation of an output sample) and held until the next one, so a swap never mixes the two banks
+    in an output sample.
+
+    The FIR4DSP logic is reused as is, its coefficient RAMs (maia_hdl Coefficients) being created
+    as BankedCoefficients (subclass with the bank signals): elaboration fails if maia_hdl no longer
+    creates them this way.
+    """
+    from types               import FunctionType
+    from amaranth.hdl        import Module, Signal, Cat, Mux
+    from amaranth.lib.memory import Memory
+    from maia_hdl.fir import FIR4DSP, Coefficients
+
+    class BankedCoefficients(Coefficients):
+        def __init__(self, *, wbank, rbank, **kwargs):
+            super().__init__(**kwargs)
+            self.wbank = wbank
+            self.rbank = rbank
+
+        def elaborate(self, platform):
+            m = Module()
+
+            m.submodules.mem = mem = Memory(shape=self.w, depth=2**(self.aw + 1), init=[])
+            rdport = mem.read_port()
+            wrport = mem.write_port()
+            rbank   = Signal()
+            rbank_q = Signal()
+            m.d.comb += rbank.eq(Mux(self.raddr == 0, self.rbank, rbank_q))
+            m.d.sync += [
+                rbank_q.eq(rbank),
+                self.rdata.eq(rdport.data),
+            ]
+            m.d.comb += [
+                rdport.en.eq(1),
+                rdport.addr.eq(Cat(self.raddr, rbank)),
+                wrport.en.eq(self.wren),
+                wrport.addr.eq(Cat(self.waddr, self.wbank)),
+                wrport.data.eq(self.wdata),
+            ]
+
+            return m
+
+    class FIR4DSPBanks(FIR4DSP):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.coeff_wbank = Signal()
+            self.coeff_rbank = Signal()
+
+        def elaborate(self, platform):
+            # FIR4DSP.elaborate with Coefficients resolved to the banked RAMs.
+            rams = []
+            def banked_coefficients(**kwargs):
+                rams.append(BankedCoefficients(wbank=self.coeff_wbank, rbank=self.coeff_rbank, **kwargs))
+                return rams[-1]
+            elaborate = FIR4DSP.elaborate
+            elaborate = FunctionType(elaborate.__code__,
+                dict(elaborate.__globals__, Coefficients=banked_coefficients),
+                elaborate.__name__, elaborate.__defaults__, elaborate.__closure__)
+            m = elaborate(self, platform)
+            if len(rams) != 2 or [m.submodules.coeffs0, m.submodules.coeffs1] != rams:
+                raise RuntimeError("fir4dsp_banks: FIR4DSP coefficient RAMs not found, unsupported maia_hdl version.")
+            return m
+
+    return FIR4DSPBanks(**kwargs)
 
 # Generator ----------------------------------------------------------------------------------------
 
 def fir_generator(output_path,
-    data_in_width  = 16,
-    data_out_width = 16,
-    coeff_width    = 18,
-    decim_width    = 7,
-    oper_width     = 7,
-    macc_trunc     = 19,
-    len_log2       = 8, # Maximum FIR length is log2
+    data_in_width    = 16,
+    data_out_width   = 16,
+    coeff_width      = 18,
+    decim_width      = 7,
+    oper_width       = 7,
+    macc_trunc       = 19,
+    len_log2         = 8, # Maximum FIR length is log2
+    with_coeff_banks = False,
     ):
 
     from amaranth.back.verilog import convert
     from maia_hdl.pluto_platform import PlutoPlatform
     from maia_hdl.fir import FIR4DSP
-    fir = FIR4DSP(
+    fir = {False: FIR4DSP, True: fir4dsp_banks}[with_coeff_banks](
         in_width    = data_in_width,
         out_width   = data_out_width,
         coeff_width = coeff_width,
@@ -108,6 +312,7 @@ def fir_generator(output_path,
 
     ports=[
         fir.coeff_waddr, fir.coeff_wren, fir.coeff_wdata,
+        *([fir.coeff_wbank, fir.coeff_rbank] if with_coeff_banks else []),
         fir.decimation,
         fir.operations_minus_one,
         fir.odd_operations,
@@ -126,25 +331,111 @@ def fir_generator(output_path,
 
     print('wrote verilog to', output_path)
 
+# Coefficients Clock Domain Crossing --------------------------------------------------------------
+
+class MaiaSDRFIRCoeffCDC(LiteXModule):
+    """Coefficient writes from sys to the FIR clk_domain (async FIFO, one write per beat).
+
+    The read bank (`rbank`, sys) goes through the same FIFO, as a tagged word sent when it changes
+    (before the next writes): `source_rbank` (clk_domain) only switches once the writes queued
+    ahead of the swap are out, so a new bank never goes live half-written.
+
+    `reset` (sys, level) clears both sides of the FIFO: it is synchronized to clk_domain and back,
+    the sys side being held in reset until the clk_domain one is, so that the pointers restart
+    together and a restarted upload doesn't replay the writes of the interrupted one. The read bank
+    is sent again once released.
+    """
+    def __init__(self, len_log2=8, coeff_width=18, clk_domain="fir", depth=16):
+        layout = [("addr", len_log2), ("data", coeff_width), ("bank", 1)]
+        self.sink         = sink   = stream.Endpoint(layout)
+        self.source       = source = stream.Endpoint(layout)
+        self.rbank        = Signal()
+        self.source_rbank = Signal()
+        self.reset        = Signal()
+
+        # # #
+
+        self.cdc = cdc = ResetInserter(["sys", clk_domain])(stream.ClockDomainCrossing(
+            layout + [("swap", 1)],
+            cd_from = "sys",
+            cd_to   = clk_domain,
+            depth   = depth,
+        ))
+
+        # Reset (sys -> clk_domain -> sys), no write accepted until both sides are released.
+        reset_sys = Signal()
+        reset_cd  = Signal()
+        reset_ack = Signal()
+        self.specials += [
+            MultiReg(self.reset, reset_cd, odomain=clk_domain),
+            MultiReg(reset_cd, reset_ack),
+        ]
+        self.comb += [
+            reset_sys.eq(self.reset | reset_ack),
+            getattr(cdc, "reset_sys").eq(reset_sys),
+            getattr(cdc, f"reset_{clk_domain}").eq(reset_cd),
+        ]
+
+        # Writes and read bank swaps (sys).
+        rbank_sent = Signal()
+        resend     = Signal(reset=1)
+        swap       = Signal()
+        self.comb += [
+            swap.eq((self.rbank != rbank_sent) | resend),
+            sink.ready.eq(cdc.sink.ready & ~reset_sys & ~swap),
+            If(swap,
+                cdc.sink.valid.eq(~reset_sys),
+                cdc.sink.swap.eq(1),
+                cdc.sink.bank.eq(self.rbank),
+            ).Else(
+                sink.connect(cdc.sink, omit={"valid", "ready"}),
+                cdc.sink.valid.eq(sink.valid & ~reset_sys),
+            )
+        ]
+        self.sync += [
+            If(reset_sys,
+                resend.eq(1),
+            ).Elif(cdc.sink.valid & cdc.sink.ready & cdc.sink.swap,
+                rbank_sent.eq(cdc.sink.bank),
+                resend.eq(0),
+            )
+        ]
+
+        # Writes and read bank (clk_domain).
+        self.comb += [
+            cdc.source.connect(source, omit={"valid", "ready", "swap"}),
+            source.valid.eq(cdc.source.valid & ~cdc.source.swap),
+            cdc.source.ready.eq(source.ready | cdc.source.swap),
+        ]
+        sync_cd  = getattr(self.sync, clk_domain)
+        sync_cd += If(cdc.source.valid & cdc.source.swap,
+            self.source_rbank.eq(cdc.source.bank),
+        )
+
 # MaiaSDRFIR ---------------------------------------------------------------------------------------
 
 class MaiaSDRFIR(LiteXModule):
     def __init__(self, platform,
-        data_in_width  = 16,
-        data_out_width = 16,
-        coeff_width    = 18,
-        decim_width    = 7,
-        oper_width     = 7,
-        macc_trunc     = 19,
-        len_log2       = 8,
-        clk_domain     = "sys",
-        with_csr       = True,
+        data_in_width    = 16,
+        data_out_width   = 16,
+        coeff_width      = 18,
+        decim_width      = 7,
+        oper_width       = 7,
+        macc_trunc       = 19,
+        len_log2         = 8,
+        clk_domain       = "sys",
+        with_coeff_banks = False,
+        with_coeff_sink  = False,
+        with_csr         = True,
         ):
 
         # Streams ----------------------------------------------------------------------------------
         self.sink   = sink        = stream.Endpoint([("re", data_in_width), ("im", data_in_width)])
         self.source = source      = stream.Endpoint([("re", data_out_width), ("im", data_out_width)])
 
+        # Coefficients (addr, data) beats (with_coeff_sink, one per clock cycle).
+        self.coeff_sink           = stream.Endpoint([("data", coeff_width), ("addr", len_log2)])
+
         # Parameters/Locals ------------------------------------------------------------------------
         self.platform             = platform
         self.data_in_width        = data_in_width
@@ -154,6 +445,7 @@ class MaiaSDRFIR(LiteXModule):
         self.oper_width           = oper_width
         self.macc_trunc           = macc_trunc
         self.len_log2             = len_log2
+        self.with_coeff_banks     = with_coeff_banks
 
         # Decimation -------------------------------------------------------------------------------
         self.decimation           = Signal(decim_width)
@@ -163,14 +455,69 @@ class MaiaSDRFIR(LiteXModule):
         self.coeff_waddr          = Signal(len_log2)
         self.coeff_wdata          = Signal(coeff_width)
 
+        # FIR Coefficient Banks (with_coeff_banks) -------------------------------------------------
+        self.coeff_wbank          = Signal()
+        self.coeff_rbank          = Signal()
+
         # Operations Minus One ---------------------------------------------------------------------
         self.operations_minus_one = Signal(oper_width)
 
         # Odd Operations ---------------------------------------------------------------------------
         self.odd_operations       = Signal()
 
+        # Coefficient write accepted (clk_domain != "sys": CDC FIFO not full) ----------------------
+        self.coeff_ready          = Signal(reset=1)
+
+        # Reset (clears the pending coefficient writes) -------------------------------------------
+        self.reset                = Signal()
+
         # # #
 
+        # Clock Domain Crossing --------------------------------------------------------------------
+        # FIR clocked by clk_domain (faster DSP clock): samples and coefficient writes through async
+        # FIFOs (read bank swaps ordered with the writes), quasi-static configuration
+        # (decimation/operations) through MultiRegs.
+        ip_sink   = sink
+        ip_source = source
+        ip_ctrl   = [self.decimation, self.operations_minus_one, self.odd_operations]
+        ip_coeff  = [self.coeff_wren, self.coeff_waddr, self.coeff_wdata, self.coeff_wbank, self.coeff_rbank]
+        if clk_domain != "sys":
+            ip_sink   = stream.Endpoint(sink.description)
+            ip_source = stream.Endpoint(source.description)
+            self.cdc_sink   = stream.ClockDomainCrossing(sink.description,
+                cd_from = "sys",
+                cd_to   = clk_domain,
+                depth   = 16,
+            )
+            self.cdc_source = stream.ClockDomainCrossing(source.description,
+                cd_from = clk_domain,
+                cd_to   = "sys",
+                depth   = 16,
+            )
+            self.cdc_coeff  = MaiaSDRFIRCoeffCDC(len_log2, coeff_width, clk_domain)
+            self.comb += [
+                sink.connect(self.cdc_sink.sink),
+                self.cdc_sink.source.connect(ip_sink),
+                ip_source.connect(self.cdc_source.sink),
+                self.cdc_source.source.connect(source),
+
+                self.cdc_coeff.reset.eq(self.reset),
+                self.cdc_coeff.sink.valid.eq(self.coeff_wren),
+                self.cdc_coeff.sink.addr.eq(self.coeff_waddr),
+                self.cdc_coeff.sink.data.eq(self.coeff_wdata),
+                self.cdc_coeff.sink.bank.eq(self.coeff_wbank),
+                self.cdc_coeff.rbank.eq(self.coeff_rbank),
+                self.cdc_coeff.source.ready.eq(1),
+                self.coeff_ready.eq(self.cdc_coeff.sink.ready),
+            ]
+            ip_coeff = [self.cdc_coeff.source.valid, self.cdc_coeff.source.addr,
+                self.cdc_coeff.source.data, self.cdc_coeff.source.bank, self.cdc_coeff.source_rbank]
+            ctrl     = ip_ctrl
+            ip_ctrl  = [Signal.like(c) for c in ctrl]
+            self.specials += [MultiReg(c, ip_c, odomain=clk_domain) for c, ip_c in zip(ctrl, ip_ctrl)]
+        ip_wren, ip_waddr, ip_wdata, ip_wbank, ip_rbank = ip_coeff
+        ip_decimation, ip_operations_minus_one, ip_odd_operations = ip_ctrl
+
         # FIR Instance -----------------------------------------------------------------------------
 
         self.ip_name   = "fir"
@@ -181,36 +528,71 @@ class MaiaSDRFIR(LiteXModule):
             i_rst                  = ResetSignal(clk_domain),
 
             # FIR Coefficient.
-            i_coeff_wren           = self.coeff_wren,
-            i_coeff_wdata          = self.coeff_wdata,
-            i_coeff_waddr          = self.coeff_waddr,
+            i_coeff_wren           = ip_wren,
+            i_coeff_wdata          = ip_wdata,
+            i_coeff_waddr          = ip_waddr,
 
             # Decimation.
-            i_decimation           = self.decimation,
+            i_decimation           = ip_decimation,
 
             # Operations Minus One.
-            i_operations_minus_one = self.operations_minus_one,
+            i_operations_minus_one = ip_operations_minus_one,
 
             # Number of Operations.
-            i_odd_operations       = self.odd_operations,
+            i_odd_operations       = ip_odd_operations,
 
             # Input
-            i_re_in                = sink.re,
-            i_im_in                = sink.im,
-            i_in_valid             = sink.valid,
-            o_in_ready             = sink.ready,
+            i_re_in                = ip_sink.re,
+            i_im_in                = ip_sink.im,
+            i_in_valid             = ip_sink.valid,
+            o_in_ready             = ip_sink.ready,
 
             # Output
-            o_re_out               = source.re,
-            o_im_out               = source.im,
-            o_strobe_out           = source.valid,
+            o_re_out               = ip_source.re,
+            o_im_out               = ip_source.im,
+            o_strobe_out           = ip_source.valid,
         )
 
+        # FIR Coefficient Banks.
+        if with_coeff_banks:
+            self.ip_params.update(
+                i_coeff_wbank = ip_wbank,
+                i_coeff_rbank = ip_rbank,
+            )
+
         self.specials += Instance(self.ip_name, **self.ip_params)
 
+        # Verilog generation (in background, joined in do_finalize).
+        self.verilog_job = VerilogJob(fir_generator, self.ip_name + ".v",
+            params     = dict(
+                data_in_width    = self.data_in_width,
+                data_out_width   = self.data_out_width,
+                coeff_width      = self.coeff_width,
+                decim_width      = self.decim_width,
+                oper_width       = self.oper_width,
+                macc_trunc       = self.macc_trunc,
+                len_log2         = self.len_log2,
+                with_coeff_banks = self.with_coeff_banks,
+            ),
+        )
+
         if with_csr:
             self.with_csr()
 
+        if with_coeff_sink:
+            self.add_coeff_sink()
+
+    def add_coeff_sink(self):
+        # Burst coefficients writes, taking precedence over the CSRs ones.
+        self.comb += [
+            self.coeff_sink.ready.eq(self.coeff_ready),
+            If(self.coeff_sink.valid,
+                self.coeff_wren.eq(1),
+                self.coeff_waddr.eq(self.coeff_sink.addr),
+                self.coeff_wdata.eq(self.coeff_sink.data),
+            )
+        ]
+
     def with_csr(self):
         self._cfg = CSRStorage(description="Configuration Register.", fields=[
             CSRField("odd_operations", size=1, offset=0,         description="ODD Operation"),
@@ -223,6 +605,9 @@ class MaiaSDRFIR(LiteXModule):
 
         self._operations_minus_one = CSRStorage(self.oper_width, description="Operations Minus One Stage.")
 
+        if self.with_coeff_banks:
+            self.add_coeff_banks_csr()
+
         self.comb += [
             # Decimations.
             self.decimation.eq(self._decimation.storage),
@@ -239,22 +624,29 @@ class MaiaSDRFIR(LiteXModule):
             self.odd_operations.eq(self._cfg.fields.odd_operations),
         ]
 
+    def add_coeff_banks_csr(self):
+        self._coeff_bank = CSRStorage(name="coeff_bank", description="FIR Coefficient Banks Control.", fields=[
+            CSRField("shadow", size=1, offset=0, description="Write the coefficients to the inactive bank."),
+            CSRField("swap",   size=1, offset=1, pulse=True,
+                description="Swap the banks (the FIR switches on its next output sample)."),
+        ])
+        self._coeff_bank_status = CSRStatus(name="coeff_bank_status", description="FIR Coefficient Banks Status.", fields=[
+            CSRField("active", size=1, offset=0, description="Bank used by the FIR."),
+        ])
+
+        active = Signal()
+        self.sync += If(self._coeff_bank.fields.swap, active.eq(~active))
+        self.comb += [
+            self.coeff_rbank.eq(active),
+            self.coeff_wbank.eq(active ^ self._coeff_bank.fields.shadow),
+            self._coeff_bank_status.fields.active.eq(active),
+        ]
+
     def do_finalize(self):
         src_dir  = os.path.join(self.platform.output_dir, "maia_hdl_fir")
-        v_file   = os.path.join(src_dir, self.ip_name + ".v")
 
         # Create verilog files when not present.
         if not os.path.exists(src_dir):
             os.mkdir(src_dir)
 
-        fir_generator(output_path=v_file,
-            data_in_width  = self.data_in_width,
-            data_out_width = self.data_out_width,
-            coeff_width    = self.coeff_width,
-            decim_width    = self.decim_width,
-            oper_width     = self.oper_width,
-            macc_trunc     = self.macc_trunc,
-            len_log2       = self.len_log2,
-        )
-
-        self.platform.add_source(v_file)
+        self.platform.add_source(self.verilog_job.join(src_dir))
@@ -15,6 +15,93 @@ from litex.soc.interconnect     import stream
 from litex.soc.interconnect.csr import *
 
 from .clk_nx_common_edge import ClkNxCommonEdge
+from .verilog_cache      import VerilogJob
+from .maia_sdr_fir       import MaiaSDRFIRModel as MaiaSDRFIRStageModel
+from .maia_sdr_fir       import compute_coefficients as compute_stage_coefficients
+from .maia_sdr_fir       import MaiaSDRFIRCoeffCDC
+
+# Constants ----------------------------------------------------------------------------------------
+
+COEFFS           = 1024 # 4 regions of 256 coefficients, 2 MSBs of the address select the stage.
+COEFF_ADDR_WIDTH = bits_for(COEFFS - 1)
+
+# Utils --------------------------------------------------------------------------------------------
+
+def compute_coefficients(taps=[[], [], []], decimation=[1, 1, 1]):
+    """Map the taps of the three stages into the COEFFS (COEFF_ADDR_WIDTH-bit) `coeff_waddr` space.
+
+    The 2 MSBs of `coeff_waddr` select the stage. Stages 1 and 3 (FIR4DSP, 256 coefficients) use the
+    MaiaSDRFIR layout (see `maia_sdr_fir.compute_coefficients`), stage 2 (FIR2DSP, 128 coefficients)
+    performs one multiply per operation and only decodes 7 address bits (its coefficients are
+    mirrored in the aliased upper half). Each stage length must be a multiple of its decimation; an
+    empty tap list leaves the stage unprogrammed (bypassed stage).
+
+    Returns the per-stage operations, the odd_operations flags of stages 1 and 3 and the COEFFS
+    coefficients to write.
+    """
+    operations     = [0, 0, 0]
+    odd_operations = [False, False]
+    coeffs         = np.zeros(COEFFS, 'int')
+    for stage, (t, dec) in enumerate(zip(taps, decimation)):
+        t = np.array(t, 'int')
+        if t.size == 0:
+            continue
+        assert t.size % dec == 0
+        num_mult = t.size // dec
+        if stage == 1:
+            assert t.size <= 128
+            op     = num_mult
+            region = np.zeros(128, 'int')
+            for j in range(op):
+                region[j::op][:dec] = t[j*dec:][:dec][::-1]
+        else:
+            assert (num_mult + 1) // 2 * dec <= 128
+            op  = (num_mult + 1) // 2
+            odd = bool(num_mult % 2)
+            _, _, region = compute_stage_coefficients(op, dec, odd, 256, t)
+            odd_operations[stage // 2] = odd
+        operations[stage] = op
+        coeffs[256*stage:][:region.size] = region
+    # Stage 2 only decodes 7 address bits: mirror its coefficients in the aliased upper half so that
+    # writing the whole table is harmless.
+    coeffs[384:512] = coeffs[256:384]
+    return operations, odd_operations, coeffs
+
+# Model --------------------------------------------------------------------------------------------
+
+class MaiaSDRFIRModel:
+    """Streaming bit-exact model of the three-stage MaiaSDRFIR (FIRDecimator3Stage).
+
+    Cascades the stage models (FIR4DSP, FIR2DSP, FIR4DSP) with their own decimation, `macc_trunc` and
+    output width; `bypass2`/`bypass3` skip stages 2/3 as the gateware does. Each stage follows the
+    gateware decimation phase (first output on its `decimation`-th input sample) so that outputs
+    line up with a capture started after reset. Stages keep their state between `process` calls, so
+    chunks of any size can be fed.
+    """
+    def __init__(self, macc_trunc, ow, taps, decimation, bypass2=False, bypass3=False, method="auto"):
+        self.bypass = [False, bypass2, bypass3]
+        self.stages = [
+            MaiaSDRFIRStageModel(macc_trunc[j], ow[j], taps[j], decimation[j],
+                method = method,
+                maccs  = {True: 1, False: 2}[j == 1],
+                skip   = decimation[j] - 1,
+            ) if not self.bypass[j] else None
+            for j in range(3)]
+
+    def reset(self):
+        for stage in self.stages:
+            if stage is not None:
+                stage.reset()
+
+    def process(self, re_in, im_in):
+        re, im = re_in, im_in
+        for stage in self.stages:
+            if stage is not None:
+                re, im = stage.process(re, im)
+        return np.array(re, 'int'), np.array(im, 'int')
+
+def model(macc_trunc, ow, taps, decimation, re_in, im_in, bypass2=False, bypass3=False, method="auto"):
+    return MaiaSDRFIRModel(macc_trunc, ow, taps, decimation, bypass2, bypass3, method).process(re_in, im_in)
 
 # Generator ----------------------------------------------------------------------------------------
 
@@ -65,20 +152,24 @@ def fir_generator(output_path,
 
 class MaiaSDRFIR(LiteXModule):
     def __init__(self, platform,
-        data_in_width  = 12,
-        data_out_width = [16] * 3,
-        coeff_width    = 18,
-        decim_width    = [7, 6, 7],
-        oper_width     = [7, 6, 7],
-        macc_trunc     = [17, 18, 18],
-        clk_domain     = "sys",
-        with_csr       = True,
+        data_in_width   = 12,
+        data_out_width  = [16] * 3,
+        coeff_width     = 18,
+        decim_width     = [7, 6, 7],
+        oper_width      = [7, 6, 7],
+        macc_trunc      = [17, 18, 18],
+        clk_domain      = "sys",
+        with_coeff_sink = False,
+        with_csr        = True,
         ):
 
         # Streams ----------------------------------------------------------------------------------
         self.sink   = sink          = stream.Endpoint([("re", data_in_width), ("im", data_in_width)])
         self.source = source        = stream.Endpoint([("re", data_out_width), ("im", data_out_width)])
 
+        # Coefficients (addr, data) beats (with_coeff_sink, one per clock cycle).
+        self.coeff_sink             = stream.Endpoint([("data", coeff_width), ("addr", COEFF_ADDR_WIDTH)])
+
         # Parameters/Locals ------------------------------------------------------------------------
         self.platform               = platform
         self.data_in_width          = data_in_width
@@ -99,9 +190,12 @@ class MaiaSDRFIR(LiteXModule):
 
         # FIR Coefficient --------------------------------------------------------------------------
         self.coeff_wren            = Signal()
-        self.coeff_waddr           = Signal(10)          # FIXME: size
+        self.coeff_waddr           = Signal(COEFF_ADDR_WIDTH)
         self.coeff_wdata           = Signal(coeff_width)
 
+        # Coefficient write accepted (clk_domain != "sys": CDC FIFO not full) ----------------------
+        self.coeff_ready           = Signal(reset=1)
+
         # Operations Minus One ---------------------------------------------------------------------
         self.operations_minus_one1 = Signal(oper_width[0])
         self.operations_minus_one2 = Signal(oper_width[1])
@@ -113,6 +207,22 @@ class MaiaSDRFIR(LiteXModule):
 
         # # #
 
+        # Coefficients Clock Domain Crossing -------------------------------------------------------
+        # FIR clocked by clk_domain: coefficient writes through an async FIFO (see MaiaSDRFIR).
+        ip_wren, ip_waddr, ip_wdata = self.coeff_wren, self.coeff_waddr, self.coeff_wdata
+        if clk_domain != "sys":
+            self.cdc_coeff = MaiaSDRFIRCoeffCDC(COEFF_ADDR_WIDTH, coeff_width, clk_domain)
+            self.comb += [
+                self.cdc_coeff.sink.valid.eq(self.coeff_wren),
+                self.cdc_coeff.sink.addr.eq(self.coeff_waddr),
+                self.cdc_coeff.sink.data.eq(self.coeff_wdata),
+                self.cdc_coeff.source.ready.eq(1),
+                self.coeff_ready.eq(self.cdc_coeff.sink.ready),
+            ]
+            ip_wren  = self.cdc_coeff.source.valid
+            ip_waddr = self.cdc_coeff.source.addr
+            ip_wdata = self.cdc_coeff.source.data
+
         # FIR Instance -----------------------------------------------------------------------------
 
         self.ip_name   = "fir"
@@ -123,9 +233,9 @@ class MaiaSDRFIR(LiteXModule):
             i_rst                   = ResetSignal(clk_domain),
 
             # FIR Coefficient.
-            i_coeff_wren            = self.coeff_wren,
-            i_coeff_wdata           = self.coeff_wdata,
-            i_coeff_waddr           = self.coeff_waddr,
+            i_coeff_wren            = ip_wren,
+            i_coeff_wdata           = ip_wdata,
+            i_coeff_waddr           = ip_waddr,
 
             # Decimation.
             i_decimation1           = self.decimation1,
@@ -158,9 +268,35 @@ class MaiaSDRFIR(LiteXModule):
 
         self.specials += Instance(self.ip_name, **self.ip_params)
 
+        # Verilog generation (in background, joined in do_finalize).
+        self.verilog_job = VerilogJob(fir_generator, self.ip_name + ".v",
+            params     = dict(
+                data_in_width  = self.data_in_width,
+                data_out_width = self.data_out_width,
+                coeff_width    = self.coeff_width,
+                decim_width    = self.decim_width,
+                oper_width     = self.oper_width,
+                macc_trunc     = self.macc_trunc,
+            ),
+        )
+
         if with_csr:
             self.with_csr()
 
+        if with_coeff_sink:
+            self.add_coeff_sink()
+
+    def add_coeff_sink(self):
+        # Burst coefficients writes, taking precedence over the CSRs ones.
+        self.comb += [
+            self.coeff_sink.ready.eq(self.coeff_ready),
+            If(self.coeff_sink.valid,
+                self.coeff_wren.eq(1),
+                self.coeff_waddr.eq(self.coeff_sink.addr),
+                self.coeff_wdata.eq(self.coeff_sink.data),
+            )
+        ]
+
     def with_csr(self):
         self._cfg = CSRStorage(description="Configuration Register.", fields=[
             CSRField("bypass2",         size=1, offset=0,            description="Bypass FIR stage 2."),
@@ -173,7 +309,7 @@ class MaiaSDRFIR(LiteXModule):
         self._decimation2 = CSRStorage(self.decim_width[1],          description="Decimation factor for Stage2.")
         self._decimation3 = CSRStorage(self.decim_width[2],          description="Decimation factor for Stage3.")
 
-        self._coeff_waddr = CSRStorage(10,                           description="FIR Coefficient Address.") # FIXME: size
+        self._coeff_waddr = CSRStorage(COEFF_ADDR_WIDTH,             description="FIR Coefficient Address.")
         self._coeff_wdata = CSRStorage(self.coeff_width,             description="FIR Coefficient Data.")
 
         self._operations_minus_one1 = CSRStorage(self.oper_width[0], description="Operations Minus One Stage 1.")
@@ -207,19 +343,9 @@ class MaiaSDRFIR(LiteXModule):
 
     def do_finalize(self):
         src_dir  = os.path.join(self.platform.output_dir, "maia_hdl_fir")
-        v_file   = os.path.join(src_dir, self.ip_name + ".v")
 
         # Create verilog files when not present.
         if not os.path.exists(src_dir):
             os.mkdir(src_dir)
 
-        fir_generator(output_path=v_file,
-            data_in_width  = self.data_in_width,
-            data_out_width = self.data_out_width,
-            coeff_width    = self.coeff_width,
-            decim_width    = self.decim_width,
-            oper_width     = self.oper_width,
-            macc_trunc     = self.macc_trunc,
-        )
-
-        self.platform.add_source(v_file)
+        self.platform.add_source(self.verilog_job.join(src_dir))
@@ -0,0 +1,166 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+# Overlap Model ------------------------------------------------------------------------------------
+
+def model(order_log2, re_in, im_in, ratio):
+    """FFT input frames produced by OverlapBuffer (as (frames, 2**order_log2) re/im arrays).
+
+    `ratio` is the overlap setting: frames of 2**order_log2 samples start every
+    2**(order_log2 - ratio) input samples (0: no overlap, 1: 50%, 2: 75%).
+    """
+    n      = 2**order_log2
+    hop    = n >> ratio
+    re_in  = np.asarray(re_in)
+    im_in  = np.asarray(im_in)
+    starts = range(0, len(re_in) - n + 1, hop)
+    re     = np.array([re_in[s:s + n] for s in starts]).reshape(-1, n)
+    im     = np.array([im_in[s:s + n] for s in starts]).reshape(-1, n)
+    return re, im
+
+# Overlap Buffer -----------------------------------------------------------------------------------
+
+class OverlapBuffer(LiteXModule):
+    """Overlapping frames buffer in front of MaiaSDRFFT.
+
+    Input samples are written in a 2 x 2**order_log2 deep BRAM and, every 2**(order_log2 - ratio)
+    samples (`ratio` 0: no overlap, 1: 50%, 2: 75%), the last 2**order_log2 ones are replayed as a
+    frame at one sample per clock cycle (with `last` on the frame's last sample). The output rate
+    is the input one multiplied by 2**ratio and must stay below one sample per clock cycle: a frame
+    triggered while one is still emitted is queued (one deep, the BRAM allows it), a frame
+    triggered with one already queued is dropped (counted in `dropped`). Only complete frames are
+    emitted, so the FFT stays aligned.
+
+    Like MaiaSDRFFT, the module has no backpressure (sink is always ready, source.ready is ignored).
+    """
+    def __init__(self, data_width=16, order_log2=10, with_csr=True):
+        n = 2**order_log2
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint([("re", data_width), ("im", data_width)])
+        self.source = source = stream.Endpoint([("re", data_width), ("im", data_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset   = Signal()
+        self.ratio   = Signal(2)
+        self.dropped = Signal(32)
+
+        # Parameters/Locals ------------------------------------------------------------------------
+        self.order_log2 = order_log2
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        # Buffer (2 frames: a frame can be replayed while the next one is written).
+        mem    = Memory(2 * data_width, 2 * n)
+        wrport = mem.get_port(write_capable=True)
+        rdport = mem.get_port()
+        self.specials += mem, wrport, rdport
+
+        # Write side.
+        wr_ptr  = Signal(order_log2 + 1)
+        filled  = Signal()
+        hop     = Signal(order_log2)
+        hop_end = Signal()
+        trigger = Signal()
+        self.comb += [
+            wrport.adr.eq(wr_ptr),
+            wrport.dat_w.eq(Cat(sink.re, sink.im)),
+            wrport.we.eq(sink.valid & ~self.reset),
+            hop_end.eq(hop >= ((n >> self.ratio) - 1)),
+            trigger.eq(sink.valid & hop_end & (filled | (wr_ptr == (n - 1)))),
+        ]
+        self.sync += [
+            If(self.reset,
+                wr_ptr.eq(0),
+                filled.eq(0),
+                hop.eq(0),
+            ).Elif(sink.valid,
+                wr_ptr.eq(wr_ptr + 1),
+                If(wr_ptr == (n - 1),
+                    filled.eq(1),
+                ),
+                hop.eq(hop + 1),
+                If(hop_end,
+                    hop.eq(0),
+                )
+            )
+        ]
+
+        # Frames queue (one deep).
+        busy        = Signal()
+        start       = Signal()
+        pending     = Signal()
+        pending_end = Signal(order_log2 + 1)
+        self.comb += start.eq(~busy & pending)
+        self.sync += [
+            If(self.reset,
+                pending.eq(0),
+                self.dropped.eq(0),
+            ).Elif(trigger,
+                If(pending & ~start,
+                    self.dropped.eq(self.dropped + 1),
+                ).Else(
+                    pending.eq(1),
+                    pending_end.eq(wr_ptr + 1),
+                )
+            ).Elif(start,
+                pending.eq(0),
+            )
+        ]
+
+        # Read side (replay of the 2**order_log2 samples preceding pending_end).
+        rd_ptr   = Signal(order_log2 + 1)
+        rd_count = Signal(order_log2)
+        rd_last  = Signal()
+        self.comb += [
+            rd_last.eq(rd_count == (n - 1)),
+            rdport.adr.eq(rd_ptr),
+        ]
+        self.sync += [
+            If(self.reset,
+                busy.eq(0),
+            ).Elif(start,
+                busy.eq(1),
+                rd_ptr.eq(pending_end - n),
+                rd_count.eq(0),
+            ).Elif(busy,
+                rd_ptr.eq(rd_ptr + 1),
+                rd_count.eq(rd_count + 1),
+                If(rd_last,
+                    busy.eq(0),
+                )
+            ),
+            source.valid.eq(busy & ~self.reset),
+            source.last.eq(rd_last),
+        ]
+        self.comb += [
+            source.re.eq(rdport.dat_r[:data_width]),
+            source.im.eq(rdport.dat_r[data_width:]),
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._ratio   = CSRStorage(2,  name="ratio",   description="Overlap of the FFT frames (0: none, 1: 50%, 2: 75%).")
+        self._dropped = CSRStatus(32, name="dropped", description="Frames dropped (output rate above 1 sample/cycle).")
+
+        self.comb += [
+            self.ratio.eq(self._ratio.storage),
+            self._dropped.status.eq(self.dropped),
+        ]
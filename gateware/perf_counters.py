@@ -0,0 +1,55 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect.csr import *
+
+# Perf Counters ------------------------------------------------------------------------------------
+
+class PerfCounters(LiteXModule):
+    """Event counters exposed through CSRStatus snapshots.
+
+    Counters run continuously; a write to `control.latch` copies all of them to their CSRs on the
+    same clock cycle (so they can be read consistently), `control.clear` resets them.
+    """
+    def __init__(self):
+        self._control = CSRStorage(name="control", description="Performance Counters Control.", fields=[
+            CSRField("latch", size=1, offset=0, pulse=True, description="Snapshot all the counters to their CSRs."),
+            CSRField("clear", size=1, offset=1, pulse=True, description="Clear all the counters."),
+        ])
+        self.latch = self._control.fields.latch
+        self.clear = self._control.fields.clear
+
+    def add_counter(self, name, event, width=64, description=""):
+        """Count the cycles `event` is high (in `name` CSR)."""
+        count = Signal(width)
+        csr   = CSRStatus(width, name=name, description=description)
+        setattr(self, f"_{name}", csr)
+        self.sync += [
+            If(self.clear,
+                count.eq(0),
+            ).Elif(event,
+                count.eq(count + 1),
+            ),
+            If(self.latch,
+                csr.status.eq(count),
+            )
+        ]
+        return count
+
+    def add_stream(self, name, endpoint, width=64, with_frames=False):
+        """Count the transfers, stalls (and frames) of a stream Endpoint (passive)."""
+        self.add_counter(f"{name}_transfers", endpoint.valid &  endpoint.ready, width,
+            description=f"{name}: samples accepted (valid & ready).")
+        self.add_counter(f"{name}_stalls",    endpoint.valid & ~endpoint.ready, width,
+            description=f"{name}: cycles with valid but not ready.")
+        if with_frames:
+            self.add_counter(f"{name}_frames", endpoint.valid & endpoint.ready & endpoint.last, 32,
+                description=f"{name}: frames completed (valid & ready & last).")
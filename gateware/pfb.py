@@ -0,0 +1,446 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from functools import reduce
+from operator  import add
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+from gateware.frame_buffer import FrameBuffer
+from gateware.maia_sdr_fft  import digit_reversed
+
+# Constants ----------------------------------------------------------------------------------------
+
+CHANNELS_HEADER_MAGIC = 0xcf5a
+
+# Utils --------------------------------------------------------------------------------------------
+
+def prototype(order_log2=10, taps=4, coeff_width=18):
+    """Windowed-sinc (Blackman) prototype lowpass of the channelizer: taps x 2**order_log2
+    coefficients, cutoff at half the channel spacing, peak scaled to coeff_width signed bits."""
+    n = 2**order_log2
+    t = (np.arange(taps * n) - (taps * n - 1) / 2) / n
+    h = np.sinc(t) * np.blackman(taps * n)
+    return np.round(h / np.max(np.abs(h)) * (2**(coeff_width - 1) - 1)).astype(np.int64)
+
+def channels_header_words(nchannels):
+    """32-bit words of a ChannelSelector frame header (64-bit header + channel ids, 2 per word, even
+    number of words) for nchannels channels (rounded up to even)."""
+    pairs = (nchannels + 1) // 2
+    return 2 + pairs + pairs % 2
+
+def frame_words(nchannels):
+    """32-bit words of a ChannelSelector frame (header + samples) for nchannels channels."""
+    return channels_header_words(nchannels) + nchannels + nchannels % 2
+
+def channels_header(channels, order_log2=10):
+    """Frame header words of the (even count) channels ids (as emitted by ChannelSelector, 16-bit
+    re in the LSBs, im in the MSBs):
+
+    - [15: 0]: CHANNELS_HEADER_MAGIC.
+    - [31:16]: Channels in the frame.
+    - [47:32]: order_log2.
+    - [63:48]: CHANNELS_HEADER_MAGIC.
+    - Channel ids (natural order), 2 per word (first in the LSBs), 0xffff after the last one.
+    """
+    assert len(channels) % 2 == 0
+    nhdr  = channels_header_words(len(channels))
+    ids   = list(channels) + [0xffff] * (2 * (nhdr - 2) - len(channels))
+    words = [CHANNELS_HEADER_MAGIC | len(channels) << 16,
+        order_log2 | CHANNELS_HEADER_MAGIC << 16]
+    return words + [ids[2 * k] | ids[2 * k + 1] << 16 for k in range(nhdr - 2)]
+
+def decode(words, order_log2=10):
+    """Split a stream of ChannelSelector 32-bit words (16-bit re/im) in (channel ids, complex
+    samples) frames.
+
+    Words before the first header (partial capture) are skipped, frames whose header is corrupted
+    end the parsing (the stream is out of sync).
+    """
+    words = [int(w) for w in words]
+    def channels_at(i):
+        if i + 2 > len(words) or words[i] & 0xffff != CHANNELS_HEADER_MAGIC:
+            return None
+        nchannels = words[i] >> 16
+        nhdr      = channels_header_words(nchannels)
+        if nchannels % 2:
+            return None
+        ids       = [(w >> s) & 0xffff for w in words[i + 2:i + nhdr] for s in [0, 16]][:nchannels]
+        return ids if channels_header(ids, order_log2) == words[i:i + nhdr] else None
+    frames = []
+    i      = 0
+    while i < len(words) and channels_at(i) is None:
+        i += 1
+    while True:
+        ids = channels_at(i)
+        if ids is None or i + frame_words(len(ids)) > len(words):
+            break
+        samples = [complex((w + 2**15) % 2**16 - 2**15, ((w >> 16) + 2**15) % 2**16 - 2**15)
+            for w in words[i + channels_header_words(len(ids)):i + frame_words(len(ids))]]
+        frames.append((ids, np.array(samples)))
+        i += frame_words(len(ids))
+    return frames
+
+# Polyphase Filter Bank Model ----------------------------------------------------------------------
+
+def model(re_in, im_in, coeffs, order_log2=10, taps=4, oversampling=False, data_width=16,
+    coeff_width=18):
+    """Bit-exact model of PolyphaseFilterBank (from reset), returns the (frames, 2**order_log2) re/im
+    FFT input frames.
+
+    Frame m covers the taps x 2**order_log2 samples from s = m x hop (hop: 2**order_log2, or half of
+    it when oversampling): u[p] = sum_k coeffs[p + k x 2**order_log2] x x[s + p + k x 2**order_log2]
+    (rounded, >> coeff_width - 1, saturated), circularly shifted by s so that the FFT bin c is the
+    channel centered on c / 2**order_log2 (phase referenced to the absolute time).
+    """
+    n      = 2**order_log2
+    hop    = n // 2 if oversampling else n
+    h      = np.asarray(coeffs, dtype=np.int64)
+    x_re   = np.asarray(re_in,  dtype=np.int64)
+    x_im   = np.asarray(im_in,  dtype=np.int64)
+    rnd    = 1 << (coeff_width - 2)
+    lo, hi = -2**(data_width - 1), 2**(data_width - 1) - 1
+    re, im = [], []
+    for s in range(0, len(x_re) - taps * n + 1, hop):
+        for x, out in [(x_re, re), (x_im, im)]:
+            u = (x[s:s + taps * n] * h).reshape(taps, n).sum(axis=0)
+            out.append(np.roll(np.clip((u + rnd) >> (coeff_width - 1), lo, hi), s % n))
+    return np.array(re).reshape(-1, n), np.array(im).reshape(-1, n)
+
+# Polyphase Filter Bank ----------------------------------------------------------------------------
+
+class PolyphaseFilterBank(LiteXModule):
+    """Polyphase filter bank front-end of a 2**order_log2 channels channelizer (before MaiaSDRFFT).
+
+    Weighted overlap-add formulation: every hop input samples (2**order_log2, critically sampled, or
+    half of it with `oversampling`), the last taps x 2**order_log2 samples are weighted by the
+    prototype filter (coefficients RAM, `coeff_waddr`/`coeff_wdata` as MaiaSDRFIR) and folded into
+    a 2**order_log2 samples frame emitted at one sample per clock cycle (`last` on the frame's last
+    sample), see model(). The samples are stored in 2 x taps + 1 half frame BRAMs, `taps` complex
+    MACs (2 x taps multipliers) compute the folds. The input is backpressured while the next half
+    frame would overwrite the frame being emitted, so the output rate (input rate x 2 when
+    oversampling) must stay below one sample per clock cycle. Like MaiaSDRFFT, the source has no
+    backpressure. `oversampling` must only be changed in reset.
+    """
+    def __init__(self, data_width=16, coeff_width=18, order_log2=10, taps=4, with_csr=True):
+        n      = 2**order_log2
+        h      = n // 2
+        nbanks = 2 * taps + 1
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint([("re", data_width), ("im", data_width)])
+        self.source = source = stream.Endpoint([("re", data_width), ("im", data_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset        = Signal()
+        self.oversampling = Signal()
+        self.coeff_wren   = Signal()
+        self.coeff_waddr  = Signal(bits_for(taps * n - 1))
+        self.coeff_wdata  = Signal(coeff_width)
+
+        # Parameters/Locals ------------------------------------------------------------------------
+        self.order_log2 = order_log2
+        self.taps       = taps
+
+        # # #
+
+        # Half frames storage.
+        banks  = [Memory(2 * data_width, h) for _ in range(nbanks)]
+        wports = [mem.get_port(write_capable=True) for mem in banks]
+        rports = [mem.get_port() for mem in banks]
+        self.specials += banks, wports, rports
+
+        # Coefficients (one RAM per tap: coefficient p + k x 2**order_log2 in RAM k at p).
+        coeffs  = [Memory(coeff_width, n) for _ in range(taps)]
+        cwports = [mem.get_port(write_capable=True) for mem in coeffs]
+        crports = [mem.get_port() for mem in coeffs]
+        self.specials += coeffs, cwports, crports
+        for k, port in enumerate(cwports):
+            self.comb += [
+                port.adr.eq(self.coeff_waddr[:order_log2]),
+                port.dat_w.eq(self.coeff_wdata),
+                port.we.eq(self.coeff_wren & (self.coeff_waddr[order_log2:] == k)),
+            ]
+
+        # Write side (half frames written ahead of the emitted window: 2 x taps makes it ready, the
+        # bank of the next one is in the window above).
+        wbank  = Signal(max=nbanks)
+        waddr  = Signal(order_log2 - 1)
+        ahead  = Signal(max=2 * taps + 2)
+        whalf  = Signal()
+        self.comb += [
+            sink.ready.eq(~self.reset & (ahead <= 2 * taps)),
+            whalf.eq(sink.valid & sink.ready & (waddr == (h - 1))),
+        ]
+        for i, port in enumerate(wports):
+            self.comb += [
+                port.adr.eq(waddr),
+                port.dat_w.eq(Cat(sink.re, sink.im)),
+                port.we.eq(sink.valid & sink.ready & (wbank == i)),
+            ]
+        self.sync += [
+            If(self.reset,
+                wbank.eq(0),
+                waddr.eq(0),
+            ).Elif(sink.valid & sink.ready,
+                waddr.eq(waddr + 1),
+                If(waddr == (h - 1),
+                    waddr.eq(0),
+                    wbank.eq(Mux(wbank == (nbanks - 1), 0, wbank + 1)),
+                )
+            )
+        ]
+
+        # Emission (window of the 2 x taps half frames from ebank, back to back when ready).
+        busy       = Signal()
+        q          = Signal(order_log2)
+        q_last     = Signal()
+        hop        = Signal(2)
+        ahead_next = Signal(max=2 * taps + 2)
+        ebank      = Signal(max=nbanks)
+        ebank_next = Signal(max=nbanks + 2)
+        rot        = Signal()
+        self.comb += [
+            hop.eq(Mux(self.oversampling, 1, 2)),
+            q_last.eq(busy & (q == (n - 1))),
+            ahead_next.eq(ahead + whalf - Mux(q_last, hop, 0)),
+            ebank_next.eq(ebank + hop),
+        ]
+        self.sync += [
+            If(self.reset,
+                ahead.eq(0),
+                busy.eq(0),
+                q.eq(0),
+                ebank.eq(0),
+                rot.eq(0),
+            ).Else(
+                ahead.eq(ahead_next),
+                If(~busy,
+                    busy.eq(ahead >= 2 * taps),
+                ).Else(
+                    q.eq(q + 1),
+                    If(q_last,
+                        busy.eq(ahead_next >= 2 * taps),
+                        ebank.eq(Mux(ebank_next >= nbanks, ebank_next - nbanks, ebank_next)),
+                        rot.eq(rot ^ self.oversampling),
+                    )
+                )
+            )
+        ]
+
+        # Read (u[p] with p = q circularly shifted by half a frame on odd oversampled windows).
+        p = Signal(order_log2)
+        self.comb += p.eq(Cat(q[:-1], q[-1] ^ rot))
+        for port in rports:
+            self.comb += port.adr.eq(p[:-1])
+        for port in crports:
+            self.comb += port.adr.eq(p)
+
+        # Stage 1: Samples/coefficients read, bank of each tap.
+        s1_valid = Signal()
+        s1_last  = Signal()
+        s1_sels  = [Signal(max=nbanks) for _ in range(taps)]
+        for k in range(taps):
+            sel = Signal(max=2 * nbanks)
+            self.comb += sel.eq(ebank + 2 * k + p[-1])
+            self.sync += s1_sels[k].eq(Mux(sel >= nbanks, sel - nbanks, sel))
+        self.sync += [
+            s1_valid.eq(busy & ~self.reset),
+            s1_last.eq(q_last),
+        ]
+        samples = Array(port.dat_r for port in rports)
+
+        # Stage 2: Products.
+        s2_valid = Signal()
+        s2_last  = Signal()
+        s2_re    = [Signal((data_width + coeff_width, True)) for _ in range(taps)]
+        s2_im    = [Signal((data_width + coeff_width, True)) for _ in range(taps)]
+        for k in range(taps):
+            x     = Signal(2 * data_width)
+            x_re  = Signal((data_width, True))
+            x_im  = Signal((data_width, True))
+            coeff = Signal((coeff_width, True))
+            self.comb += [
+                x.eq(samples[s1_sels[k]]),
+                x_re.eq(x[:data_width]),
+                x_im.eq(x[data_width:]),
+                coeff.eq(crports[k].dat_r),
+            ]
+            self.sync += [
+                s2_re[k].eq(x_re * coeff),
+                s2_im[k].eq(x_im * coeff),
+            ]
+        self.sync += [
+            s2_valid.eq(s1_valid & ~self.reset),
+            s2_last.eq(s1_last),
+        ]
+
+        # Stage 3: Folds (sums over the taps) with rounding.
+        rnd      = 1 << (coeff_width - 2)
+        s3_valid = Signal()
+        s3_last  = Signal()
+        s3_re    = Signal((data_width + coeff_width + bits_for(taps), True))
+        s3_im    = Signal((data_width + coeff_width + bits_for(taps), True))
+        self.sync += [
+            s3_valid.eq(s2_valid & ~self.reset),
+            s3_last.eq(s2_last),
+            s3_re.eq(reduce(add, s2_re) + rnd),
+            s3_im.eq(reduce(add, s2_im) + rnd),
+        ]
+
+        # Stage 4: Scaling/saturation.
+        def saturate(x):
+            lo, hi = -2**(data_width - 1), 2**(data_width - 1) - 1
+            y      = Signal((len(x) - coeff_width + 1, True))
+            self.comb += y.eq(x >> (coeff_width - 1))
+            return Mux(y > hi, hi, Mux(y < lo, lo, y))
+        self.sync += [
+            source.valid.eq(s3_valid & ~self.reset),
+            source.last.eq(s3_last),
+            source.re.eq(saturate(s3_re)),
+            source.im.eq(saturate(s3_im)),
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._oversampling = CSRStorage(1, name="oversampling", description="2x oversampled channelizer (0: critically sampled), change in reset.")
+        self._coeff_waddr  = CSRStorage(len(self.coeff_waddr), name="coeff_waddr", description="Prototype filter coefficient address.")
+        self._coeff_wdata  = CSRStorage(len(self.coeff_wdata), name="coeff_wdata", description="Prototype filter coefficient data (written on update).")
+
+        self.comb += [
+            self.oversampling.eq(self._oversampling.storage),
+            self.coeff_wren.eq(self._coeff_wdata.re),
+            self.coeff_waddr.eq(self._coeff_waddr.storage),
+            self.coeff_wdata.eq(self._coeff_wdata.storage),
+        ]
+
+# Channel Selector ---------------------------------------------------------------------------------
+
+class ChannelSelector(FrameBuffer):
+    """Selected channels of the channelizer FFT frames.
+
+    Each FFT frame (digit-reversed order) is stored in a FrameBuffer, then the
+    `nchannels_minus_one + 1` channels listed in the channels table (natural order channel ids,
+    `table_waddr`/`table_wdata`, all the channels in order by default) are emitted in table order
+    with their `channel` id, `last` on the frame's last one. Each frame starts with its header (see
+    channels_header(): 64-bit header and channel ids, 16-bit halves in re/im) and frames are an
+    even number of 32-bit words: an odd channels count is rounded up (next table entry). The
+    header words need idle cycles between the frames (full rate frames are dropped).
+    """
+    def __init__(self, data_width=16, order_log2=10, radix=2, with_csr=True):
+        assert data_width >= 16 # 16-bit header halves.
+        assert order_log2 >= 2
+        n = 2**order_log2
+        FrameBuffer.__init__(self,
+            sink_layout   = [("re", data_width), ("im", data_width)],
+            source_layout = [("re", data_width), ("im", data_width), ("channel", order_log2)],
+            frame_len     = n,
+            width         = 2 * data_width,
+            depth         = n,
+            index_width   = bits_for(frame_words(n) - 1),
+        )
+        source = self.source
+
+        # Signals ----------------------------------------------------------------------------------
+        self.nchannels_minus_one = Signal(order_log2, reset=n - 1)
+        self.table_wren          = Signal()
+        self.table_waddr         = Signal(order_log2)
+        self.table_wdata         = Signal(order_log2)
+
+        # # #
+
+        # Channels table (2 ids per entry: pairs for the header, read at the next index, the frame
+        # is read at issue).
+        table  = Memory(2 * order_log2, n // 2, init=[i | (i + 1) << order_log2 for i in range(0, n, 2)])
+        twport = table.get_port(write_capable=True, we_granularity=order_log2)
+        trport = table.get_port()
+        self.specials += table, twport, trport
+        self.comb += [
+            twport.adr.eq(self.table_waddr[1:]),
+            twport.dat_w.eq(Replicate(self.table_wdata, 2)),
+            twport.we[0].eq(self.table_wren & ~self.table_waddr[0]),
+            twport.we[1].eq(self.table_wren &  self.table_waddr[0]),
+        ]
+
+        # Frame layout: header (index 0-1), ids (pairs, even count) and samples (even count).
+        nchannels_minus_one = Signal(order_log2)
+        pairs               = Signal(order_log2)
+        hdr_end             = Signal(len(self.index), reset=channels_header_words(n))
+        self.comb += [
+            nchannels_minus_one.eq(self.nchannels_minus_one | 1),
+            pairs.eq(nchannels_minus_one[1:] + 1),
+        ]
+        self.sync += hdr_end.eq(2 + pairs + pairs[0])
+        self.comb += [
+            self.last_index.eq(hdr_end + nchannels_minus_one),
+            If(self.index_next < hdr_end,
+                trport.adr.eq(self.index_next - 2),
+            ).Else(
+                trport.adr.eq((self.index_next - hdr_end)[1:]),
+            )
+        ]
+
+        # Frame: written in arrival order, read at the channel's digit-reversed bin (hdr_end even).
+        chan    = Signal(order_log2)
+        s1_chan = Signal(order_log2)
+        s1_ids  = Signal(2 * order_log2)
+        s1_ids_valid = Signal()
+        self.comb += [
+            self.wadr.eq(self.windex),
+            self.wport.dat_w.eq(Cat(self.sink.re, self.sink.im)),
+            chan.eq(Mux(self.index[0], trport.dat_r[order_log2:], trport.dat_r[:order_log2])),
+            self.radr.eq(digit_reversed(chan, radix)),
+        ]
+        hdr = [
+            (CHANNELS_HEADER_MAGIC, nchannels_minus_one + 1),
+            (order_log2, CHANNELS_HEADER_MAGIC),
+        ]
+        self.sync += If(self.ce,
+            s1_chan.eq(chan),
+            s1_ids.eq(trport.dat_r),
+            s1_ids_valid.eq(self.index - 2 < pairs),
+            source.channel.eq(s1_chan),
+            If(self.s1_index < 2,
+                source.channel.eq(0),
+                source.re.eq(Mux(self.s1_index[0], hdr[1][0], hdr[0][0])),
+                source.im.eq(Mux(self.s1_index[0], hdr[1][1], hdr[0][1])),
+            ).Elif(self.s1_index < hdr_end,
+                source.channel.eq(0),
+                source.re.eq(Mux(s1_ids_valid, s1_ids[:order_log2], 0xffff)),
+                source.im.eq(Mux(s1_ids_valid, s1_ids[order_log2:], 0xffff)),
+            ).Else(
+                source.re.eq(self.rport.dat_r[:data_width]),
+                source.im.eq(self.rport.dat_r[data_width:]),
+            )
+        )
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._nchannels_minus_one = CSRStorage(len(self.nchannels_minus_one), name="nchannels_minus_one",
+            description="Channels forwarded per frame minus one.", reset=2**len(self.nchannels_minus_one) - 1)
+        self._table_waddr = CSRStorage(len(self.table_waddr), name="table_waddr", description="Channels table address.")
+        self._table_wdata = CSRStorage(len(self.table_wdata), name="table_wdata", description="Channel id (natural order, written on update).")
+        self._dropped     = CSRStatus(32, name="dropped", description="Frames dropped (output stalled).")
+
+        self.comb += [
+            self.nchannels_minus_one.eq(self._nchannels_minus_one.storage),
+            self.table_wren.eq(self._table_wdata.re),
+            self.table_waddr.eq(self._table_waddr.storage),
+            self.table_wdata.eq(self._table_wdata.storage),
+            self._dropped.status.eq(self.dropped),
+        ]
@@ -0,0 +1,505 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import math
+import itertools
+
+from functools import lru_cache
+
+from gateware.maia_sdr_fft   import compute_widths
+from gateware.timestamp      import header_words
+from gateware.bfp            import header_words as bfp_header_words
+from gateware.pfb            import frame_words as pfb_frame_words
+from gateware.spectrum       import frame_fifo_depth
+from gateware.sdr_processing import source_frame_len
+
+# SDR Processing Planner ---------------------------------------------------------------------------
+
+# Pre-synthesis throughput/resource estimation of an SDRProcessing configuration: sustained sample
+# rates through the FIR (one input sample every `operations` clock cycles) and the FFT (one sample
+# per clock cycle, overlapping frames included), DMA bandwidth, FFT stage widths and DSP48/BRAM18
+# usage of the Maia SDR cores (following the maia_hdl storage rules). Resource figures are estimates
+# for the SDRProcessing cores only (the rest of the SoC is not included) and do not replace the
+# Vivado utilization report.
+
+# Devices/Targets ----------------------------------------------------------------------------------
+
+DEVICES = {
+    "xc7a200t" : dict(dsp48=740, bram18=730),
+    "xc7a100t" : dict(dsp48=240, bram18=270),
+    "xc7a35t"  : dict(dsp48=90,  bram18=100),
+}
+
+# PCIe Gen2 lane: 5GT/s with 8b/10b encoding, ~80% left after TLP/DLLP overheads.
+PCIE_GEN2_LANE_BANDWIDTH = 5e9 * 8/10 / 8 * 0.8
+
+TARGETS = {
+    # AD9361 (first RX channel, 61.44MSPS max in 2T2R mode, 122.88MSPS with oversampling) -> DMA.
+    "litex_m2sdr" : dict(
+        device       = "xc7a200t",
+        sys_clk_freq = 125e6,
+        sample_rate  = 61.44e6,
+        pcie_lanes   = 1,
+    ),
+    # DMA Reader -> DMA Writer loopback (no RFIC: input rate only limited by the datapath).
+    "acorn" : dict(
+        device       = "xc7a200t",
+        sys_clk_freq = 125e6,
+        sample_rate  = None,
+        pcie_lanes   = 1,
+    ),
+}
+
+# Resources ----------------------------------------------------------------------------------------
+
+def bram18_count(depth, width):
+    """BRAM18 primitives for a depth x width memory (best 7-Series RAMB18 aspect ratio)."""
+    ratios = [(512, 36), (1024, 18), (2048, 9), (4096, 4), (8192, 2), (16384, 1)]
+    return min(math.ceil(depth/d) * math.ceil(width/w) for d, w in ratios)
+
+def dsp48_count(a_width, b_width):
+    """DSP48E1 (25x18 signed multiplier) count for an a_width x b_width multiplication."""
+    a_width, b_width = max(a_width, b_width), min(a_width, b_width)
+    return math.ceil(a_width/25) * math.ceil(b_width/18)
+
+def fir_operations(taps, decimation):
+    """Operations and odd_operations to program for a FIR of `taps` length (see compute_coefficients)."""
+    num_mult = math.ceil(taps/decimation)
+    return math.ceil(num_mult/2), num_mult % 2 == 1
+
+@lru_cache(maxsize=None)
+def fir_resources(data_in_width=16, coeff_width=18, len_log2=8):
+    """DSP48/BRAM18 estimation of MaiaSDRFIR (maia_hdl FIR4DSP)."""
+    # 4 MACCs (re/im x 2 branches), sample buffer with 2 read ports (duplicated) and 2 coefficients
+    # banks of 2**(len_log2 - 1) coefficients.
+    dsp48  = 4 * dsp48_count(data_in_width, coeff_width)
+    bram18 = 2 * bram18_count(2**len_log2,       2 * data_in_width)
+    bram18 += 2 * bram18_count(2**(len_log2 - 1), coeff_width)
+    return dict(dsp48=dsp48, bram18=bram18)
+
+@lru_cache(maxsize=None)
+def ddc_resources(data_width=16, lut_addr_width=10, lut_width=18):
+    """DSP48/BRAM18 estimation of DDC."""
+    # 4 multipliers (complex mixer) and a cos/sin LUT of 2**lut_addr_width entries.
+    dsp48  = 4 * dsp48_count(data_width, lut_width)
+    bram18 = bram18_count(2**lut_addr_width, 2 * lut_width)
+    return dict(dsp48=dsp48, bram18=bram18)
+
+@lru_cache(maxsize=None)
+def overlap_resources(data_width=16, order_log2=10):
+    """DSP48/BRAM18 estimation of OverlapBuffer (2 frames of re/im samples)."""
+    return dict(dsp48=0, bram18=bram18_count(2 * 2**order_log2, 2 * data_width))
+
+@lru_cache(maxsize=None)
+def frame_fifo_resources(data_width=16, packet_len=1024):
+    """DSP48/BRAM18 estimation of the FFT output FrameFIFO (2 packets of re/im samples + last, see
+    spectrum.frame_fifo_depth)."""
+    return dict(dsp48=0, bram18=bram18_count(frame_fifo_depth(packet_len), 2 * data_width + 1))
+
+@lru_cache(maxsize=None)
+def fft_reorder_resources(data_width=16, order_log2=10):
+    """DSP48/BRAM18 estimation of FFTReorder (2 frames of re/im FFT output samples)."""
+    return dict(dsp48=0, bram18=bram18_count(2 * 2**order_log2, 2 * data_width))
+
+@lru_cache(maxsize=None)
+def bfp_resources(data_width=16, order_log2=10, ratio=1):
+    """DSP48/BRAM18 estimation of BlockFloatingPoint (2 frames of re/im FFT output samples, `ratio`
+    samples per word)."""
+    return dict(dsp48=0, bram18=bram18_count(2 * 2**order_log2 // ratio, ratio * 2 * data_width))
+
+@lru_cache(maxsize=None)
+def pfb_resources(data_width=16, coeff_width=18, order_log2=10, taps=4, out_width=16):
+    """DSP48/BRAM18 estimation of PolyphaseFilterBank + ChannelSelector."""
+    # 2 x taps multipliers, 2 x taps + 1 half frames of samples, taps x 2**order_log2 coefficients,
+    # 2 frames of FFT output samples and the channels table (pairs of ids).
+    n      = 2**order_log2
+    dsp48  = 2 * taps * dsp48_count(data_width, coeff_width)
+    bram18 = (2 * taps + 1) * bram18_count(n // 2, 2 * data_width)
+    bram18 += taps * bram18_count(n, coeff_width)
+    bram18 += bram18_count(2 * n, 2 * out_width) + bram18_count(n // 2, 2 * order_log2)
+    return dict(dsp48=dsp48, bram18=bram18)
+
+@lru_cache(maxsize=None)
+def fft_widths(data_width=12, order_log2=12, radix=2):
+    """Cached compute_widths (default truncates, as generated by fft_generator)."""
+    return compute_widths(data_width, order_log2, radix)
+
+@lru_cache(maxsize=None)
+def fft_resources(data_width=12, order_log2=12, radix=2, window=True, cmult3x=False,
+    twiddle_width = 16,
+    ):
+    """DSP48/BRAM18 estimation of MaiaSDRFFT (maia_hdl FFT with its 'auto' storage rules)."""
+    radix      = radix if radix == "R22" else int(radix)
+    radix_log2 = {2: 1, 4: 2, "R22": 2}[radix]
+    nstages    = order_log2 // radix_log2
+    truncates, widths = fft_widths(data_width, order_log2, radix)
+    dsp48  = 0
+    bram18 = 0
+
+    # Window: half window in BRAM (9-bit coefficients), one Mult2x.
+    if window:
+        dsp48  += dsp48_count(data_width, 9 + 1)
+        bram18 += bram18_count(2**(order_log2 - 1), 9)
+
+    # Butterflies: (depth, input width, output width, buffers) of the SDF delay lines stored in BRAM.
+    # The last butterfly always uses distributed storage.
+    for j in range(nstages - 1):
+        order = nstages - j
+        if radix == 2:
+            bflys = [(2**(order - 1), widths[j], widths[j + 1], 1)] if order >= 9 else []
+        elif radix == 4:
+            bflys = [(4**(order - 1), widths[j], widths[j + 1], 3)] if order >= 4 else []
+        else:
+            w_inter = widths[j] + 1 - truncates[j][0]
+            bflys   = [
+                (2**(2*order - 1), widths[j], w_inter,       1),
+                (2**(2*order - 2), w_inter,   widths[j + 1], 1),
+            ] if 2*order >= 9 else []
+        for depth, w_in, w_out, nbuffs in bflys:
+            bram18 += bram18_count(depth, 2 * nbuffs * max(w_in, w_out))
+
+    # Twiddles: Cmult (3 DSP48, 1 with cmult3x), TwiddleI (no multiplier) for the last radix 2 stage.
+    for j in range(nstages - 1):
+        if radix == 2 and j == nstages - 2:
+            continue
+        order  = nstages - j
+        ntwid  = 2**(radix_log2 * order - {2: 1, 4: 0, "R22": 0}[radix])
+        dsp48 += {False: 3, True: 1}[cmult3x] * dsp48_count(widths[j + 1] + 1, twiddle_width)
+        if ntwid >= 2**8:
+            bram18 += bram18_count(ntwid, 2 * twiddle_width)
+    return dict(dsp48=dsp48, bram18=bram18)
+
+# SDR Plan -----------------------------------------------------------------------------------------
+
+class SDRPlan:
+    """Throughput/resource plan of an SDRProcessing configuration (see plan_sdr_processing).
+
+    Rates are in samples/s, `errors` lists the reasons the configuration can't sustain the input
+    rate or fit the device, `warnings` the silent data losses (stream width truncations).
+    """
+    def __init__(self, target, params):
+        self.target   = target
+        self.params   = params
+        self.errors   = []
+        self.warnings = []
+
+    @property
+    def ok(self):
+        return len(self.errors) == 0
+
+    def check(self):
+        """Raise ValueError if the configuration is not sustainable."""
+        if not self.ok:
+            raise ValueError(f"Unsustainable SDRProcessing configuration on {self.target}:\n" +
+                "\n".join(f"- {e}" for e in self.errors))
+
+    def summary(self):
+        """One line description (used in sweeps)."""
+        p      = self.params
+        fir    = f"fir {p['fir_taps']}/{p['fir_decimation']}" if p["with_fir"] else "no fir"
+        if p["with_cic"]:
+            fir = f"cic {p['cic_decimation']} " + fir
+        if p["with_ddc"]:
+            fir = "ddc " + fir
+        fft    = (f"fft {2**p['fft_order_log2']} r{p['fft_radix']}" +
+            {True: " win", False: ""}[p["fft_window"]] + {True: " 3x", False: ""}[p["fft_cmult3x"]]
+            + (f" ov{100 - 100 // 2**p['fft_overlap']}%" if p["fft_overlap"] else "")
+            + (f" pfb{p['pfb_taps']}" + {True: "x2", False: ""}[p["pfb_oversampling"]] if p["pfb_taps"] else "")
+            + (f" 1/{p['fft_frame_decimation']}" if p["fft_frame_decimation"] > 1 else "")
+            if p["with_fft"] else "no fft")
+        status = "OK" if self.ok else "FAIL"
+        return (f"{status:4s} {p['channels']}ch {fir:14s} {fft:20s} in {self.input_rate/1e6:8.3f}MS/s "
+            f"out {self.output_rate/1e6:8.3f}MS/s dma {self.dma_bytes_per_s/1e6:8.1f}MB/s "
+            f"dsp {self.dsp48:4d} bram18 {self.bram18:4d}")
+
+    def __str__(self):
+        p = self.params
+        r = []
+        r.append(f"SDRProcessing plan ({self.target}, sys_clk {p['sys_clk_freq']/1e6:.2f}MHz):")
+        r.append(f"  Input rate         : {self.input_rate/1e6:.3f} MS/s")
+        if p["with_ddc"]:
+            r.append(f"  DDC                : NCO LUT {2**p['ddc_lut_addr_width']} entries "
+                f"(spurs ~{-6 * p['ddc_lut_addr_width']} dBc)")
+        if p["with_cic"]:
+            r.append(f"  CIC                : {p['cic_stages']} stages, decimation {p['cic_decimation']}, "
+                f"output rate {self.fir_input_rate/1e6:.3f} MS/s")
+        if p["with_fir"]:
+            r.append(f"  FIR                : {p['fir_taps']} taps, decimation {p['fir_decimation']}, "
+                f"{self.fir_operations} operations{' (odd)' if self.fir_odd_operations else ''}")
+            if p["fir_clk_freq"] != p["sys_clk_freq"]:
+                r.append(f"  FIR clock          : {p['fir_clk_freq']/1e6:.2f}MHz (CDC FIFOs)")
+            r.append(f"  FIR max input rate : {self.fir_max_input_rate/1e6:.3f} MS/s")
+            r.append(f"  FIR output rate    : {self.fir_output_rate/1e6:.3f} MS/s")
+        if p["with_fft"]:
+            r.append(f"  FFT                : {2**p['fft_order_log2']} points, radix {p['fft_radix']}, "
+                f"widths {self.fft_widths}")
+            if p["fft_clk_freq"] != p["sys_clk_freq"]:
+                r.append(f"  FFT clock          : {p['fft_clk_freq']/1e6:.2f}MHz (CDC FIFOs)")
+            if p["fft_overlap"]:
+                r.append(f"  FFT overlap        : {100 - 100 // 2**p['fft_overlap']}%, "
+                    f"input rate {self.fft_input_rate/1e6:.3f} MS/s")
+            if p["pfb_taps"]:
+                r.append(f"  PFB channelizer    : {p['pfb_taps']} taps/branch, "
+                    f"{'2x oversampled' if p['pfb_oversampling'] else 'critically sampled'}, "
+                    f"{self.pfb_channels}/{2**p['fft_order_log2']} channels forwarded at "
+                    f"{self.fft_frame_rate:.1f} S/s")
+            r.append(f"  FFT frame rate     : {self.fft_frame_rate:.1f} frames/s "
+                f"(1 out of {p['fft_frame_decimation']} forwarded)")
+        r.append(f"  Output rate        : {self.output_rate/1e6:.3f} MS/s")
+        r.append(f"  DMA                : {self.dma_bytes_per_s/1e6:.1f} MB/s "
+            f"(of {self.dma_bandwidth/1e6:.1f} MB/s)")
+        for name, res in self.resources.items():
+            r.append(f"  {name.upper():18s} : {res['dsp48']} DSP48, {res['bram18']} BRAM18")
+        r.append(f"  Total              : {self.dsp48}/{self.device['dsp48']} DSP48, "
+            f"{self.bram18}/{self.device['bram18']} BRAM18")
+        r += [f"  Warning: {w}" for w in self.warnings]
+        r += [f"  Error: {e}"   for e in self.errors]
+        return "\n".join(r)
+
+# Planner ------------------------------------------------------------------------------------------
+
+def plan_sdr_processing(target="litex_m2sdr",
+    sys_clk_freq         = None,
+    sample_rate          = None,
+    pcie_lanes           = None,
+    channels             = 1,
+
+    # DDC.
+    with_ddc             = False,
+    ddc_lut_addr_width   = 10,
+
+    # CIC (build and runtime parameters).
+    with_cic             = False,
+    cic_stages           = 4,
+    cic_max_decimation   = 1024,
+    cic_decimation       = 1,
+
+    # FIR (build and runtime parameters).
+    with_fir             = True,
+    fir_data_in_width    = 16,
+    fir_data_out_width   = 16,
+    fir_coeff_width      = 18,
+    fir_decim_width      = 7,
+    fir_oper_width       = 7,
+    fir_len_log2         = 8,
+    fir_taps             = 32,
+    fir_decimation       = 1,
+    fir_clk_freq         = None,
+
+    # FFT.
+    with_fft             = True,
+    fft_data_width       = 16,
+    fft_order_log2       = 10,
+    fft_radix            = 2,
+    fft_window           = True,
+    fft_cmult3x          = False,
+    fft_overlap          = 0,
+    fft_frame_decimation = 1,
+    fft_clk_freq         = None,
+    with_fft_buffer      = False,
+    with_fft_reorder     = False,
+    fft_bfp_width        = 0,
+
+    # PFB Channelizer (build and runtime parameters).
+    pfb_taps             = 0,
+    pfb_oversampling     = False,
+    pfb_channels         = None,
+
+    # Frame Headers.
+    with_timestamps      = False,
+    ):
+    """Plan an SDRProcessing configuration on `target` (see TARGETS), returns an SDRPlan.
+
+    `sys_clk_freq`, `sample_rate` and `pcie_lanes` default to the target ones. A `sample_rate` of
+    None (DMA loopback targets) plans for the maximum rate the datapath can sustain. `channels` > 1
+    plans one SDRProcessing per channel, interleaved in the DMA by a ChannelInterleaver.
+    `fft_overlap` is the OverlapBuffer ratio (0: none, 1: 50%, 2: 75%), `with_timestamps` adds the
+    frame headers (header_words per packet) to the output stream. `fir_clk_freq`/`fft_clk_freq`
+    (default: sys_clk_freq) plan the cores in their own clock domain (CDC FIFOs, sys side still
+    limited to one sample per sys clock cycle). `pfb_taps` > 0 plans the PFB channelizer mode
+    (`pfb_channels` of the 2**fft_order_log2 channels forwarded, default: all). `fft_bfp_width` > 0
+    plans the block floating point FFT output (mantissas width, 8-bit ones packed 2 per word).
+    """
+    t      = TARGETS[target]
+    params = dict(locals())
+    params.pop("t")
+    params["sys_clk_freq"] = sys_clk_freq = sys_clk_freq or t["sys_clk_freq"]
+    params["sample_rate"]  = sample_rate  = sample_rate  or t["sample_rate"]
+    params["pcie_lanes"]   = pcie_lanes   = pcie_lanes   or t["pcie_lanes"]
+    params["fir_clk_freq"] = fir_clk_freq = fir_clk_freq or sys_clk_freq
+    params["fft_clk_freq"] = fft_clk_freq = fft_clk_freq or sys_clk_freq
+    params["pfb_channels"] = pfb_channels = pfb_channels or 2**fft_order_log2
+    plan        = SDRPlan(target, params)
+    plan.device = DEVICES[t["device"]]
+    errors      = plan.errors
+    warnings    = plan.warnings
+
+    # DMA: 2 x fir_data_in_width bits per input sample, 2 x fft_data_width per output sample (per
+    # channel, plus a 64-bit tag word per packet when interleaved). Block floating point: bfp_ratio
+    # samples per word plus a 64-bit exponent header per frame. PFB channelizer: channels header
+    # (ids) per frame, channels rounded up to even.
+    plan.dma_bandwidth = pcie_lanes * PCIE_GEN2_LANE_BANDWIDTH
+    with_pfb           = with_fft and pfb_taps > 0
+    with_bfp           = with_fft and fft_bfp_width > 0
+    packet_len         = (pfb_channels if with_pfb else 2**fft_order_log2) if with_fft else 1024
+    bfp_ratio          = max(fft_data_width // fft_bfp_width, 1) if with_bfp else 1
+    bfp_words          = bfp_header_words(2 * fft_data_width) if with_bfp else 0
+    words_out          = 1 / bfp_ratio + bfp_words / packet_len
+    if with_pfb:
+        words_out      = pfb_frame_words(pfb_channels) / pfb_channels
+    bytes_in           = 2 * fir_data_in_width / 8 * channels
+    headers            = header_words(2 * fft_data_width) / packet_len if with_timestamps else 0
+    bytes_out          = 2 * fft_data_width    / 8 * channels * (words_out + headers)
+    if channels > 1:
+        bytes_out     += 8 / packet_len * channels
+
+    # CIC: one input sample per clock cycle, one output every `cic_decimation` inputs.
+    cic_decimation = cic_decimation if with_cic else 1
+    if with_cic and cic_decimation > cic_max_decimation:
+        errors.append(f"CIC decimation ({cic_decimation}) exceeds max_decimation={cic_max_decimation}.")
+
+    # FIR: one input sample every `operations` cycles, one output every `fir_decimation` inputs.
+    fir_decimation = fir_decimation if with_fir else 1
+    decimation     = cic_decimation * fir_decimation
+    max_rate       = sys_clk_freq
+    if with_fir:
+        operations, odd_operations = fir_operations(fir_taps, fir_decimation)
+        plan.fir_operations        = operations
+        plan.fir_odd_operations    = odd_operations
+        plan.fir_max_input_rate    = min(fir_clk_freq / operations, sys_clk_freq)
+        max_rate = min(max_rate, plan.fir_max_input_rate * cic_decimation)
+        if fir_taps % fir_decimation:
+            warnings.append(f"FIR taps ({fir_taps}) not a multiple of decimation ({fir_decimation}), "
+                f"zero padded to {2 * operations * fir_decimation}.")
+        if 2 * operations * fir_decimation > 2**fir_len_log2:
+            errors.append(f"FIR needs {2 * operations * fir_decimation} coefficients, "
+                f"len_log2={fir_len_log2} stores {2**fir_len_log2}.")
+        if operations > 2**fir_oper_width:
+            errors.append(f"FIR operations ({operations}) don't fit oper_width={fir_oper_width}.")
+        if fir_decimation >= 2**fir_decim_width:
+            errors.append(f"FIR decimation ({fir_decimation}) doesn't fit decim_width={fir_decim_width}.")
+
+    # FFT: one sample per clock cycle, no backpressure (the DMA must absorb its output rate). With
+    # overlapping frames (or a 2x oversampled PFB), each FIR output sample is processed
+    # 2**fft_overlap (2) times. The PFB channelizer forwards pfb_channels samples per FFT frame.
+    overlap   = 2**fft_overlap if with_fft else 1
+    selection = 1
+    if with_pfb:
+        overlap   = 2 if pfb_oversampling else 1
+        selection = pfb_channels / 2**fft_order_log2
+        plan.pfb_channels = pfb_channels
+        if fft_overlap:
+            errors.append("FFT overlap and PFB channelizer are exclusive (the PFB sets the frames hop).")
+        if not 1 <= pfb_channels <= 2**fft_order_log2:
+            errors.append(f"PFB channels ({pfb_channels}) must be in 1..{2**fft_order_log2}.")
+        if pfb_channels % 2:
+            warnings.append(f"PFB channels ({pfb_channels}) rounded up to {pfb_channels + 1} (even frames).")
+        if fft_data_width != 16:
+            errors.append(f"PFB channelizer frames headers need fft_data_width=16 ({fft_data_width}).")
+        if with_bfp:
+            errors.append("FFT block floating point and PFB channelizer are exclusive (PFB output first).")
+    if with_bfp and (2 * fft_data_width not in [32, 64] or fft_data_width % fft_bfp_width):
+        errors.append(f"FFT block floating point mantissas ({fft_bfp_width}-bit) don't pack in the "
+            f"{2 * fft_data_width}-bit source words (32 or 64-bit, fft_data_width 16 or 32).")
+    if with_fft:
+        plan.fft_truncates, plan.fft_widths = fft_widths(fft_data_width, fft_order_log2, fft_radix)
+        max_rate = min(max_rate, min(fft_clk_freq, sys_clk_freq) / overlap * decimation)
+    if fft_overlap not in [0, 1, 2]:
+        errors.append(f"FFT overlap ({fft_overlap}) must be 0 (none), 1 (50%) or 2 (75%).")
+
+    # FFT Decimator: 1 out of fft_frame_decimation frames forwarded to the DMA.
+    frame_decimation = fft_frame_decimation if with_fft else 1
+
+    # Sustained rates (loopback targets: highest rate the DMA and the cores accept).
+    if sample_rate is None:
+        sample_rate = min(max_rate, plan.dma_bandwidth / bytes_in,
+            plan.dma_bandwidth / bytes_out * decimation * frame_decimation / overlap / selection)
+    plan.input_rate      = sample_rate
+    plan.fir_input_rate  = sample_rate / cic_decimation
+    plan.fir_output_rate = sample_rate / decimation
+    plan.fft_input_rate  = plan.fir_output_rate * overlap
+    plan.output_rate     = plan.fft_input_rate * selection / frame_decimation
+    plan.fft_frame_rate  = plan.fft_input_rate / frame_decimation / 2**fft_order_log2 if with_fft else 0
+    plan.dma_bytes_per_s = plan.output_rate * bytes_out
+
+    if with_fir and plan.fir_input_rate > plan.fir_max_input_rate:
+        errors.append(f"FIR can't sustain {plan.fir_input_rate/1e6:.3f}MS/s: {plan.fir_operations} operations "
+            f"at {fir_clk_freq/1e6:.2f}MHz accept {plan.fir_max_input_rate/1e6:.3f}MS/s "
+            f"(fir_status.overflow), use at most {2 * int(fir_clk_freq // plan.fir_input_rate) * fir_decimation} "
+            f"taps at decimation {fir_decimation}.")
+    if with_fft and plan.fft_input_rate > min(fft_clk_freq, sys_clk_freq):
+        errors.append(f"FFT input rate {plan.fft_input_rate/1e6:.3f}MS/s ({overlap} x "
+            f"{plan.fir_output_rate/1e6:.3f}MS/s with overlap) exceeds one sample per sys/FFT clock cycle "
+            f"(fft_overlap_dropped), reduce the overlap or decimate more.")
+    if with_timestamps and plan.output_rate * (words_out + headers) > sys_clk_freq:
+        errors.append(f"Output rate {plan.output_rate/1e6:.3f}MS/s leaves no cycles for the frame headers "
+            f"({header_words(2 * fft_data_width)} words per {packet_len} samples).")
+    elif with_bfp and plan.output_rate * words_out > sys_clk_freq:
+        errors.append(f"Output rate {plan.output_rate/1e6:.3f}MS/s leaves no cycles for the block floating "
+            f"point exponents ({bfp_words} words per {packet_len} samples), use 8-bit mantissas or decimate more.")
+    if sample_rate > sys_clk_freq:
+        errors.append(f"Input rate {sample_rate/1e6:.3f}MS/s exceeds one sample per sys clock cycle.")
+    if plan.dma_bytes_per_s > plan.dma_bandwidth:
+        errors.append(f"DMA output {plan.dma_bytes_per_s/1e6:.1f}MB/s exceeds PCIe x{pcie_lanes} "
+            f"bandwidth ({plan.dma_bandwidth/1e6:.1f}MB/s).")
+
+    # Stream widths: MSBs are silently dropped when a wider stream is connected to a narrower one.
+    widths = [("sink", fir_data_in_width)]
+    if with_fir:
+        widths += [("FIR input", fir_data_in_width), ("FIR output", fir_data_out_width)]
+    else:
+        widths += [("FIR bypass", fir_data_out_width)]
+    if with_fft:
+        widths += [("FFT input", fft_data_width)]
+        # Block floating point: FFT output scaled (no MSBs dropped) into the mantissas.
+        widths += [("FFT output", plan.fft_widths[-1])] if not with_bfp else []
+    widths += [("source", fft_data_width)]
+    for (a, wa), (b, wb) in zip(widths[:-1], widths[1:]):
+        if wa > wb:
+            warnings.append(f"{a} ({wa}-bit) truncated to {b} ({wb}-bit): {wa - wb} MSBs dropped.")
+
+    # Resources.
+    plan.resources = {}
+    if with_ddc:
+        plan.resources["ddc"] = ddc_resources(fir_data_in_width, ddc_lut_addr_width)
+    if with_fir:
+        plan.resources["fir"] = fir_resources(fir_data_in_width, fir_coeff_width, fir_len_log2)
+    if with_fft:
+        plan.resources["fft"] = fft_resources(fft_data_width, fft_order_log2, fft_radix,
+            fft_window, fft_cmult3x)
+        if fft_overlap:
+            plan.resources["overlap"] = overlap_resources(fft_data_width, fft_order_log2)
+        if with_fft_reorder:
+            plan.resources["fft reorder"] = fft_reorder_resources(plan.fft_widths[-1], fft_order_log2)
+        if with_fft_buffer:
+            frame_len = source_frame_len(with_fft, fft_order_log2, fft_data_width, with_bfp,
+                fft_bfp_width, with_pfb)
+            plan.resources["fft buffer"] = frame_fifo_resources(fft_data_width,
+                frame_len + (header_words(2 * fft_data_width) if with_timestamps else 0))
+        if with_bfp:
+            plan.resources["fft bfp"] = bfp_resources(plan.fft_widths[-1], fft_order_log2, bfp_ratio)
+        if with_pfb:
+            plan.resources["pfb"] = pfb_resources(fft_data_width, 18, fft_order_log2, pfb_taps,
+                plan.fft_widths[-1])
+    if channels > 1:
+        plan.resources = {f"{name} x{channels}": {k: v * channels for k, v in r.items()}
+            for name, r in plan.resources.items()}
+        plan.resources["interleaver"] = dict(dsp48=0,
+            bram18=channels * bram18_count(max(packet_len, 256), 2 * fft_data_width * 2))
+    plan.dsp48  = sum(r["dsp48"]  for r in plan.resources.values())
+    plan.bram18 = sum(r["bram18"] for r in plan.resources.values())
+    if plan.dsp48 > plan.device["dsp48"]:
+        errors.append(f"{plan.dsp48} DSP48 exceed the {t['device']} ({plan.device['dsp48']}).")
+    if plan.bram18 > plan.device["bram18"]:
+        errors.append(f"{plan.bram18} BRAM18 exceed the {t['device']} ({plan.device['bram18']}).")
+    return plan
+
+def sweep_sdr_processing(target="litex_m2sdr", **kwargs):
+    """Plan every combination of the parameters given as lists (scalars are kept fixed)."""
+    lists = {k: v if isinstance(v, (list, tuple, range)) else [v] for k, v in kwargs.items()}
+    for values in itertools.product(*lists.values()):
+        yield plan_sdr_processing(target, **dict(zip(lists.keys(), values)))
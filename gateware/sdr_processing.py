@@ -14,11 +14,37 @@ from litex.gen import *
 from litex.soc.interconnect     import stream
 from litex.soc.interconnect.csr import *
 
-from gateware.maia_sdr_fft import MaiaSDRFFT
+from gateware.bfp           import BlockFloatingPoint, frame_words as bfp_frame_words
+from gateware.capture       import SnapshotCapture, BinTrigger
+from gateware.cic           import CICDecimator
+from gateware.ddc           import DDC
+from gateware.maia_sdr_fft import MaiaSDRFFT, FFTReorder
 from gateware.maia_sdr_fir import MaiaSDRFIR
+from gateware.overlap      import OverlapBuffer
+from gateware.perf_counters import PerfCounters
+from gateware.pfb           import PolyphaseFilterBank, ChannelSelector, frame_words as pfb_frame_words
+from gateware.spectrum      import SpectrumAverager, SpectrumHold, FrameDecimator, FrameFIFO, frame_fifo_depth
+from gateware.timestamp     import FrameTimeTracker, FrameHeaderInserter, header_words
 
 # SDR Processing -----------------------------------------------------------------------------------
 
+# Helpers ------------------------------------------------------------------------------------------
+
+def source_frame_len(with_fft=False, fft_order_log2=12, fft_data_width=12, with_fft_bfp=False,
+    fft_bfp_width=16, with_pfb=False):
+    """Longest source frame (words, without the frame headers) of the enabled stages.
+
+    FFT/averaged/held frames: 2**fft_order_log2 words, block floating point frames:
+    bfp.frame_words(), PFB frames: pfb.frame_words(), streams without frames are cut every 1024
+    samples.
+    """
+    frame_len = 2**fft_order_log2 if with_fft else 1024
+    if with_fft and with_fft_bfp:
+        frame_len = max(frame_len, bfp_frame_words(fft_order_log2, fft_bfp_width, 2 * fft_data_width))
+    if with_fft and with_pfb:
+        frame_len = max(frame_len, pfb_frame_words(2**fft_order_log2))
+    return frame_len
+
 # Note/FIXME:
 # - sink may be connected via mux to fifo/fir/fft or source: but all modules may be configured with
 #   a specific size
@@ -28,6 +54,23 @@ from gateware.maia_sdr_fir import MaiaSDRFIR
 class SDRProcessing(LiteXModule):
     def __init__(self, platform, soc,
         with_litedram      = False,
+        with_perf_counters = False,
+        with_timestamps    = False,
+
+        # Snapshot Capture (DRAM).
+        with_capture       = False,
+        capture_port_width = 128,
+        capture_base       = 0x1000_0000,
+        capture_depth      = 0x1000_0000,
+
+        # DDC.
+        with_ddc           = False,
+        ddc_lut_addr_width = 10,
+
+        # CIC.
+        with_cic           = False,
+        cic_stages         = 4,
+        cic_max_decimation = 1024,
 
         # FIR.
         with_fir           = False,
@@ -39,6 +82,8 @@ class SDRProcessing(LiteXModule):
         fir_macc_trunc     = 19,
         fir_len_log2       = 8,
         fir_clk_domain     = "sys",
+        fir_coeff_banks    = False,
+        fir_coeff_sink     = False,
         fir_with_csr       = True,
 
         # FFT.
@@ -49,6 +94,19 @@ class SDRProcessing(LiteXModule):
         fft_window         = True,
         fft_cmult3x        = False,
         fft_clk_domain     = "sys",
+        with_fft_averager  = False,
+        with_fft_decimator = False,
+        with_fft_hold      = False,
+        with_fft_overlap   = False,
+        with_fft_buffer    = False,
+        with_fft_reorder   = False,
+        with_fft_bfp       = False,
+        fft_bfp_width      = 16,
+
+        # PFB Channelizer.
+        with_pfb           = False,
+        pfb_taps           = 4,
+        pfb_coeff_width    = 18,
         ):
 
         # Streams ----------------------------------------------------------------------------------
@@ -58,8 +116,11 @@ class SDRProcessing(LiteXModule):
         self.ext_fifo_sink   = ext_fifo_sink   = stream.Endpoint([("data", 2 * fir_data_in_width)])
         self.ext_fifo_source = ext_fifo_source = stream.Endpoint([("data", 2 * fir_data_in_width)])
 
+        # FIR coefficients words (fir_coeff_sink, see maia_sdr_fir.coefficient_words).
+        self.fir_coeff_sink  = fir_coeff_sink  = stream.Endpoint([("data", 32)])
+
         # SDR DSP Generals CSR (FIR/FFT/LiteDRAM enable/disable (bypass) ---------------------------
-        if with_fft or with_fir or with_litedram:
+        if with_fft or with_fir or with_ddc or with_cic or with_litedram or with_timestamps:
             self._configuration = CSRStorage(description="Stream Configuration.", fields=[
                 CSRField("fir", size=1, offset=0, values=[
                     ("``0b0``", "Disable FIR Filter."),
@@ -73,18 +134,55 @@ class SDRProcessing(LiteXModule):
                     ("``0b0``", "Disable LiteDRAMFIFO."),
                     ("``0b1``", "Enable  LiteDRAMFIFO."),
                 ], reset = 0b1),
+                CSRField("fft_averager", size=1, offset=3, values=[
+                    ("``0b0``", "Stream FFT frames."),
+                    ("``0b1``", "Stream averaged power spectra (FFT Averager)."),
+                ], reset = 0b0),
+                CSRField("fft_hold", size=1, offset=4, values=[
+                    ("``0b0``", "Stream FFT frames."),
+                    ("``0b1``", "Stream max/min-hold spectra dumps (FFT Hold)."),
+                ], reset = 0b0),
+                CSRField("cic", size=1, offset=5, values=[
+                    ("``0b0``", "Bypass CIC Decimator."),
+                    ("``0b1``", "Enable CIC Decimator (before FIR Filter)."),
+                ], reset = 0b0),
+                CSRField("ddc", size=1, offset=6, values=[
+                    ("``0b0``", "Bypass DDC."),
+                    ("``0b1``", "Enable DDC (NCO + mixer before CIC/FIR)."),
+                ], reset = 0b0),
+                CSRField("timestamps", size=1, offset=7, values=[
+                    ("``0b0``", "Stream without frame headers."),
+                    ("``0b1``", "Insert a timestamp header before each frame."),
+                ], reset = 0b0),
+                CSRField("pfb", size=1, offset=8, values=[
+                    ("``0b0``", "FFT frames (spectrum)."),
+                    ("``0b1``", "PFB channelizer (selected channels of each FFT frame)."),
+                ], reset = 0b0),
+                CSRField("fft_reorder", size=1, offset=9, values=[
+                    ("``0b0``", "FFT frames in digit-reversed order."),
+                    ("``0b1``", "FFT frames in natural order (FFT Reorder)."),
+                ], reset = 0b0),
+                CSRField("fft_bfp", size=1, offset=10, values=[
+                    ("``0b0``", "FFT frames truncated to fft_data_width."),
+                    ("``0b1``", "FFT frames in block floating point (exponent header + mantissas)."),
+                ], reset = 0b0),
             ])
 
         # reset/disable input signal.
         self.reset = Signal()
 
+        # time input signal (frame headers timestamps).
+        self.time  = Signal(64)
+
         # # #
 
         # Signals.
         # FIXME: size must be correctly adapted
+        epi = stream.Endpoint([("re", fir_data_in_width),  ("im", fir_data_in_width)])
         ep0 = stream.Endpoint([("re", fir_data_in_width),  ("im", fir_data_in_width)])
         ep1 = stream.Endpoint([("re", fir_data_out_width), ("im", fir_data_out_width)])
         ep2 = stream.Endpoint([("re", fft_data_width),     ("im", fft_data_width)])
+        ep3 = stream.Endpoint([("re", fft_data_width),     ("im", fft_data_width)])
 
         # MAIA SDR FFT.
         # -------------
@@ -97,13 +195,186 @@ class SDRProcessing(LiteXModule):
                 cmult3x     = fft_cmult3x,
                 clk_domain  = fft_clk_domain,
             )
-            self.fft.add_constants(soc)
+            if soc is not None:
+                self.fft.add_constants(soc)
 
             # MAIA SDR FFT Logic.
             # -------------------
             # Disables/clear FFT when no stream.
             self.comb += self.fft.reset.eq(self.reset),
 
+            # FFT Overlap.
+            # ------------
+            # 50%/75% overlapping FFT frames (fft_overlap_ratio), the FFT input rate is multiplied by
+            # 2/4 and must stay below one sample per clock cycle (see sdr_planner).
+            if with_fft_overlap:
+                self.fft_overlap = OverlapBuffer(
+                    data_width = fft_data_width,
+                    order_log2 = fft_order_log2,
+                )
+                self.comb += self.fft_overlap.reset.eq(self.reset)
+
+            # FFT Reorder.
+            # ------------
+            # Natural order (optionally fftshift-ed) FFT frames through a ping-pong frame BRAM.
+            if with_fft_reorder:
+                self.fft_reorder = FFTReorder(
+                    data_width = self.fft.out_width,
+                    order_log2 = fft_order_log2,
+                    radix      = fft_radix,
+                )
+                self.comb += self.fft_reorder.reset.eq(self.reset)
+
+            # FFT Block Floating Point.
+            # -------------------------
+            # Full out_width FFT frames scaled by a per-frame exponent (64-bit header) into 16-bit (or
+            # 8-bit, 2 per word) re/im mantissas of the source words, see bfp.py.
+            if with_fft_bfp:
+                if 2 * fft_data_width not in [32, 64] or fft_data_width % fft_bfp_width:
+                    raise ValueError(f"FFT block floating point: fft_bfp_width={fft_bfp_width} mantissas "
+                        f"don't pack in the 2 x fft_data_width={fft_data_width} bit source words "
+                        f"(use fft_data_width=16 or 32 with fft_bfp_width=8 or 16).")
+                self.fft_bfp = BlockFloatingPoint(
+                    data_width     = self.fft.out_width,
+                    order_log2     = fft_order_log2,
+                    mantissa_width = fft_bfp_width,
+                    word_width     = 2 * fft_data_width,
+                )
+                self.comb += self.fft_bfp.reset.eq(self.reset)
+
+            # FFT Averager.
+            # -------------
+            # |X|^2 averaged over N frames (optionally as log2 power) in place of the FFT frames.
+            if with_fft_averager:
+                self.fft_averager = SpectrumAverager(
+                    data_width = self.fft.out_width,
+                    order_log2 = fft_order_log2,
+                    out_width  = 2 * fft_data_width,
+                    log_width  = fft_data_width,
+                )
+                self.comb += self.fft_averager.reset.eq(self.reset)
+
+            # FFT Hold.
+            # ---------
+            # Max/min |X|^2 hold of all the FFT frames, streamed on demand (fft_hold_control.dump).
+            if with_fft_hold:
+                self.fft_hold = SpectrumHold(
+                    data_width = self.fft.out_width,
+                    order_log2 = fft_order_log2,
+                    out_width  = 2 * fft_data_width,
+                )
+                self.comb += self.fft_hold.reset.eq(self.reset)
+
+            # FFT Decimator.
+            # --------------
+            # Forwards 1 out of K output frames (aligned on last) to reduce the DMA bandwidth.
+            if with_fft_decimator:
+                self.fft_decimator = FrameDecimator([("re", fft_data_width), ("im", fft_data_width)])
+                self.comb += self.fft_decimator.reset.eq(self.reset)
+
+            # PFB Channelizer.
+            # ----------------
+            # Polyphase filter bank front-end (prototype filter in its coefficient RAM) + selection of
+            # the channels of each FFT frame (channels table, ids in the frame header), see pfb.py.
+            # The FFT input rate is multiplied by 2 when oversampled (see sdr_planner).
+            if with_pfb:
+                if fft_data_width != 16:
+                    raise ValueError(f"PFB channelizer: the frame headers (16-bit halves) need "
+                        f"fft_data_width=16 (fft_data_width={fft_data_width}).")
+                self.pfb = PolyphaseFilterBank(
+                    data_width  = fft_data_width,
+                    coeff_width = pfb_coeff_width,
+                    order_log2  = fft_order_log2,
+                    taps        = pfb_taps,
+                )
+                self.pfb_channels = ChannelSelector(
+                    data_width = self.fft.out_width,
+                    order_log2 = fft_order_log2,
+                    radix      = fft_radix,
+                )
+                self.comb += [
+                    self.pfb.reset.eq(self.reset),
+                    self.pfb_channels.reset.eq(self.reset),
+                ]
+
+        # Packets.
+        # --------
+        # Longest source frame of the enabled stages (see source_frame_len()), streams without
+        # frames are cut every `frame_len` samples. `packet_len` adds the frame headers (source
+        # packets length).
+        frame_len = source_frame_len(with_fft, fft_order_log2, fft_data_width, with_fft_bfp,
+            fft_bfp_width, with_pfb)
+        self.packet_len = frame_len + (header_words(2 * fft_data_width) if with_timestamps else 0)
+
+        # FFT Buffer.
+        # -----------
+        # Elastic buffer of whole output packets (frames + headers) in front of source (one packet
+        # stored while the next one is received): packets that would overflow it are dropped whole.
+        if with_fft and with_fft_buffer:
+            self.fft_buffer = FrameFIFO(
+                layout = [("re", fft_data_width), ("im", fft_data_width)],
+                depth  = frame_fifo_depth(self.packet_len),
+            )
+            self.comb += self.fft_buffer.reset.eq(self.reset)
+
+        # Frame Headers.
+        # --------------
+        # Timestamp header before each FFT frame (or each `frame_len` samples without FFT), see
+        # timestamp.py.
+        if with_timestamps:
+            self.frame_headers = FrameHeaderInserter(
+                layout     = [("re", fft_data_width), ("im", fft_data_width)],
+                packet_len = frame_len,
+            )
+            self.comb += self.frame_headers.reset.eq(self.reset)
+            # Time of the first sample of the frames when entering the FFT.
+            if with_fft:
+                self.fft_time = FrameTimeTracker()
+
+        # Snapshot Capture.
+        # -----------------
+        # ep0 samples in a DRAM circular pre-trigger buffer, snapshots drained on capture.source (see
+        # capture.py). capture.reset/DRAM streams are driven by the target (kept across stream stops).
+        if with_capture:
+            self.capture = SnapshotCapture(
+                data_width      = fir_data_in_width,
+                port_data_width = capture_port_width,
+                base            = capture_base,
+                depth           = capture_depth,
+            )
+            self.comb += self.capture.time.eq(self.time)
+            # FFT bin trigger.
+            if with_fft:
+                self.capture_trigger = BinTrigger(
+                    data_width = self.fft.out_width,
+                    order_log2 = fft_order_log2,
+                    radix      = fft_radix,
+                )
+                self.comb += self.capture_trigger.reset.eq(self.reset)
+
+        # DDC.
+        # ----
+        # NCO + complex mixer moving a band of interest to DC (zoom-FFT with the CIC/FIR decimation).
+        if with_ddc:
+            self.ddc = DDC(
+                data_in_width  = fir_data_in_width,
+                data_out_width = fir_data_in_width,
+                lut_addr_width = ddc_lut_addr_width,
+            )
+            self.comb += self.ddc.reset.eq(self.reset)
+
+        # CIC Decimator.
+        # --------------
+        # Multiplier-free large ratio decimation before the FIR (which then compensates the droop).
+        if with_cic:
+            self.cic = CICDecimator(
+                data_in_width  = fir_data_in_width,
+                data_out_width = fir_data_in_width,
+                stages         = cic_stages,
+                max_decimation = cic_max_decimation,
+            )
+            self.comb += self.cic.reset.eq(self.reset)
+
         # MAIA SDR FIR.
         # -------------
         if with_fir:
@@ -114,42 +385,63 @@ class SDRProcessing(LiteXModule):
             ])
 
             # FIFO to check overflow.
+            fir_overflow     = Signal()
             fir_fifo_ready_d = Signal()
             self.fir_fifo    = ResetInserter()(stream.SyncFIFO([("data", 2 * fir_data_in_width)], 16))
             self.fir = fir   = MaiaSDRFIR(platform,
-                data_in_width  = fir_data_in_width,
-                data_out_width = fir_data_out_width,
-                coeff_width    = fir_coeff_width,
-                decim_width    = fir_decim_width,
-                oper_width     = fir_oper_width,
-                macc_trunc     = fir_macc_trunc,
-                len_log2       = fir_len_log2,
-                clk_domain     = fir_clk_domain,
-                with_csr       = fir_with_csr,
+                data_in_width    = fir_data_in_width,
+                data_out_width   = fir_data_out_width,
+                coeff_width      = fir_coeff_width,
+                decim_width      = fir_decim_width,
+                oper_width       = fir_oper_width,
+                macc_trunc       = fir_macc_trunc,
+                len_log2         = fir_len_log2,
+                clk_domain       = fir_clk_domain,
+                with_coeff_banks = fir_coeff_banks,
+                with_coeff_sink  = fir_coeff_sink,
+                with_csr         = fir_with_csr,
             )
 
             # MAIA SDR FIR Logic.
             # -------------------
             # Store ready -> not ready for FIR FIFO (means FIR is too slow).
+            self.comb += fir_overflow.eq(~self.fir_fifo.sink.ready & fir_fifo_ready_d)
             self.sync += [
                 fir_fifo_ready_d.eq(self.fir_fifo.sink.ready),
                 If(self.reset,
                     self._fir_status.fields.overflow.eq(0),
-                ).Elif(~self.fir_fifo.sink.ready & fir_fifo_ready_d,
+                ).Elif(fir_overflow,
                     self._fir_status.fields.overflow.eq(1),
                 )
             ]
 
-            self.comb += self.fir_fifo.reset.eq(self.reset),
+            self.comb += [
+                self.fir_fifo.reset.eq(self.reset),
+                self.fir.reset.eq(self.reset),
+            ]
+
+            # FIR Coefficients Sink.
+            # ----------------------
+            # Burst coefficients upload (DMA/UDP): [31] write, [30:20] address, [19:0] coefficient.
+            if fir_coeff_sink:
+                self.comb += [
+                    fir_coeff_sink.ready.eq(self.fir.coeff_sink.ready),
+                    self.fir.coeff_sink.valid.eq(fir_coeff_sink.valid & fir_coeff_sink.data[31]),
+                    self.fir.coeff_sink.addr.eq(fir_coeff_sink.data[20:31]),
+                    self.fir.coeff_sink.data.eq(fir_coeff_sink.data[0:20]),
+                ]
 
-        # RFIC -> FIFO -> [MaiaSDRFIR] -> MaiaSDRFFT -> PCIe.
-        # ---------------------------------------------------
+        # RFIC -> FIFO -> [DDC] -> [CIC] -> [MaiaSDRFIR] -> MaiaSDRFFT -> [Headers] -> PCIe.
+        # -----------------------------------------------------------------------------------
         # Default data path (everything in bypass).
         self.comb += [
-            # sink -> ep0.
-            sink.connect(ep0, omit=["data"]),
-            ep0.re.eq(sink.data[0: fir_data_in_width]),
-            ep0.im.eq(sink.data[fir_data_in_width:]),
+            # sink -> epi.
+            sink.connect(epi, omit=["data"]),
+            epi.re.eq(sink.data[0: fir_data_in_width]),
+            epi.im.eq(sink.data[fir_data_in_width:]),
+
+            # epi -> ep0.
+            epi.connect(ep0),
 
             # ep0 -> ep1.
             ep0.connect(ep1),
@@ -157,9 +449,12 @@ class SDRProcessing(LiteXModule):
             # ep1 -> ep2.
             ep1.connect(ep2),
 
-            # ep2 -> Converter.
-            ep2.connect(source, omit=["re", "im"]),
-            source.data.eq(Cat(ep2.re, ep2.im)),
+            # ep2 -> ep3.
+            ep2.connect(ep3),
+
+            # ep3 -> Converter.
+            ep3.connect(source, omit=["re", "im"]),
+            source.data.eq(Cat(ep3.re, ep3.im)),
         ]
 
         # LiteDRAM Integration.
@@ -168,26 +463,238 @@ class SDRProcessing(LiteXModule):
             self.comb += [
                 If(self._configuration.fields.litedram_fifo,
                     sink.connect(self.ext_fifo_source),
-                    ext_fifo_sink.connect(ep0, omit=["data"]),
-                    ep0.re.eq(ext_fifo_sink.data[0: fir_data_in_width]),
-                    ep0.im.eq(ext_fifo_sink.data[fir_data_in_width:]),
+                    ext_fifo_sink.connect(epi, omit=["data"]),
+                    epi.re.eq(ext_fifo_sink.data[0: fir_data_in_width]),
+                    epi.im.eq(ext_fifo_sink.data[fir_data_in_width:]),
                 ),
             ]
 
+        # DDC Integration.
+        # ----------------
+        if with_ddc:
+            self.comb += If(self._configuration.fields.ddc,
+                epi.connect(self.ddc.sink),
+                self.ddc.source.connect(ep0),
+            )
+
+        # CIC Integration.
+        # ----------------
+        if with_cic:
+            self.comb += If(self._configuration.fields.cic,
+                ep0.connect(self.cic.sink),
+                self.cic.source.connect(ep1),
+            )
+
         # FIR Integration.
         # ----------------
         if with_fir:
+            fir_input = [ep0.connect(self.fir.sink)]
+            if with_cic:
+                fir_input = [
+                    If(self._configuration.fields.cic,
+                        self.cic.source.connect(self.fir.sink),
+                    ).Else(*fir_input)
+                ]
             self.comb += If(self._configuration.fields.fir,
-                ep0.connect(self.fir.sink),
+                *fir_input,
                 self.fir.source.connect(ep1),
             ),
 
         # FFT Integration.
         # ----------------
         if with_fft:
+            fft_output = [self.fft.source.connect(ep2)]
+            if with_fft_reorder:
+                fft_output = [
+                    If(self._configuration.fields.fft_reorder,
+                        self.fft.source.connect(self.fft_reorder.sink),
+                        self.fft_reorder.source.connect(ep2),
+                    ).Else(*fft_output)
+                ]
+            if with_fft_bfp:
+                fft_frames = [self.fft.source.connect(self.fft_bfp.sink)]
+                if with_fft_reorder:
+                    fft_frames = [
+                        If(self._configuration.fields.fft_reorder,
+                            self.fft.source.connect(self.fft_reorder.sink),
+                            self.fft_reorder.source.connect(self.fft_bfp.sink),
+                        ).Else(*fft_frames)
+                    ]
+                fft_output = [
+                    If(self._configuration.fields.fft_bfp,
+                        *fft_frames,
+                        self.fft_bfp.source.connect(ep2, omit=["data"]),
+                        ep2.re.eq(self.fft_bfp.source.data[:fft_data_width]),
+                        ep2.im.eq(self.fft_bfp.source.data[fft_data_width:]),
+                    ).Else(*fft_output)
+                ]
+            if with_fft_averager:
+                fft_output = [
+                    If(self._configuration.fields.fft_averager,
+                        self.fft.source.connect(self.fft_averager.sink),
+                        self.fft_averager.source.connect(ep2, omit=["data"]),
+                        ep2.re.eq(self.fft_averager.source.data[:fft_data_width]),
+                        ep2.im.eq(self.fft_averager.source.data[fft_data_width:]),
+                    ).Else(*fft_output)
+                ]
+            if with_fft_hold:
+                fft_output = [
+                    If(self._configuration.fields.fft_hold,
+                        self.fft_hold.source.connect(ep2, omit=["data"]),
+                        ep2.re.eq(self.fft_hold.source.data[:fft_data_width]),
+                        ep2.im.eq(self.fft_hold.source.data[fft_data_width:]),
+                    ).Else(*fft_output)
+                ]
+                # The hold sees all the FFT frames, whatever the output.
+                self.comb += [
+                    self.fft_hold.sink.valid.eq(self.fft.source.valid & self._configuration.fields.fft),
+                    self.fft_hold.sink.re.eq(self.fft.source.re),
+                    self.fft_hold.sink.im.eq(self.fft.source.im),
+                    self.fft_hold.sink.last.eq(self.fft.source.last),
+                ]
+            fft_input = [ep1.connect(self.fft.sink)]
+            if with_fft_overlap:
+                fft_input = [
+                    ep1.connect(self.fft_overlap.sink),
+                    self.fft_overlap.source.connect(self.fft.sink),
+                ]
+            if with_pfb:
+                fft_input = [
+                    If(self._configuration.fields.pfb,
+                        ep1.connect(self.pfb.sink),
+                        self.pfb.source.connect(self.fft.sink),
+                    ).Else(*fft_input)
+                ]
+                fft_output = [
+                    If(self._configuration.fields.pfb,
+                        self.fft.source.connect(self.pfb_channels.sink),
+                        self.pfb_channels.source.connect(ep2, omit=["channel"]), # Ids in the header.
+                    ).Else(*fft_output)
+                ]
             self.comb += [
                 If(self._configuration.fields.fft,
-                    ep1.connect(self.fft.sink),
-                    self.fft.source.connect(ep2),
+                    *fft_input,
+                    *fft_output
+                ),
+            ]
+
+        # Frame Headers Integration.
+        # --------------------------
+        if with_timestamps:
+            frame_time = self.time
+            if with_fft:
+                fft_in_count  = Signal(fft_order_log2)
+                fft_out_first = Signal(reset=1)
+                self.sync += [
+                    If(self.reset,
+                        fft_in_count.eq(0),
+                        fft_out_first.eq(1),
+                    ).Else(
+                        If(self.fft.sink.valid & self.fft.sink.ready,
+                            fft_in_count.eq(fft_in_count + 1),
+                        ),
+                        If(self.fft.source.valid,
+                            fft_out_first.eq(self.fft.source.last),
+                        )
+                    )
+                ]
+                self.comb += [
+                    self.fft_time.reset.eq(self.reset | ~self._configuration.fields.fft),
+                    self.fft_time.time.eq(self.time),
+                    self.fft_time.start.eq(self.fft.sink.valid & self.fft.sink.ready & (fft_in_count == 0)),
+                    self.fft_time.done.eq(self.fft.source.valid & fft_out_first),
+                ]
+                frame_time = Mux(self._configuration.fields.fft, self.fft_time.frame_time, self.time)
+                # FFT Reorder: one frame later, time of the frame handed over.
+                if with_fft_reorder:
+                    reorder_time = Signal(64)
+                    self.sync += If(self.fft_reorder.handover, reorder_time.eq(self.fft_time.frame_time))
+                    frame_time = Mux(self._configuration.fields.fft & self._configuration.fields.fft_reorder,
+                        reorder_time, frame_time)
+                # FFT Block Floating Point: one frame later, time of the frame (when entering it)
+                # handed over.
+                if with_fft_bfp:
+                    bfp_first   = Signal(reset=1)
+                    bfp_in_time = Signal(64)
+                    bfp_time    = Signal(64)
+                    self.sync += [
+                        If(self.reset,
+                            bfp_first.eq(1),
+                        ).Elif(self.fft_bfp.sink.valid,
+                            bfp_first.eq(self.fft_bfp.sink.last),
+                            If(bfp_first,
+                                bfp_in_time.eq(frame_time),
+                            )
+                        ),
+                        If(self.fft_bfp.handover,
+                            bfp_time.eq(Mux(bfp_first, frame_time, bfp_in_time)),
+                        )
+                    ]
+                    frame_time = Mux(self._configuration.fields.fft & self._configuration.fields.fft_bfp,
+                        bfp_time, frame_time)
+            self.comb += [
+                self.frame_headers.time.eq(frame_time),
+                If(self._configuration.fields.timestamps,
+                    ep2.connect(self.frame_headers.sink),
+                    self.frame_headers.source.connect(ep3),
                 ),
             ]
+
+        # FFT Decimator Integration.
+        # --------------------------
+        # Frames only (FFT enabled, as the averager/hold): the raw stream bypasses it.
+        if with_fft and with_fft_decimator:
+            self.comb += If(self._configuration.fields.fft,
+                ep3.connect(self.fft_decimator.sink),
+                self.fft_decimator.source.connect(source, omit=["re", "im"]),
+                source.data.eq(Cat(self.fft_decimator.source.re, self.fft_decimator.source.im)),
+            )
+
+        # FFT Buffer Integration.
+        # -----------------------
+        # Last stage before source (DMA converter), frames only (FFT enabled).
+        if with_fft and with_fft_buffer:
+            fft_buffer_input = self.fft_decimator.source if with_fft_decimator else ep3
+            self.comb += If(self._configuration.fields.fft,
+                fft_buffer_input.connect(self.fft_buffer.sink),
+                self.fft_buffer.source.connect(source, omit=["re", "im"]),
+                source.data.eq(Cat(self.fft_buffer.source.re, self.fft_buffer.source.im)),
+            )
+
+        # Snapshot Capture Integration.
+        # -----------------------------
+        # Taps on ep0 and on the FFT output (whatever the output stage).
+        if with_capture:
+            self.comb += [
+                self.capture.sink.valid.eq(ep0.valid & ep0.ready),
+                self.capture.sink.re.eq(ep0.re),
+                self.capture.sink.im.eq(ep0.im),
+            ]
+            if with_fft:
+                self.comb += [
+                    self.capture_trigger.sink.valid.eq(self.fft.source.valid & self._configuration.fields.fft),
+                    self.capture_trigger.sink.re.eq(self.fft.source.re),
+                    self.capture_trigger.sink.im.eq(self.fft.source.im),
+                    self.capture_trigger.sink.last.eq(self.fft.source.last),
+                    self.capture.ext_trigger.eq(self.capture_trigger.trigger),
+                ]
+
+        # Performance Counters.
+        # ---------------------
+        # Transfers/stalls at each stage boundary, FFT frames, overflow events (start of a sink stall:
+        # the RFIC ignores ready, so samples are lost, or FIR FIFO overflow) and elapsed cycles to
+        # compute rates. All counters are snapshotted with one write to perf_control.latch.
+        if with_perf_counters:
+            sink_stall   = Signal()
+            sink_stall_d = Signal()
+            overflows    = [sink_stall & ~sink_stall_d] + ([fir_overflow] if with_fir else [])
+            self.comb += sink_stall.eq(sink.valid & ~sink.ready)
+            self.sync += sink_stall_d.eq(sink_stall)
+
+            self.perf = PerfCounters()
+            self.perf.add_counter("cycles",    1,                    description="Clock cycles.")
+            self.perf.add_counter("overflows", Reduce("OR", overflows), width=32, description="Overflow events.")
+            self.perf.add_stream("ep0",    ep0)
+            self.perf.add_stream("ep1",    ep1)
+            self.perf.add_stream("ep2",    ep2,    with_frames=True)
+            self.perf.add_stream("source", source, with_frames=True)
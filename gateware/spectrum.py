@@ -0,0 +1,590 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import numpy as np
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+# Utils --------------------------------------------------------------------------------------------
+
+def log2_format(out_width=32, log_width=16):
+    """Integer/fractional bits of the fixed-point log2 of an out_width-bit unsigned value."""
+    int_bits  = bits_for(out_width - 1)
+    frac_bits = log_width - int_bits
+    assert frac_bits > 0
+    return int_bits, frac_bits
+
+def log2_fixed(value, out_width=32, log_width=16):
+    """Fixed-point log2 of unsigned values (as computed by SpectrumAverager).
+
+    The integer part is the position of the MSB, the fractional part the frac_bits following the MSB
+    (log2(1 + x) ~ x). log2(0) returns 0 (as log2(1)). Divide by 2**frac_bits to get log2(value).
+    """
+    int_bits, frac_bits = log2_format(out_width, log_width)
+    value = np.asarray(value, dtype=np.uint64)
+    msb   = np.zeros(value.shape, dtype=np.uint64)
+    for i in range(1, out_width):
+        msb[value >= np.uint64(2**i)] = i
+    norm  = (value << (np.uint64(out_width - 1) - msb)) & np.uint64(2**out_width - 1)
+    frac  = (norm >> np.uint64(out_width - 1 - frac_bits)) & np.uint64(2**frac_bits - 1)
+    return ((msb << np.uint64(frac_bits)) | frac).astype(np.uint64)
+
+# Spectrum Averager Model --------------------------------------------------------------------------
+
+def model(order_log2, re_in, im_in, navg, shift=0, log2=False, out_width=32, log_width=16):
+    """Output words of SpectrumAverager for the FFT frames in re_in/im_in (incomplete groups of
+    `navg` frames produce no output)."""
+    n     = 2**order_log2
+    re    = np.asarray(re_in, dtype=np.int64).reshape(-1, n)
+    im    = np.asarray(im_in, dtype=np.int64).reshape(-1, n)
+    power = (re*re + im*im).astype(np.uint64)
+    ngrp  = power.shape[0] // navg
+    acc   = power[:ngrp * navg].reshape(ngrp, navg, n).sum(axis=1, dtype=np.uint64)
+    out   = np.minimum(acc >> np.uint64(shift), np.uint64(2**out_width - 1))
+    if log2:
+        log = log2_fixed(out, out_width, log_width).reshape(-1, 2)
+        out = log[:, 0] | (log[:, 1] << np.uint64(log_width))
+    return out.ravel()
+
+# Spectrum Hold Model ------------------------------------------------------------------------------
+
+def hold_model(order_log2, re_in, im_in):
+    """Max/min hold of |X|^2 per bin after each FFT frame in re_in/im_in (as (frames, 2**order_log2)
+    arrays, from the first frame)."""
+    n     = 2**order_log2
+    re    = np.asarray(re_in, dtype=np.int64).reshape(-1, n)
+    im    = np.asarray(im_in, dtype=np.int64).reshape(-1, n)
+    power = (re*re + im*im).astype(np.uint64)
+    return np.maximum.accumulate(power, axis=0), np.minimum.accumulate(power, axis=0)
+
+# Spectrum Accumulator ----------------------------------------------------------------------------
+
+SPECTRUM_OPS = {
+    "sum": lambda acc, power: acc + power,
+    "max": lambda acc, power: Mux(power > acc, power, acc),
+    "min": lambda acc, power: Mux(power < acc, power, acc),
+}
+
+def saturate(value, width):
+    """Unsigned value saturated to width bits."""
+    return Mux(value[width:] != 0, 2**width - 1, value) if len(value) > width else value
+
+class SpectrumAccumulator(LiteXModule):
+    """Per-bin combination of |X|^2 over FFT frames (SpectrumAverager/SpectrumHold core).
+
+    |X|^2 of each bin is combined (`ops`: "sum", "max" and/or "min", see SPECTRUM_OPS) with its
+    acc_width-bit accumulators of a 2**order_log2 deep BRAM, read at the input and written back 2
+    cycles later (bins of a frame are distinct); the accumulators restart from |X|^2 on the bins
+    flagged `init`. Subclasses drive `init` and the `flags` (one per name, registered with the bin)
+    from `index`/`start` and emit the updated accumulators (`values`, with `s2_flags` and `s2_last`)
+    when `s2_valid`.
+
+    Frames are aligned on sink.last. Like MaiaSDRFFT, the module has no backpressure: sink is always
+    ready and source.valid is a one cycle pulse per word (ready is ignored).
+    """
+    def __init__(self, data_width=16, order_log2=10, out_width=32, acc_width=32, ops=["sum"], flags=[]):
+        power_width = 2 * data_width
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint([("re", data_width), ("im", data_width)])
+        self.source = source = stream.Endpoint([("data", out_width)])
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset = Signal()
+        self.init  = Signal()
+        self.flags = {name: Signal(name=name) for name in flags}
+
+        # # #
+
+        self.comb += sink.ready.eq(1)
+
+        # Bin index (aligned on sink.last).
+        self.index = index = Signal(order_log2)
+        self.start = start = Signal()
+        self.comb += start.eq(index == 0)
+        self.sync += [
+            If(self.reset,
+                index.eq(0),
+            ).Elif(sink.valid,
+                index.eq(index + 1),
+                If(sink.last,
+                    index.eq(0),
+                )
+            )
+        ]
+
+        # Accumulators (read at the input, written back 2 cycles later: bins of a frame are distinct).
+        mem    = Memory(len(ops) * acc_width, 2**order_log2)
+        rdport = mem.get_port()
+        wrport = mem.get_port(write_capable=True)
+        self.specials += mem, rdport, wrport
+        self.comb += rdport.adr.eq(index)
+
+        # Stage 1: Input register.
+        s1_valid = Signal()
+        s1_re    = Signal((data_width, True))
+        s1_im    = Signal((data_width, True))
+        s1_index = Signal(order_log2)
+        s1_init  = Signal()
+        s1_last  = Signal()
+        s1_flags = {name: Signal() for name in flags}
+        self.sync += [
+            s1_valid.eq(sink.valid & ~self.reset),
+            s1_re.eq(sink.re),
+            s1_im.eq(sink.im),
+            s1_index.eq(index),
+            s1_init.eq(self.init),
+            s1_last.eq(sink.last),
+            *[s1_flags[name].eq(self.flags[name]) for name in flags],
+        ]
+
+        # Stage 2: |X|^2 and accumulators read.
+        self.s2_valid = s2_valid = Signal()
+        self.s2_last  = s2_last  = Signal()
+        self.s2_flags = s2_flags = {name: Signal() for name in flags}
+        s2_power = Signal(power_width)
+        s2_accs  = Signal(len(ops) * acc_width)
+        s2_index = Signal(order_log2)
+        s2_init  = Signal()
+        self.sync += [
+            s2_valid.eq(s1_valid),
+            s2_power.eq(s1_re * s1_re + s1_im * s1_im),
+            s2_accs.eq(rdport.dat_r),
+            s2_index.eq(s1_index),
+            s2_init.eq(s1_init),
+            s2_last.eq(s1_last),
+            *[s2_flags[name].eq(s1_flags[name]) for name in flags],
+        ]
+
+        # Stage 3: Combination/write back (updated accumulators to the subclasses).
+        self.values = {}
+        for i, op in enumerate(ops):
+            acc   = s2_accs[i * acc_width:(i + 1) * acc_width]
+            value = Signal(acc_width, name=f"{op}_value")
+            self.comb += value.eq(Mux(s2_init, s2_power, SPECTRUM_OPS[op](acc, s2_power)))
+            self.values[op] = value
+        self.comb += [
+            wrport.adr.eq(s2_index),
+            wrport.dat_w.eq(Cat(*[self.values[op] for op in ops])),
+            wrport.we.eq(s2_valid),
+        ]
+
+# Spectrum Averager --------------------------------------------------------------------------------
+
+class SpectrumAverager(SpectrumAccumulator):
+    """Power spectrum averaging of FFT frames.
+
+    Accumulates |X|^2 of each bin over `navg_minus_one + 1` frames (SpectrumAccumulator "sum") and
+    emits one frame of `(acc >> shift)` (saturated to out_width) per average, or the fixed-point
+    log2 of it (see log2_fixed) with two bins packed per word (even bin in the LSBs). The output rate
+    is at most the input one.
+    """
+    def __init__(self, data_width=16, order_log2=10, out_width=32, navg_width=10, log_width=16,
+        with_csr = True,
+        ):
+        acc_width = 2 * data_width + navg_width
+        int_bits, frac_bits = log2_format(out_width, log_width)
+        assert log_width <= out_width // 2
+        SpectrumAccumulator.__init__(self,
+            data_width = data_width,
+            order_log2 = order_log2,
+            out_width  = out_width,
+            acc_width  = acc_width,
+            ops        = ["sum"],
+            flags      = ["final"],
+        )
+        sink   = self.sink
+        source = self.source
+
+        # Signals ----------------------------------------------------------------------------------
+        self.navg_minus_one = Signal(navg_width)
+        self.shift          = Signal(bits_for(acc_width))
+        self.log2           = Signal()
+
+        # Parameters/Locals ------------------------------------------------------------------------
+        self.order_log2 = order_log2
+        self.navg_width = navg_width
+        self.acc_width  = acc_width
+
+        # # #
+
+        # Frame of the average (aligned on sink.last), the first one restarts the accumulation.
+        frame = Signal(navg_width)
+        final = self.flags["final"]
+        self.comb += [
+            self.init.eq(frame == 0),
+            final.eq(frame >= self.navg_minus_one),
+        ]
+        self.sync += [
+            If(self.reset,
+                frame.eq(0),
+            ).Elif(sink.valid & sink.last,
+                If(final,
+                    frame.eq(0),
+                ).Else(
+                    frame.eq(frame + 1),
+                )
+            )
+        ]
+
+        # Stage 3: Scaling and saturation of the averaged frame.
+        scaled   = Signal(acc_width)
+        s3_valid = Signal()
+        s3_value = Signal(out_width)
+        s3_last  = Signal()
+        self.comb += scaled.eq(self.values["sum"] >> self.shift)
+        self.sync += [
+            s3_valid.eq(self.s2_valid & self.s2_flags["final"]),
+            s3_value.eq(saturate(scaled, out_width)),
+            s3_last.eq(self.s2_last),
+        ]
+
+        # Stage 4: log2 integer part (MSB position).
+        msb      = Signal(int_bits)
+        s4_valid = Signal()
+        s4_value = Signal(out_width)
+        s4_msb   = Signal(int_bits)
+        s4_last  = Signal()
+        for i in range(1, out_width):
+            self.comb += If(s3_value[i], msb.eq(i))
+        self.sync += [
+            s4_valid.eq(s3_valid),
+            s4_value.eq(s3_value),
+            s4_msb.eq(msb),
+            s4_last.eq(s3_last),
+        ]
+
+        # Stage 5: log2 fractional part (bits following the MSB).
+        norm = Signal(out_width)
+        log  = Signal(log_width)
+        self.comb += [
+            norm.eq(s4_value << (out_width - 1 - s4_msb)),
+            log.eq(Cat(norm[out_width - 1 - frac_bits:out_width - 1], s4_msb)),
+        ]
+
+        # Output: linear words, or two log2 bins per word.
+        half = Signal()
+        low  = Signal(log_width)
+        self.sync += [
+            source.valid.eq(0),
+            If(~self.log2,
+                source.valid.eq(s3_valid),
+                source.data.eq(s3_value),
+                source.last.eq(s3_last),
+            ).Elif(s4_valid,
+                half.eq(~half & ~s4_last),
+                If(~half,
+                    low.eq(log),
+                ).Else(
+                    source.valid.eq(1),
+                    source.data.eq(Cat(low, log)),
+                    source.last.eq(s4_last),
+                )
+            )
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._cfg = CSRStorage(name="cfg", description="Spectrum Averager Configuration.", fields=[
+            CSRField("log2", size=1, offset=0, description="Output fixed-point log2 power (two bins per word)."),
+        ])
+        self._navg_minus_one = CSRStorage(self.navg_width, name="navg_minus_one", description="Number of averaged frames minus one.")
+        self._shift          = CSRStorage(len(self.shift), name="shift",          description="Right shift of the accumulated power (log2 of the number of frames for a mean).")
+
+        self.comb += [
+            self.log2.eq(self._cfg.fields.log2),
+            self.navg_minus_one.eq(self._navg_minus_one.storage),
+            self.shift.eq(self._shift.storage),
+        ]
+
+# Frame Decimator ----------------------------------------------------------------------------------
+
+class FrameDecimator(LiteXModule):
+    """Forward 1 out of every `ratio_minus_one + 1` frames, dropping the others.
+
+    The forwarded/dropped decision is taken per frame (frames are delimited by sink.last), so
+    output frames are always complete; a new ratio is applied at the next frame boundary. Dropped
+    frames are consumed (sink.ready=1) and counted in `dropped` (wrapping) so that the host can
+    reconstruct the timing of the forwarded ones.
+    """
+    def __init__(self, layout, ratio_width=16, with_csr=True):
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint(layout)
+        self.source = source = stream.Endpoint(layout)
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset           = Signal()
+        self.ratio_minus_one = Signal(ratio_width)
+        self.dropped         = Signal(32)
+
+        # Parameters/Locals ------------------------------------------------------------------------
+        self.ratio_width = ratio_width
+
+        # # #
+
+        # Frame count (forward the first frame of each ratio_minus_one + 1).
+        count   = Signal(ratio_width)
+        forward = Signal()
+        self.comb += forward.eq(count == 0)
+        self.sync += [
+            If(self.reset,
+                count.eq(0),
+                self.dropped.eq(0),
+            ).Elif(sink.valid & sink.ready & sink.last,
+                If(count >= self.ratio_minus_one,
+                    count.eq(0),
+                ).Else(
+                    count.eq(count + 1),
+                ),
+                If(~forward,
+                    self.dropped.eq(self.dropped + 1),
+                )
+            )
+        ]
+
+        # Gate.
+        self.comb += [
+            If(forward,
+                sink.connect(source),
+            ).Else(
+                sink.ready.eq(1),
+            )
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._ratio_minus_one = CSRStorage(self.ratio_width, name="ratio_minus_one", description="Forward 1 out of ratio_minus_one + 1 frames.")
+        self._dropped         = CSRStatus(32,                name="dropped",         description="Dropped frames (wraps, cleared on reset).")
+
+        self.comb += [
+            self.ratio_minus_one.eq(self._ratio_minus_one.storage),
+            self._dropped.status.eq(self.dropped),
+        ]
+
+# Frame FIFO ---------------------------------------------------------------------------------------
+
+def frame_fifo_depth(frame_len):
+    """FrameFIFO depth (power of 2) holding two frames of `frame_len` samples (one stored while the
+    next one is received)."""
+    return 2**log2_int(2 * frame_len, need_pow2=False)
+
+class FrameFIFO(LiteXModule):
+    """Elastic buffer of whole frames (delimited by sink.last) behind a source without backpressure.
+
+    Sink is always ready. Samples are written in a `depth` samples circular BRAM, a frame only being
+    visible on source once its last sample is written; when the buffer fills up during a frame (source
+    stalled), the frame is rolled back and its remaining samples discarded, so source only sees
+    complete frames. Dropped frames are counted in `dropped` (wraps, cleared on reset). `depth`
+    (power of 2) must hold the longest frame.
+    """
+    def __init__(self, layout, depth=1024, with_csr=True):
+        assert depth & (depth - 1) == 0
+
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint(layout)
+        self.source = source = stream.Endpoint(layout)
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset   = Signal()
+        self.dropped = Signal(32)
+
+        # # #
+
+        addr_width = log2_int(depth)
+        data_width = len(sink.payload.raw_bits()) + 1
+        mem   = Memory(data_width, depth)
+        wport = mem.get_port(write_capable=True)
+        rport = mem.get_port(has_re=True, mode=READ_FIRST) # Data registered (slot reused).
+        self.specials += mem, wport, rport
+
+        # Write side (wptr: next sample, cptr: end of the last complete frame).
+        wptr  = Signal(addr_width + 1)
+        cptr  = Signal(addr_width + 1)
+        rptr  = Signal(addr_width + 1)
+        level = Signal(addr_width + 1)
+        full  = Signal()
+        drop  = Signal()
+        self.comb += [
+            sink.ready.eq(1),
+            level.eq(wptr - rptr),
+            full.eq(level == depth),
+            wport.adr.eq(wptr[:addr_width]),
+            wport.dat_w.eq(Cat(sink.payload.raw_bits(), sink.last)),
+            wport.we.eq(sink.valid & ~drop & ~full & ~self.reset),
+        ]
+        self.sync += [
+            If(self.reset,
+                wptr.eq(0),
+                cptr.eq(0),
+                drop.eq(0),
+                self.dropped.eq(0),
+            ).Elif(sink.valid,
+                If(drop | full,
+                    # Roll back the frame, discard until its last sample.
+                    wptr.eq(cptr),
+                    drop.eq(~sink.last),
+                    If(~drop,
+                        self.dropped.eq(self.dropped + 1),
+                    )
+                ).Else(
+                    wptr.eq(wptr + 1),
+                    If(sink.last,
+                        cptr.eq(wptr + 1),
+                    )
+                )
+            )
+        ]
+
+        # Read side (complete frames, advances when the output is free or accepted).
+        ce = Signal()
+        self.comb += [
+            ce.eq(~source.valid | source.ready),
+            rport.adr.eq(rptr[:addr_width]),
+            rport.re.eq(ce),
+            Cat(source.payload.raw_bits(), source.last).eq(rport.dat_r),
+        ]
+        self.sync += [
+            If(self.reset,
+                rptr.eq(0),
+                source.valid.eq(0),
+            ).Elif(ce,
+                source.valid.eq(rptr != cptr),
+                If(rptr != cptr,
+                    rptr.eq(rptr + 1),
+                )
+            )
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._dropped = CSRStatus(32, name="dropped", description="Dropped frames (output stalled, wraps, cleared on reset).")
+
+        self.comb += self._dropped.status.eq(self.dropped)
+
+# Spectrum Hold ------------------------------------------------------------------------------------
+
+class SpectrumHold(SpectrumAccumulator):
+    """Max-hold/min-hold of |X|^2 per bin.
+
+    Every frame updates the max/min powers (SpectrumAccumulator "max"/"min", the first frame after a
+    reset/`clear` initializes them), so bursts are captured at 100% duty cycle. A `dump` request
+    emits, on the next two frames, the max-hold then the min-hold frames of `(power >> shift)`
+    (saturated to out_width): the dump rides along the update pipeline (each bin is emitted with its
+    updated value) so that no extra memory port is needed and the source is idle between dumps.
+    """
+    def __init__(self, data_width=16, order_log2=10, out_width=32, with_csr=True):
+        power_width = 2 * data_width
+        SpectrumAccumulator.__init__(self,
+            data_width = data_width,
+            order_log2 = order_log2,
+            out_width  = out_width,
+            acc_width  = power_width,
+            ops        = ["max", "min"],
+            flags      = ["dump", "dump_min"],
+        )
+        sink   = self.sink
+        source = self.source
+
+        # Signals ----------------------------------------------------------------------------------
+        self.clear = Signal()
+        self.dump  = Signal()
+        self.shift = Signal(bits_for(power_width))
+
+        # # #
+
+        # Frame flags (updated at the start of each frame): init (first frame after a clear), dump
+        # and dump of the min-hold (frame following the max-hold dump).
+        start    = self.start
+        fresh    = Signal(reset=1)
+        dump_req = Signal()
+        min_next = Signal()
+        f_init   = Signal()
+        f_dump   = Signal()
+        f_min    = Signal()
+        init     = self.init
+        dump     = self.flags["dump"]
+        dump_min = self.flags["dump_min"]
+        self.comb += [
+            If(start,
+                init.eq(fresh),
+                dump.eq(dump_req | min_next),
+                dump_min.eq(min_next),
+            ).Else(
+                init.eq(f_init),
+                dump.eq(f_dump),
+                dump_min.eq(f_min),
+            )
+        ]
+        self.sync += [
+            If(self.reset,
+                fresh.eq(1),
+                dump_req.eq(0),
+                min_next.eq(0),
+                f_init.eq(0),
+                f_dump.eq(0),
+                f_min.eq(0),
+            ).Else(
+                If(sink.valid,
+                    f_init.eq(init),
+                    f_dump.eq(dump),
+                    f_min.eq(dump_min),
+                    If(start,
+                        fresh.eq(0),
+                        If(min_next,
+                            min_next.eq(0),
+                        ).Else(
+                            dump_req.eq(0),
+                        )
+                    ),
+                    If(sink.last & dump & ~dump_min,
+                        min_next.eq(1),
+                    )
+                ),
+                If(self.clear,
+                    fresh.eq(1),
+                ),
+                If(self.dump,
+                    dump_req.eq(1),
+                )
+            )
+        ]
+
+        # Stage 3: Scaling and saturation of the dumped frame.
+        scaled = Signal(power_width)
+        self.comb += scaled.eq(Mux(self.s2_flags["dump_min"], self.values["min"], self.values["max"]) >> self.shift)
+        self.sync += [
+            source.valid.eq(self.s2_valid & self.s2_flags["dump"]),
+            source.data.eq(saturate(scaled, out_width)),
+            source.last.eq(self.s2_last),
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._control = CSRStorage(name="control", description="Spectrum Hold Control.", fields=[
+            CSRField("dump",  size=1, offset=0, pulse=True, description="Emit the max-hold then the min-hold frames (from the next frame)."),
+            CSRField("clear", size=1, offset=1, pulse=True, description="Restart the max/min hold (from the next frame)."),
+        ])
+        self._shift = CSRStorage(len(self.shift), name="shift", description="Right shift of the dumped powers.")
+
+        self.comb += [
+            self.dump.eq(self._control.fields.dump),
+            self.clear.eq(self._control.fields.clear),
+            self.shift.eq(self._shift.storage),
+        ]
@@ -0,0 +1,182 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+from migen import *
+
+from litex.gen import *
+
+from litex.soc.interconnect     import stream
+from litex.soc.interconnect.csr import *
+
+# Constants ----------------------------------------------------------------------------------------
+
+FRAME_HEADER_MAGIC = 0x5aa5_a55a
+FRAME_HEADER_BITS  = 128 # Magic (32-bit), timestamp (64-bit), frame count (32-bit).
+
+# Utils --------------------------------------------------------------------------------------------
+
+def header_words(data_width=32):
+    """Words of a frame header in a data_width stream."""
+    return (FRAME_HEADER_BITS + data_width - 1) // data_width
+
+def header(timestamp, count, data_width=32):
+    """Frame header words (as inserted by FrameHeaderInserter)."""
+    value = FRAME_HEADER_MAGIC | (timestamp % 2**64) << 32 | (count % 2**32) << 96
+    mask  = 2**data_width - 1
+    return [(value >> (i * data_width)) & mask for i in range(header_words(data_width))]
+
+def parse(words, packet_len, data_width=32):
+    """Split a stream of data_width words in (timestamp, count, packet words) frames.
+
+    Words before the first header (partial capture) are skipped, frames whose header is corrupted
+    end the parsing (the stream is out of sync).
+    """
+    n      = header_words(data_width)
+    words  = list(words)
+    frames = []
+    i      = 0
+    while i < len(words) and words[i] != FRAME_HEADER_MAGIC & (2**data_width - 1):
+        i += 1
+    while i + n + packet_len <= len(words):
+        value = sum(int(w) << (k * data_width) for k, w in enumerate(words[i:i + n]))
+        if value & 0xffff_ffff != FRAME_HEADER_MAGIC:
+            break
+        frames.append(((value >> 32) & (2**64 - 1), (value >> 96) & (2**32 - 1), words[i + n:i + n + packet_len]))
+        i += n + packet_len
+    return frames
+
+# Frame Time Tracker -------------------------------------------------------------------------------
+
+class FrameTimeTracker(LiteXModule):
+    """Carry the time of the frames through a pipeline without frame drops/reordering (MaiaSDRFFT).
+
+    `time` is queued on `start` (first sample of a frame entering the pipeline) and presented on
+    `frame_time` from the matching `done` (first sample of the frame leaving the pipeline). `depth`
+    is the number of frames the pipeline holds.
+    """
+    def __init__(self, depth=4):
+        # Signals ----------------------------------------------------------------------------------
+        self.reset      = Signal()
+        self.time       = Signal(64)
+        self.start      = Signal()
+        self.done       = Signal()
+        self.frame_time = Signal(64)
+
+        # # #
+
+        self.fifo = fifo = ResetInserter()(stream.SyncFIFO([("time", 64)], depth))
+        self.comb += [
+            fifo.reset.eq(self.reset),
+            fifo.sink.valid.eq(self.start),
+            fifo.sink.time.eq(self.time),
+            fifo.source.ready.eq(self.done),
+        ]
+        frame_time = Signal(64)
+        self.sync += If(self.done, frame_time.eq(fifo.source.time))
+        self.comb += self.frame_time.eq(Mux(self.done, fifo.source.time, frame_time))
+
+# Frame Header Inserter ----------------------------------------------------------------------------
+
+class FrameHeaderInserter(LiteXModule):
+    """Insert a header before each packet of a stream.
+
+    Packets are cut on sink.last (FFT frames) or every `packet_len` samples (streams without frames)
+    and preceded by header_words(data_width) words (LSBs first, see header()):
+
+    - [ 31:  0]: FRAME_HEADER_MAGIC.
+    - [ 95: 32]: `time` when the first sample of the packet was accepted.
+    - [127: 96]: Packet count (wraps, cleared on reset), gaps reveal the dropped packets.
+
+    Samples are buffered in a `fifo_depth` FIFO during the headers: the input must leave
+    header_words idle cycles per packet on average (the FFT ignores backpressure). `latency` is
+    `time` minus the timestamp of the last emitted header (pipeline latency).
+    """
+    def __init__(self, layout, packet_len=1024, fifo_depth=16, with_csr=True):
+        # Streams ----------------------------------------------------------------------------------
+        self.sink   = sink   = stream.Endpoint(layout)
+        self.source = source = stream.Endpoint(layout)
+
+        # Signals ----------------------------------------------------------------------------------
+        self.reset   = Signal()
+        self.time    = Signal(64)
+        self.latency = Signal(32)
+
+        # # #
+
+        data_width = len(sink.payload.raw_bits())
+        nwords     = header_words(data_width)
+
+        # Packetizer (last forced every packet_len samples).
+        count = Signal(max=packet_len)
+        first = Signal(reset=1)
+        last  = Signal()
+        self.comb += last.eq(sink.last | (count == (packet_len - 1)))
+        self.sync += [
+            If(self.reset,
+                count.eq(0),
+                first.eq(1),
+            ).Elif(sink.valid & sink.ready,
+                count.eq(count + 1),
+                first.eq(last),
+                If(last,
+                    count.eq(0),
+                )
+            )
+        ]
+
+        # Data/Timestamps FIFOs.
+        self.fifo    = fifo    = ResetInserter()(stream.SyncFIFO(layout, fifo_depth, buffered=True))
+        self.ts_fifo = ts_fifo = ResetInserter()(stream.SyncFIFO([("time", 64)], fifo_depth))
+        self.comb += [
+            fifo.reset.eq(self.reset),
+            ts_fifo.reset.eq(self.reset),
+            sink.connect(fifo.sink, omit=["valid", "ready", "last"]),
+            fifo.sink.valid.eq(sink.valid & (~first | ts_fifo.sink.ready)),
+            fifo.sink.last.eq(last),
+            ts_fifo.sink.valid.eq(sink.valid & first & fifo.sink.ready),
+            ts_fifo.sink.time.eq(self.time),
+            sink.ready.eq(fifo.sink.ready & (~first | ts_fifo.sink.ready)),
+        ]
+
+        # Header.
+        packet = Signal(32)
+        index  = Signal(max=max(nwords, 2))
+        bits   = Signal(nwords * data_width)
+        words  = Array(bits[i * data_width:(i + 1) * data_width] for i in range(nwords))
+        self.comb += bits.eq(Cat(C(FRAME_HEADER_MAGIC, 32), ts_fifo.source.time, packet))
+
+        self.fsm = fsm = ResetInserter()(FSM(reset_state="HEADER"))
+        self.comb += fsm.reset.eq(self.reset)
+        fsm.act("HEADER",
+            source.valid.eq(ts_fifo.source.valid),
+            source.payload.raw_bits().eq(words[index]),
+            If(source.valid & source.ready,
+                NextValue(index, index + 1),
+                If(index == (nwords - 1),
+                    NextValue(index, 0),
+                    NextValue(self.latency, self.time - ts_fifo.source.time),
+                    ts_fifo.source.ready.eq(1),
+                    NextState("DATA"),
+                )
+            )
+        )
+        fsm.act("DATA",
+            fifo.source.connect(source),
+            If(source.valid & source.ready & source.last,
+                NextValue(packet, packet + 1),
+                NextState("HEADER"),
+            )
+        )
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._latency = CSRStatus(32, name="latency",
+            description="Latency of the last frame (header time - frame timestamp, in time units).")
+
+        self.comb += self._latency.status.eq(self.latency)
@@ -0,0 +1,206 @@
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import json
+import atexit
+import time
+import shutil
+import hashlib
+import inspect
+import weakref
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+
+# Verilog Cache ------------------------------------------------------------------------------------
+
+# Content-addressed cache of the Verilog files produced by the Amaranth generators (fft_generator,
+# fir_generator): entries are keyed by a hash of the generator name, the source of its module (the
+# generator and the helpers it uses), its parameters, the maia_hdl/amaranth versions and the
+# maia_hdl sources, and store the .v file and the reported delay.
+#
+# The cache directory is $LITECOMPUTE_VERILOG_CACHE (default: ~/.cache/litecompute_sdr_poc/verilog),
+# setting it to "off" disables the cache.
+
+def cache_dir():
+    return os.path.expanduser(os.environ.get("LITECOMPUTE_VERILOG_CACHE",
+        os.path.join("~", ".cache", "litecompute_sdr_poc", "verilog")))
+
+def cache_enabled():
+    return os.environ.get("LITECOMPUTE_VERILOG_CACHE", "").lower() not in ["off", "0", "none"]
+
+def _version(package):
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "unknown"
+
+def _package_digest(package):
+    """Hash of the .py files of `package` (relative paths and contents): edits of an editable
+    install change the key even when its version string doesn't."""
+    from importlib.util import find_spec
+    spec = find_spec(package)
+    if spec is None:
+        return "unknown"
+    h = hashlib.sha256()
+    for location in spec.submodule_search_locations or [os.path.dirname(spec.origin)]:
+        for root, dirs, files in os.walk(location):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    h.update(os.path.relpath(path, location).encode())
+                    with open(path, "rb") as f:
+                        h.update(f.read())
+    return h.hexdigest()
+
+def cache_key(generator, params):
+    """Hash of the generator name, the source of its whole module (helpers used by the generator),
+    its parameters, the maia_hdl/amaranth versions and the maia_hdl sources."""
+    desc = cache_description(generator, params)
+    desc["source"]   = inspect.getsource(sys.modules[generator.__module__])
+    desc["maia_hdl"] = _package_digest("maia_hdl")
+    return hashlib.sha256(json.dumps(desc, sort_keys=True).encode()).hexdigest()
+
+def cache_description(generator, params):
+    return {
+        "generator" : f"{generator.__module__}.{generator.__name__}",
+        "params"    : params,
+        "versions"  : {package: _version(package) for package in ["maia-hdl", "amaranth"]},
+    }
+
+def cached_generate(generator, output_file, params, **kwargs):
+    """Produce `output_file` with `generator(**kwargs, **params)`, or copy it from the cache.
+
+    `params` are the generator parameters (JSON serializable, part of the key), `kwargs` the other
+    arguments (output path). The generator returns the module delay (or None). Returns the delay.
+    """
+    if not cache_enabled():
+        return generator(**kwargs, **params)
+
+    key   = cache_key(generator, params)
+    entry = os.path.join(cache_dir(), key)
+
+    # Hit: copy the stored Verilog.
+    if os.path.exists(os.path.join(entry, "meta.json")):
+        with open(os.path.join(entry, "meta.json")) as f:
+            meta = json.load(f)
+        shutil.copyfile(os.path.join(entry, "module.v"), output_file)
+        print(f"copied verilog to {output_file} (cache {key[:12]})")
+        if meta["delay"] is not None:
+            print(f"Delay: {meta['delay']}")
+        return meta["delay"]
+
+    # Miss: generate then store (in a temporary directory renamed once complete).
+    delay = generator(**kwargs, **params)
+    tmp   = f"{entry}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    shutil.copyfile(output_file, os.path.join(tmp, "module.v"))
+    meta  = cache_description(generator, params)
+    meta.update(key=key, file=os.path.basename(output_file), delay=delay, created=time.time())
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=4)
+    try:
+        os.rename(tmp, entry)
+    except OSError: # Concurrent build stored the same entry.
+        shutil.rmtree(tmp, ignore_errors=True)
+    return delay
+
+def cache_entries():
+    """Metadata of the cache entries (most recent first)."""
+    entries = []
+    if os.path.isdir(cache_dir()):
+        for key in os.listdir(cache_dir()):
+            meta = os.path.join(cache_dir(), key, "meta.json")
+            if os.path.exists(meta):
+                with open(meta) as f:
+                    entries.append(json.load(f))
+    return sorted(entries, key=lambda e: e["created"], reverse=True)
+
+def cache_invalidate(key=None):
+    """Remove the entries whose key starts with `key` (all entries when None). Returns the count."""
+    removed = 0
+    if os.path.isdir(cache_dir()):
+        for name in os.listdir(cache_dir()):
+            if key is None or name.startswith(key):
+                shutil.rmtree(os.path.join(cache_dir(), name), ignore_errors=True)
+                removed += 1
+    return removed
+
+# Verilog Jobs -------------------------------------------------------------------------------------
+
+# Generators are registered when the cores are created and only started when the first one is
+# joined (do_finalize, before platform.add_source): the pending jobs are then all submitted to a
+# process pool so that the conversions of the different cores run in parallel, and cores that are
+# never finalized (simulations, planner runs) generate nothing. $LITECOMPUTE_VERILOG_JOBS sets the
+# number of worker processes (default: number of CPUs, 1 generates sequentially in do_finalize).
+# The pool is shut down at exit.
+
+_executor = None
+_pending  = weakref.WeakSet() # Jobs not started yet.
+
+def verilog_jobs():
+    return max(int(os.environ.get("LITECOMPUTE_VERILOG_JOBS", os.cpu_count() or 1)), 1)
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=verilog_jobs())
+        atexit.register(_shutdown)
+    return _executor
+
+def _shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+def _generate(generator, file_name, params, output_dir):
+    """Generate `file_name` in a temporary directory, returns the delay and the Verilog."""
+    with tempfile.TemporaryDirectory(prefix="litecompute_verilog_") as tmp_dir:
+        output_file = os.path.join(tmp_dir, file_name)
+        delay       = cached_generate(generator, output_file, params,
+            output_path = tmp_dir if output_dir else output_file)
+        with open(output_file) as f:
+            return delay, f.read()
+
+class VerilogJob:
+    """Generation of `file_name` by `generator` (through the cache), started on the first join.
+
+    The file is produced in a temporary directory of the task (the build directory is not known yet
+    when the cores are created) and returned with the delay; `join` starts the pending jobs (this
+    one and the ones of the other cores), waits for this one, writes it to `dest_dir` and returns
+    its path. `output_dir` tells whether the generator `output_path` is a directory (fft_generator)
+    or the file itself (fir_generator).
+    """
+    def __init__(self, generator, file_name, params, output_dir=False):
+        self.file_name = file_name
+        self.delay     = None
+        self._args     = (generator, file_name, params, output_dir)
+        self._future   = None
+        _pending.add(self)
+
+    def submit(self):
+        """Start the generation in the pool (parallel generation only)."""
+        _pending.discard(self)
+        if self._future is None and verilog_jobs() > 1:
+            self._future = _pool().submit(_generate, *self._args)
+
+    def join(self, dest_dir):
+        for job in list(_pending):
+            job.submit()
+        if self._future is None:
+            self.delay, verilog = _generate(*self._args)
+        else:
+            self.delay, verilog = self._future.result()
+        v_file = os.path.join(dest_dir, self.file_name)
+        with open(v_file, "w") as f:
+            f.write(verilog)
+        return v_file
@@ -229,15 +229,16 @@ class SimSoC(SoCCore):
 
         # MAIA SDR FIR -----------------------------------------------------------------------------
         self.fir = fir = MaiaSDRFIR(platform,
-            data_in_width  = data_in_width,
-            data_out_width = data_out_width,
-            coeff_width    = 18,
-            decim_width    = 7,
-            oper_width     = 7,
-            macc_trunc     = macc_trunc,
-            len_log2       = len_log2,
-            clk_domain     = "sys",
-            with_csr       = False,
+            data_in_width   = data_in_width,
+            data_out_width  = data_out_width,
+            coeff_width     = 18,
+            decim_width     = 7,
+            oper_width      = 7,
+            macc_trunc      = macc_trunc,
+            len_log2        = len_log2,
+            clk_domain      = "sys",
+            with_coeff_sink = True,
+            with_csr        = False,
         )
 
         self.comb += [
@@ -258,7 +259,7 @@ class SimSoC(SoCCore):
             NextState("TRANSMIT")
         )
         fsm.act("TRANSMIT",
-            self.coeff_streamer.source.ready.eq(1),
+            self.coeff_streamer.source.connect(fir.coeff_sink),
             If(self.coeff_streamer.source.last,
                 NextState("END"),
             ),
@@ -268,12 +269,6 @@ class SimSoC(SoCCore):
             self.coeff_streamer.source.ready.eq(0),
         )
 
-        self.comb += [
-            fir.coeff_wdata.eq(self.coeff_streamer.source.data),
-            fir.coeff_waddr.eq(self.coeff_streamer.source.addr),
-            fir.coeff_wren.eq( self.coeff_streamer.source.valid),
-        ]
-
         # Streamer ---------------------------------------------------------------------------------
 
         # Read or Create input samples dataset.
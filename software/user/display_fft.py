@@ -51,6 +51,7 @@ def main():
     parser.add_argument("--dump-file",                            help="litepcie_test record result file dump.")
     parser.add_argument("--fft-order", default=32,    type=int,   help="FFT Order.")
     parser.add_argument("--fs",        default=100e6, type=float, help="Sample Frequency.")
+    parser.add_argument("--natural-order", action="store_true",   help="Frames already in natural order (SDRProcessing FFT Reorder).")
 
     args = parser.parse_args()
 
@@ -74,6 +75,8 @@ def main():
     fft_size        = args.fft_order
     bitinvert_radix = radix_log2 if radix != 'R22' else 1
     invert          = np.array([bit_invert(n, order_log2, bitinvert_radix) for n in range(fft_size)])
+    if args.natural_order:
+        invert      = np.arange(fft_size)
 
     for i in range(0, len(samples), 2):
         re_in.append(samples[i + 0])
@@ -95,7 +98,7 @@ def main():
 
         # Plot
         plt.plot(freq_raw / 1e6, magnitude,  '-o', markersize=4)
-        plt.plot(freq_raw / 1e6, magnitude2, '-o', markersize=4)
+        plt.plot(freq_raw / 1e6, magnitude_order, '-o', markersize=4)
     plt.xlabel('Frequency (MHz)')
     plt.ylabel('Magnitude')
     plt.grid(True)
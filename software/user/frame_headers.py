@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+from gateware.timestamp import parse
+from gateware.bfp       import decode as bfp_decode, frame_words as bfp_frame_words
+from gateware.pfb       import decode as pfb_decode, frame_words as pfb_frame_words
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the frame headers (timestamps) of a DMA2 record.")
+    parser.add_argument("dump_file",                              help="litepcie_test record binary dump.")
+    parser.add_argument("--packet-len", default=1024, type=int,   help="Samples per frame (FFT order).")
+    parser.add_argument("--decimation", default=1,    type=int,   help="FFT frame decimation ratio (expected count step).")
+    parser.add_argument("--time-unit",  default=1e-9, type=float, help="Timestamp unit in seconds (TimeGenerator: 1ns).")
+    parser.add_argument("--bfp-width",  default=0,    type=int,   help="FFT block floating point mantissas width (0: none, 8 or 16).")
+    parser.add_argument("--pfb-channels", default=0,  type=int,   help="PFB channelizer channels per frame (0: none).")
+    args = parser.parse_args()
+
+    # 32-bit words (re/im 16-bit samples, headers inserted before the frames).
+    words  = np.fromfile(args.dump_file, dtype="<u4")
+    length = args.packet_len
+    if args.bfp_width:
+        # Block floating point frames: 64-bit exponent header + packed mantissas.
+        length = bfp_frame_words(int(np.log2(args.packet_len)), args.bfp_width)
+    if args.pfb_channels:
+        # PFB channelizer frames: channels header (ids) + samples (even channels count).
+        length = pfb_frame_words(args.pfb_channels)
+    frames = parse(words, length)
+    if len(frames) < 2:
+        print(f"{len(frames)} frame(s) found, check --packet-len.")
+        sys.exit(1)
+    times  = np.array([t for t, _, _ in frames], dtype=np.float64) * args.time_unit
+    counts = np.array([c for _, c, _ in frames], dtype=np.int64)
+
+    # Drops: frame counts not following the expected step (decimation).
+    steps = (counts[1:] - counts[:-1]) % 2**32
+    drops = int(np.sum(np.maximum(steps // args.decimation - 1, 0)))
+    print(f"Frames    : {len(frames)} (counts {counts[0]} to {counts[-1]})")
+    print(f"Drops     : {drops} frame(s) at {int(np.sum(steps != args.decimation))} location(s)")
+
+    # Timing: frame period/jitter from the timestamps (of the first input sample of each frame).
+    periods = np.diff(times) / steps
+    print(f"Period    : {np.mean(periods)*1e6:.3f} us (jitter {np.std(periods)*1e9:.1f} ns)")
+    print(f"Frame rate: {1/np.mean(periods):.1f} frames/s")
+    print(f"Duration  : {times[-1] - times[0]:.6f} s")
+
+    # Block floating point: exponents of the frames.
+    if args.bfp_width:
+        order_log2 = int(np.log2(args.packet_len))
+        exponents  = [e for _, _, w in frames for e, _ in bfp_decode(w, order_log2, args.bfp_width)]
+        if len(exponents) != len(frames):
+            print(f"BFP       : {len(frames) - len(exponents)} frame(s) without exponent header.")
+        if exponents:
+            print(f"Exponents : {min(exponents)} to {max(exponents)} (mean {np.mean(exponents):.2f})")
+
+    # PFB channelizer: channel ids of the frames.
+    if args.pfb_channels:
+        order_log2 = int(np.log2(args.packet_len))
+        channels   = [ids for _, _, w in frames for ids, _ in pfb_decode(w, order_log2)]
+        if len(channels) != len(frames):
+            print(f"PFB       : {len(frames) - len(channels)} frame(s) without channels header.")
+        for ids in sorted(set(tuple(ids) for ids in channels)):
+            print(f"Channels  : {list(ids)} ({sum(tuple(c) == ids for c in channels)} frame(s))")
+
+if __name__ == "__main__":
+    main()
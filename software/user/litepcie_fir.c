@@ -24,24 +24,43 @@
 static char litepcie_device[1024];
 static int litepcie_device_num;
 
-/* FIR Coefficients */
-/*------------------*/
+/* SDR Processing Channel */
+/*------------------------*/
 
-static void fir_coefficients_write(const char *filename)
+/* Dual channel designs have a second SDRProcessing (sdr_processing1, same configuration): its CSRs
+ * are at the same offsets from CSR_SDR_PROCESSING1_BASE. */
+static int sdr_channel;
+
+static uint32_t sdr_csr(uint32_t addr)
 {
-    int fd;
-    FILE *fd_coefficients;
-    int i;
-    long coeffs_file_len;
+#ifdef CSR_SDR_PROCESSING1_BASE
+    if (sdr_channel == 1)
+        return addr - CSR_SDR_PROCESSING_BASE + CSR_SDR_PROCESSING1_BASE;
+#endif
+    return addr;
+}
 
-    fd = open(litepcie_device, O_RDWR);
-    if (fd < 0) {
-        fprintf(stderr, "Could not init driver %s\n", litepcie_device);
+static void sdr_channel_select(int channel)
+{
+#ifdef CSR_SDR_PROCESSING1_BASE
+    if (channel < 0 || channel > 1) {
+#else
+    if (channel != 0) {
+#endif
+        fprintf(stderr, "Invalid SDR Processing channel %d (dual channel design required for 1).\n", channel);
         exit(1);
     }
+    sdr_channel = channel;
+}
 
-    printf("\e[1m[> Fir Coefficients Configuration:\e[0m\n");
-    printf("----------------------------------\n");
+/* FIR Coefficients */
+/*------------------*/
+
+static uint32_t *fir_coefficients_read(const char *filename, long *coeffs_len)
+{
+    FILE *fd_coefficients;
+    long coeffs_file_len;
+    uint32_t *coeffs;
 
     fd_coefficients = fopen(filename, "r");
     if (!fd_coefficients) {
@@ -67,24 +86,230 @@ static void fir_coefficients_write(const char *filename)
     /* convert size from Byte to word */
     coeffs_file_len /= 4;
 
-    uint32_t coeffs[coeffs_file_len];
+    coeffs = malloc(coeffs_file_len * sizeof(uint32_t));
+    if (!coeffs) {
+        fprintf(stderr, "Error with Coefficients file: failed to allocate %ld words\n", coeffs_file_len);
+        exit(1);
+    }
     int ret = fread(coeffs, sizeof(uint32_t), coeffs_file_len, fd_coefficients);
     if (ret != coeffs_file_len) {
         fprintf(stderr, "Error with Coefficients file: failed to read %d -> %ld\n", ret, coeffs_file_len);
         exit(1);
     }
 
+    fclose(fd_coefficients);
+
+    *coeffs_len = coeffs_file_len;
+    return coeffs;
+}
+
+static void fir_coefficients_write(const char *filename)
+{
+    int fd;
+    int i;
+    long coeffs_file_len;
+    uint32_t *coeffs;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver %s\n", litepcie_device);
+        exit(1);
+    }
+
+    printf("\e[1m[> Fir Coefficients Configuration:\e[0m\n");
+    printf("----------------------------------\n");
+
+    coeffs = fir_coefficients_read(filename, &coeffs_file_len);
+
+#ifdef CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR
+    /* Write coefficients to the inactive bank (the FIR keeps running on the active one) */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR),
+        1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SHADOW_OFFSET);
+#endif
+
     /* Write coefficients */
     for (i = 0; i < coeffs_file_len; i++) {
-        litepcie_writel(fd, CSR_SDR_PROCESSING_FIR_COEFF_WADDR_ADDR, i);
-        litepcie_writel(fd, CSR_SDR_PROCESSING_FIR_COEFF_WDATA_ADDR, coeffs[i]);
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_WADDR_ADDR), i);
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_WDATA_ADDR), coeffs[i]);
     }
 
+#ifdef CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR
+    /* Swap banks (the FIR switches on its next output sample) */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR),
+        (1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SHADOW_OFFSET) |
+        (1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SWAP_OFFSET));
+    printf("Active bank: %d\n", litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_STATUS_ADDR)) & 0x1);
+#endif
+
+    free(coeffs);
+
+    close(fd);
+}
+
+/* FIR Coefficients (DMA) */
+/*------------------------*/
+
+#define FIR_COEFF_DMA_TIMEOUT_MS 1000
+
+#ifdef CSR_SDR_PROCESSING1_BASE
+#define SDR_CHANNELS 2
+#else
+#define SDR_CHANNELS 1
+#endif
+
+static void fir_coefficients_dma_write(const char *filename, int dma_device_num)
+{
+    static struct litepcie_dma_ctrl dma = {.use_reader = 1};
+    char dma_device[1024];
+    int fd;
+    long i;
+    long coeffs_file_len;
+    long nbuffers;
+    int64_t submitted = 0;
+    int64_t start_time;
+    int channel = sdr_channel;
+    uint32_t *coeffs;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver %s\n", litepcie_device);
+        exit(1);
+    }
+
+    printf("\e[1m[> Fir Coefficients Configuration (DMA):\e[0m\n");
+    printf("----------------------------------------\n");
+
+    coeffs = fir_coefficients_read(filename, &coeffs_file_len);
+
+    /* Words ([31] write, [30:20] address, [19:0] coefficient, see maia_sdr_fir.coefficient_words),
+     * buffers padded with ignored (zero) words. */
+    nbuffers = (coeffs_file_len * sizeof(uint32_t) + DMA_BUFFER_SIZE - 1) / DMA_BUFFER_SIZE;
+
+#ifdef CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR
+    /* Write coefficients to the inactive bank of all the channels (the DMA words go to all). */
+    for (i = 0; i < SDR_CHANNELS; i++) {
+        sdr_channel = i;
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR),
+            1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SHADOW_OFFSET);
+    }
+#endif
+
+    /* Upload through the DMA reader (buffers replayed by the DMA loop rewrite the same values). */
+    snprintf(dma_device, sizeof(dma_device), "/dev/litepcie%d", dma_device_num);
+    if (litepcie_dma_init(&dma, dma_device, 0))
+        exit(1);
+    dma.reader_enable = 1;
+    start_time = get_time_ms();
+    for (;;) {
+        litepcie_dma_process(&dma);
+        while (1) {
+            uint32_t *buf_wr = (uint32_t *)litepcie_dma_next_write_buffer(&dma);
+            if (!buf_wr)
+                break;
+            memset(buf_wr, 0, DMA_BUFFER_SIZE);
+            for (i = 0; i < DMA_BUFFER_SIZE / 4; i++) {
+                long addr = submitted * (DMA_BUFFER_SIZE / 4) + i;
+                if (addr >= coeffs_file_len)
+                    break;
+                buf_wr[i] = (1u << 31) | ((addr & 0x7ff) << 20) | (coeffs[addr] & 0xfffff);
+            }
+            submitted++;
+        }
+        if (dma.reader_hw_count >= nbuffers)
+            break;
+        if (get_time_ms() - start_time > FIR_COEFF_DMA_TIMEOUT_MS) {
+            fprintf(stderr, "Coefficients DMA timeout (%" PRId64 "/%ld buffers)\n", dma.reader_hw_count, nbuffers);
+            exit(1);
+        }
+    }
+    litepcie_dma_cleanup(&dma);
+    printf("%ld coefficients written (%ld DMA buffer(s)).\n", coeffs_file_len, nbuffers);
+
+#ifdef CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR
+    /* Swap banks (the FIR switches on its next output sample) */
+    for (i = 0; i < SDR_CHANNELS; i++) {
+        sdr_channel = i;
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_ADDR),
+            (1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SHADOW_OFFSET) |
+            (1 << CSR_SDR_PROCESSING_FIR_COEFF_BANK_SWAP_OFFSET));
+        printf("Channel %ld active bank: %d\n", i,
+            litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_COEFF_BANK_STATUS_ADDR)) & 0x1);
+    }
+#endif
+
+    sdr_channel = channel;
+    free(coeffs);
+
+    close(fd);
+}
+
+#ifdef CSR_SDR_PROCESSING_PFB_COEFF_WADDR_ADDR
+/* PFB Channelizer */
+/*-----------------*/
+
+static void pfb_coefficients_write(const char *filename, uint8_t oversampling)
+{
+    int fd;
+    FILE *fd_coefficients;
+    int32_t coeff;
+    uint32_t i;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver %s\n", litepcie_device);
+        exit(1);
+    }
+
+    printf("\e[1m[> PFB Coefficients Configuration:\e[0m\n");
+    printf("----------------------------------\n");
+
+    fd_coefficients = fopen(filename, "r");
+    if (!fd_coefficients) {
+        fprintf(stderr, "Could not coefficients file %s\n", filename);
+        exit(1);
+    }
+
+    /* Write prototype filter coefficients (32-bit words, coefficient i at address i) */
+    for (i = 0; fread(&coeff, sizeof(int32_t), 1, fd_coefficients) == 1; i++) {
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_COEFF_WADDR_ADDR), i);
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_COEFF_WDATA_ADDR), coeff);
+    }
+    printf("%d coefficients written.\n", i);
+
+    /* Oversampling (only changed while the stream is stopped) */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_OVERSAMPLING_ADDR), oversampling);
+
     fclose(fd_coefficients);
 
     close(fd);
 }
 
+static void pfb_channels_write(int nchannels, char **channels)
+{
+    int fd;
+    int i;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver %s\n", litepcie_device);
+        exit(1);
+    }
+
+    /* Channels table (forwarded in this order with their id) */
+    for (i = 0; i < nchannels; i++) {
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_CHANNELS_TABLE_WADDR_ADDR), i);
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_CHANNELS_TABLE_WDATA_ADDR), strtoul(channels[i], NULL, 0));
+    }
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_CHANNELS_NCHANNELS_MINUS_ONE_ADDR), nchannels - 1);
+    if (nchannels % 2)
+        printf("Odd channels count: table entry %d also forwarded (even frames).\n", nchannels);
+    printf("%d channels selected (%d frames dropped).\n", nchannels,
+        litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_PFB_CHANNELS_DROPPED_ADDR)));
+
+    close(fd);
+}
+#endif
+
 /* Fir Parameters configuration */
 /*------------------------------*/
 
@@ -102,13 +327,13 @@ static void fir_configuration(uint32_t decimation, uint32_t operations, uint8_t
     }
 
     /* write decimation. */
-    litepcie_writel(fd, CSR_SDR_PROCESSING_FIR_DECIMATION_ADDR, decimation);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_DECIMATION_ADDR), decimation);
 
     /* write operations (Minus one). */
-    litepcie_writel(fd, CSR_SDR_PROCESSING_FIR_OPERATIONS_MINUS_ONE_ADDR, operations - 1);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_OPERATIONS_MINUS_ONE_ADDR), operations - 1);
 
     /* write odd/event operations. */
-    litepcie_writel(fd, CSR_SDR_PROCESSING_FIR_CFG_ADDR, (odd_operations & 0x01) << CSR_SDR_PROCESSING_FIR_CFG_ODD_OPERATIONS_OFFSET);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_FIR_CFG_ADDR), (odd_operations & 0x01) << CSR_SDR_PROCESSING_FIR_CFG_ODD_OPERATIONS_OFFSET);
 
     close(fd);
 }
@@ -124,13 +349,22 @@ static void help(void)
            "options:\n"
            "-h                    Help.\n"
            "-c device_num         Select the device (default = 0).\n"
+           "-n channel            Select the SDR Processing channel (dual channel: 0/1, default = 0).\n"
            "-d decimation         Select decimation factor (default = 2).\n"
            "-o operations         Select number operations to performs (default = 4).\n"
            "-O odd_operations     Select if operations is odd or eveen (default = 0).\n"
            "\n"
            "available commands:\n"
            "coefficients filename FIR Coefficients Configuration from file.\n"
+           "coefficients_dma filename [dma_device_num]\n"
+           "                      FIR Coefficients upload through the DMA reader (default = 1, both channels).\n"
            "configuration         FIR Parameter Configuration.\n"
+#ifdef CSR_SDR_PROCESSING_PFB_COEFF_WADDR_ADDR
+           "pfb_coefficients filename [oversampling]\n"
+           "                      PFB prototype filter from file (gen_fir_taps.py --pfb-taps).\n"
+           "pfb_channels ch0 [ch1...]\n"
+           "                      PFB channels forwarded to the DMA.\n"
+#endif
            "\n"
            );
     exit(1);
@@ -151,7 +385,7 @@ int main(int argc, char **argv)
 
     /* Parameters. */
     for (;;) {
-        c = getopt(argc, argv, "hc:d:o:O:");
+        c = getopt(argc, argv, "hc:n:d:o:O:");
         if (c == -1)
             break;
         switch(c) {
@@ -161,6 +395,9 @@ int main(int argc, char **argv)
         case 'c':
             litepcie_device_num = atoi(optarg);
             break;
+        case 'n':
+            sdr_channel_select(atoi(optarg));
+            break;
         case 'd':
             decimation = atoi(optarg);
             break;
@@ -192,9 +429,38 @@ int main(int argc, char **argv)
         }
         filename = argv[optind++];
         fir_coefficients_write(filename);
+    /* Fir Coefficients configuration (DMA). */
+    } else if (!strcmp(cmd, "coefficients_dma")) {
+        const char *filename = NULL;
+        int dma_device_num = 1;
+        if (optind + 1 > argc) {
+            goto show_help;
+        }
+        filename = argv[optind++];
+        if (optind < argc)
+            dma_device_num = atoi(argv[optind++]);
+        fir_coefficients_dma_write(filename, dma_device_num);
     /* Fir Parameters configuration. */
     } else if (!strcmp(cmd, "configuration")) {
         fir_configuration(decimation, operations, odd_operations);
+#ifdef CSR_SDR_PROCESSING_PFB_COEFF_WADDR_ADDR
+    /* PFB Channelizer configuration. */
+    } else if (!strcmp(cmd, "pfb_coefficients")) {
+        const char *filename = NULL;
+        uint8_t oversampling = 0;
+        if (optind + 1 > argc) {
+            goto show_help;
+        }
+        filename = argv[optind++];
+        if (optind < argc)
+            oversampling = atoi(argv[optind++]);
+        pfb_coefficients_write(filename, oversampling);
+    } else if (!strcmp(cmd, "pfb_channels")) {
+        if (optind + 1 > argc) {
+            goto show_help;
+        }
+        pfb_channels_write(argc - optind, &argv[optind]);
+#endif
     /* Show help otherwise. */
     } else
 show_help:
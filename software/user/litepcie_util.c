@@ -36,6 +36,35 @@ void intHandler(int dummy) {
     keep_running = 0;
 }
 
+/* SDR Processing Channel */
+/*------------------------*/
+
+/* Dual channel designs have a second SDRProcessing (sdr_processing1, same configuration): its CSRs
+ * are at the same offsets from CSR_SDR_PROCESSING1_BASE. */
+static int sdr_channel;
+
+static uint32_t sdr_csr(uint32_t addr)
+{
+#ifdef CSR_SDR_PROCESSING1_BASE
+    if (sdr_channel == 1)
+        return addr - CSR_SDR_PROCESSING_BASE + CSR_SDR_PROCESSING1_BASE;
+#endif
+    return addr;
+}
+
+static void sdr_channel_select(int channel)
+{
+#ifdef CSR_SDR_PROCESSING1_BASE
+    if (channel < 0 || channel > 1) {
+#else
+    if (channel != 0) {
+#endif
+        fprintf(stderr, "Invalid SDR Processing channel %d (dual channel design required for 1).\n", channel);
+        exit(1);
+    }
+    sdr_channel = channel;
+}
+
 /* Info */
 /*------*/
 
@@ -110,7 +139,8 @@ void scratch_test(void)
 
 /* Stream Configuration */
 /*----------------------*/
-static void stream_configuration(int enable_fft, int enable_fir, int enable_litedram_fifo)
+static void stream_configuration(int enable_fft, int enable_fir, int enable_litedram_fifo, int enable_timestamps, int enable_pfb,
+    int enable_fft_reorder, int enable_fft_bfp)
 {
     int fd;
     uint32_t new_value = 0;
@@ -129,18 +159,200 @@ static void stream_configuration(int enable_fft, int enable_fir, int enable_lite
     new_value = ((enable_fft & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_FFT_OFFSET);
     new_value |= ((enable_fir & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_FIR_OFFSET);
     new_value |= ((enable_litedram_fifo & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_LITEDRAM_FIFO_OFFSET);
+#ifdef CSR_SDR_PROCESSING_CONFIGURATION_TIMESTAMPS_OFFSET
+    new_value |= ((enable_timestamps & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_TIMESTAMPS_OFFSET);
+#else
+    (void)enable_timestamps;
+#endif
+#ifdef CSR_SDR_PROCESSING_CONFIGURATION_PFB_OFFSET
+    new_value |= ((enable_pfb & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_PFB_OFFSET);
+#else
+    (void)enable_pfb;
+#endif
+#ifdef CSR_SDR_PROCESSING_CONFIGURATION_FFT_REORDER_OFFSET
+    new_value |= ((enable_fft_reorder & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_FFT_REORDER_OFFSET);
+#else
+    (void)enable_fft_reorder;
+#endif
+#ifdef CSR_SDR_PROCESSING_CONFIGURATION_FFT_BFP_OFFSET
+    new_value |= ((enable_fft_bfp & 0x01) << CSR_SDR_PROCESSING_CONFIGURATION_FFT_BFP_OFFSET);
+#else
+    (void)enable_fft_bfp;
+#endif
     printf("Write 0x%08x to FIR/FFT/LiteDRAM configuration register.\n", new_value);
 
     /* Update stream configuration register. */
-    litepcie_writel(fd, CSR_SDR_PROCESSING_CONFIGURATION_ADDR, new_value);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CONFIGURATION_ADDR), new_value);
 
-    new_value = litepcie_readl(fd, CSR_SDR_PROCESSING_CONFIGURATION_ADDR);
+    new_value = litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CONFIGURATION_ADDR));
     printf("Read  0x%08x to FIR/FFT/LiteDRAM configuration register.\n", new_value);
 
     close(fd);
 }
 
 
+/* Perf Counters */
+/*---------------*/
+
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+
+#define N_PERF_STREAMS 4
+
+static const char *perf_stream_names[N_PERF_STREAMS] = {
+    "   ep0 (input)",
+    "ep1 (FIR out)",
+    "ep2 (FFT out)",
+    "       source",
+};
+
+static const uint32_t perf_transfers_addrs[N_PERF_STREAMS] = {
+    CSR_SDR_PROCESSING_PERF_EP0_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP1_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP2_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_SOURCE_TRANSFERS_ADDR,
+};
+
+static const uint32_t perf_stalls_addrs[N_PERF_STREAMS] = {
+    CSR_SDR_PROCESSING_PERF_EP0_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP1_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP2_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_SOURCE_STALLS_ADDR,
+};
+
+struct perf_counters {
+    uint64_t cycles;
+    uint32_t overflows;
+    uint32_t frames;
+    uint64_t transfers[N_PERF_STREAMS];
+    uint64_t stalls[N_PERF_STREAMS];
+};
+
+static uint64_t perf_read_64bit_register(int fd, uint32_t addr)
+{
+    uint32_t lower = litepcie_readl(fd, addr + 4);
+    uint32_t upper = litepcie_readl(fd, addr + 0);
+    return ((uint64_t)upper << 32) | lower;
+}
+
+static void perf_read(int fd, struct perf_counters *c)
+{
+    /* Snapshot all the counters on the same clock cycle, then read them. */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_PERF_CONTROL_ADDR), 1 << CSR_SDR_PROCESSING_PERF_CONTROL_LATCH_OFFSET);
+    c->cycles    = perf_read_64bit_register(fd, sdr_csr(CSR_SDR_PROCESSING_PERF_CYCLES_ADDR));
+    c->overflows = litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_PERF_OVERFLOWS_ADDR));
+    c->frames    = litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_PERF_EP2_FRAMES_ADDR));
+    for (int i = 0; i < N_PERF_STREAMS; i++) {
+        c->transfers[i] = perf_read_64bit_register(fd, sdr_csr(perf_transfers_addrs[i]));
+        c->stalls[i]    = perf_read_64bit_register(fd, sdr_csr(perf_stalls_addrs[i]));
+    }
+}
+
+static void perf_test(int num_measurements, int delay_between_tests)
+{
+    struct perf_counters previous, current;
+    double elapsed_time;
+    int fd;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver\n");
+        exit(1);
+    }
+
+    printf("\e[1m[> SDR Processing Performance Counters:\e[0m\n");
+    printf("----------------------------------------\n");
+
+    perf_read(fd, &previous);
+    for (int i = 0; i < num_measurements; i++) {
+        sleep(delay_between_tests);
+        perf_read(fd, &current);
+
+        /* Elapsed time from the sys clock cycles counter. */
+        elapsed_time = (double)(current.cycles - previous.cycles) / CONFIG_CLOCK_FREQUENCY;
+        printf("Measurement %d (%3.3f s): %u overflows, %3.1f FFT frames/s\n",
+            i + 1, elapsed_time,
+            current.overflows - previous.overflows,
+            (current.frames - previous.frames) / elapsed_time);
+#ifdef CSR_SDR_PROCESSING_FRAME_HEADERS_LATENCY_ADDR
+        printf("Frame latency: %u (time units, last frame header)\n",
+            litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_FRAME_HEADERS_LATENCY_ADDR)));
+#endif
+#ifdef CSR_SDR_PROCESSING_FFT_BUFFER_DROPPED_ADDR
+        printf("FFT buffer: %u frames dropped (output stalled)\n",
+            litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_FFT_BUFFER_DROPPED_ADDR)));
+#endif
+        for (int j = 0; j < N_PERF_STREAMS; j++) {
+            printf("%s: %8.3f MS/s, stalls %5.1f%%\n",
+                perf_stream_names[j],
+                (current.transfers[j] - previous.transfers[j]) / (elapsed_time * 1e6),
+                100.0 * (current.stalls[j] - previous.stalls[j]) / (current.cycles - previous.cycles));
+        }
+        previous = current;
+    }
+
+    close(fd);
+}
+
+#endif
+
+/* Snapshot Capture */
+/*------------------*/
+
+#ifdef CSR_SDR_PROCESSING_CAPTURE_CONTROL_ADDR
+
+static void capture(uint32_t pre, uint32_t post, uint32_t power_threshold)
+{
+    uint32_t status;
+    uint64_t trigger_time;
+    int fd;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver\n");
+        exit(1);
+    }
+
+    printf("\e[1m[> Snapshot Capture:\e[0m\n");
+    printf("---------------------\n");
+
+    /* Configure: power trigger when a threshold is given, else forced (once the pre-trigger samples are written). */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_PRE_ADDR),  pre);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_POST_ADDR), post);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_POWER_THRESHOLD_ADDR), power_threshold);
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_TRIGGER_ADDR),
+        (power_threshold ? 1 : 0) << CSR_SDR_PROCESSING_CAPTURE_TRIGGER_POWER_OFFSET);
+
+    /* Arm (DMA1 must be recording: litepcie_test -c 1 record). */
+    litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_CONTROL_ADDR), 1 << CSR_SDR_PROCESSING_CAPTURE_CONTROL_ARM_OFFSET);
+    if (!power_threshold)
+        litepcie_writel(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_CONTROL_ADDR), 1 << CSR_SDR_PROCESSING_CAPTURE_CONTROL_FORCE_OFFSET);
+    printf("Armed (pre %u, post %u samples), waiting for the trigger...\n", pre, post);
+
+    /* Wait for the snapshot to be drained. */
+    signal(SIGINT, intHandler);
+    do {
+        usleep(1000);
+        status = litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_STATUS_ADDR));
+    } while (keep_running && !((status >> CSR_SDR_PROCESSING_CAPTURE_STATUS_DONE_OFFSET) & 1));
+    if (!keep_running) {
+        printf("Interrupted (status 0x%02x).\n", status);
+        close(fd);
+        return;
+    }
+
+    trigger_time  = (uint64_t)litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_TRIGGER_TIME_ADDR) + 0) << 32;
+    trigger_time |= litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_TRIGGER_TIME_ADDR) + 4);
+    printf("Snapshot: %u samples, trigger at sample %u (time %" PRIu64 ")%s\n",
+        litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_LENGTH_ADDR)),
+        litepcie_readl(fd, sdr_csr(CSR_SDR_PROCESSING_CAPTURE_OFFSET_ADDR)),
+        trigger_time,
+        ((status >> CSR_SDR_PROCESSING_CAPTURE_STATUS_OVERFLOW_OFFSET) & 1) ? ", DRAM overflow!" : "");
+
+    close(fd);
+}
+
+#endif
+
 /* SPI Flash */
 /*-----------*/
 
@@ -518,6 +730,7 @@ static void help(void)
            "options:\n"
            "-h                                Help.\n"
            "-c device_num                     Select the device (default = 0).\n"
+           "-n channel                        Select the SDR Processing channel (dual channel: 0/1, default = 0).\n"
            "-z                                Enable zero-copy DMA mode.\n"
            "-e                                Use external loopback (default = internal).\n"
            "-w data_width                     Width of data bus (default = 16).\n"
@@ -526,6 +739,10 @@ static void help(void)
            "-f enable                         Enable/Disable FFT Module (default = 1).\n"
            "-i enable                         Enable/Disable FIR Module (default = 1).\n"
            "-l enable                         Enable/Disable LiteDRAM FIFO Module (default = 1).\n"
+           "-s enable                         Enable/Disable frame headers/timestamps (default = 0).\n"
+           "-p enable                         Enable/Disable PFB channelizer mode (default = 0).\n"
+           "-r enable                         Enable/Disable FFT natural order frames (default = 0).\n"
+           "-b enable                         Enable/Disable FFT block floating point frames (default = 0).\n"
            "\n"
            "available commands:\n"
            "info                              Get Board information.\n"
@@ -533,6 +750,12 @@ static void help(void)
            "dma_test                          Test DMA.\n"
            "scratch_test                      Test Scratch register.\n"
            "stream_configuration              Stream Configuration (FIR/FFT).\n"
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+           "perf_test [num] [delay]           Show SDR Processing throughput/backpressure.\n"
+#endif
+#ifdef CSR_SDR_PROCESSING_CAPTURE_CONTROL_ADDR
+           "capture pre post [threshold]      Arm a snapshot capture (power trigger, forced without threshold).\n"
+#endif
            "\n"
 #ifdef CSR_FLASH_BASE
            "flash_write filename [offset]     Write file contents to SPI Flash.\n"
@@ -558,6 +781,10 @@ int main(int argc, char **argv)
     static int enable_fft = 1;
     static int enable_fir = 1;
     static int enable_litedram_fifo = 1;
+    static int enable_timestamps = 0;
+    static int enable_pfb = 0;
+    static int enable_fft_reorder = 0;
+    static int enable_fft_bfp = 0;
 
     litepcie_device_num = 0;
     litepcie_data_width = 16;
@@ -567,7 +794,7 @@ int main(int argc, char **argv)
 
     /* Parameters. */
     for (;;) {
-        c = getopt(argc, argv, "hc:w:zeat:f:i:l:");
+        c = getopt(argc, argv, "hc:n:w:zeat:f:i:l:s:p:r:b:");
         if (c == -1)
             break;
         switch(c) {
@@ -577,6 +804,9 @@ int main(int argc, char **argv)
         case 'c':
             litepcie_device_num = atoi(optarg);
             break;
+        case 'n':
+            sdr_channel_select(atoi(optarg));
+            break;
         case 'w':
             litepcie_data_width = atoi(optarg);
             break;
@@ -601,6 +831,18 @@ int main(int argc, char **argv)
         case 'l':
             enable_litedram_fifo = atoi(optarg);
             break;
+        case 's':
+            enable_timestamps = atoi(optarg);
+            break;
+        case 'p':
+            enable_pfb = atoi(optarg);
+            break;
+        case 'r':
+            enable_fft_reorder = atoi(optarg);
+            break;
+        case 'b':
+            enable_fft_bfp = atoi(optarg);
+            break;
         default:
             exit(1);
         }
@@ -622,7 +864,34 @@ int main(int argc, char **argv)
     else if (!strcmp(cmd, "scratch_test"))
         scratch_test();
     else if (!strcmp(cmd, "stream_configuration"))
-        stream_configuration(enable_fft, enable_fir, enable_litedram_fifo);
+        stream_configuration(enable_fft, enable_fir, enable_litedram_fifo, enable_timestamps, enable_pfb,
+            enable_fft_reorder, enable_fft_bfp);
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+    else if (!strcmp(cmd, "perf_test")) {
+        int num_measurements = 10;
+        int delay_between_tests = 1;
+
+        if (optind < argc)
+            num_measurements = atoi(argv[optind++]);
+        if (optind < argc)
+            delay_between_tests = atoi(argv[optind++]);
+
+        perf_test(num_measurements, delay_between_tests);
+    }
+#endif
+#ifdef CSR_SDR_PROCESSING_CAPTURE_CONTROL_ADDR
+    else if (!strcmp(cmd, "capture")) {
+        uint32_t pre, post;
+        uint32_t power_threshold = 0;
+        if (optind + 2 > argc)
+            goto show_help;
+        pre  = strtoul(argv[optind++], NULL, 0);
+        post = strtoul(argv[optind++], NULL, 0);
+        if (optind < argc)
+            power_threshold = strtoul(argv[optind++], NULL, 0);
+        capture(pre, post, power_threshold);
+    }
+#endif
     /* SPI Flash cmds. */
 #if CSR_FLASH_BASE
     else if (!strcmp(cmd, "flash_write")) {
@@ -687,6 +687,95 @@ static void clk_test(int num_measurements, int delay_between_tests)
     close(fd);
 }
 
+/* Perf Counters */
+/*---------------*/
+
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+
+#define N_PERF_STREAMS 4
+
+static const char *perf_stream_names[N_PERF_STREAMS] = {
+    "   ep0 (input)",
+    "ep1 (FIR out)",
+    "ep2 (FFT out)",
+    "       source",
+};
+
+static const uint32_t perf_transfers_addrs[N_PERF_STREAMS] = {
+    CSR_SDR_PROCESSING_PERF_EP0_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP1_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP2_TRANSFERS_ADDR,
+    CSR_SDR_PROCESSING_PERF_SOURCE_TRANSFERS_ADDR,
+};
+
+static const uint32_t perf_stalls_addrs[N_PERF_STREAMS] = {
+    CSR_SDR_PROCESSING_PERF_EP0_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP1_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_EP2_STALLS_ADDR,
+    CSR_SDR_PROCESSING_PERF_SOURCE_STALLS_ADDR,
+};
+
+struct perf_counters {
+    uint64_t cycles;
+    uint32_t overflows;
+    uint32_t frames;
+    uint64_t transfers[N_PERF_STREAMS];
+    uint64_t stalls[N_PERF_STREAMS];
+};
+
+static void perf_read(int fd, struct perf_counters *c)
+{
+    /* Snapshot all the counters on the same clock cycle, then read them. */
+    litepcie_writel(fd, CSR_SDR_PROCESSING_PERF_CONTROL_ADDR, 1 << CSR_SDR_PROCESSING_PERF_CONTROL_LATCH_OFFSET);
+    c->cycles    = read_64bit_register(fd, CSR_SDR_PROCESSING_PERF_CYCLES_ADDR);
+    c->overflows = litepcie_readl(fd, CSR_SDR_PROCESSING_PERF_OVERFLOWS_ADDR);
+    c->frames    = litepcie_readl(fd, CSR_SDR_PROCESSING_PERF_EP2_FRAMES_ADDR);
+    for (int i = 0; i < N_PERF_STREAMS; i++) {
+        c->transfers[i] = read_64bit_register(fd, perf_transfers_addrs[i]);
+        c->stalls[i]    = read_64bit_register(fd, perf_stalls_addrs[i]);
+    }
+}
+
+static void perf_test(int num_measurements, int delay_between_tests)
+{
+    struct perf_counters previous, current;
+    double elapsed_time;
+    int fd;
+
+    fd = open(litepcie_device, O_RDWR);
+    if (fd < 0) {
+        fprintf(stderr, "Could not init driver\n");
+        exit(1);
+    }
+
+    printf("\e[1m[> SDR Processing Performance Counters:\e[0m\n");
+    printf("----------------------------------------\n");
+
+    perf_read(fd, &previous);
+    for (int i = 0; i < num_measurements; i++) {
+        sleep(delay_between_tests);
+        perf_read(fd, &current);
+
+        /* Elapsed time from the sys clock cycles counter. */
+        elapsed_time = (double)(current.cycles - previous.cycles) / CONFIG_CLOCK_FREQUENCY;
+        printf("Measurement %d (%3.3f s): %u overflows, %3.1f FFT frames/s\n",
+            i + 1, elapsed_time,
+            current.overflows - previous.overflows,
+            (current.frames - previous.frames) / elapsed_time);
+        for (int j = 0; j < N_PERF_STREAMS; j++) {
+            printf("%s: %8.3f MS/s, stalls %5.1f%%\n",
+                perf_stream_names[j],
+                (current.transfers[j] - previous.transfers[j]) / (elapsed_time * 1e6),
+                100.0 * (current.stalls[j] - previous.stalls[j]) / (current.cycles - previous.cycles));
+        }
+        previous = current;
+    }
+
+    close(fd);
+}
+
+#endif
+
 /* VCXO Test  */
 /*------------*/
 
@@ -795,6 +884,9 @@ static void help(void)
            "dma_test                          Test DMA.\n"
            "scratch_test                      Test Scratch register.\n"
            "clk_test                          Test Clks frequencies.\n"
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+           "perf_test [num] [delay]           Show SDR Processing throughput/backpressure.\n"
+#endif
 #ifdef  CSR_SI5351_BASE
            "vcxo_test                         Test VCXO frequency variation.\n"
 #endif
@@ -898,6 +990,21 @@ int main(int argc, char **argv)
         clk_test(num_measurements, delay_between_tests);
     }
 
+#ifdef CSR_SDR_PROCESSING_PERF_CONTROL_ADDR
+    /* Perf cmds. */
+    else if (!strcmp(cmd, "perf_test")) {
+        int num_measurements = 10;
+        int delay_between_tests = 1;
+
+        if (optind < argc)
+            num_measurements = atoi(argv[optind++]);
+        if (optind < argc)
+            delay_between_tests = atoi(argv[optind++]);
+
+        perf_test(num_measurements, delay_between_tests);
+    }
+#endif
+
 #ifdef  CSR_SI5351_BASE
     /* VCXO test cmd. */
     else if (!strcmp(cmd, "vcxo_test")) {
@@ -30,6 +30,7 @@ from litepcie.phy.s7pciephy import S7PCIEPHY
 from litepcie.software import generate_litepcie_software_headers
 
 from litedram.frontend.fifo import LiteDRAMFIFO
+from litedram.frontend.dma import LiteDRAMDMAWriter, LiteDRAMDMAReader
 from litedram.modules import MT41K512M16
 from litedram.phy import s7ddrphy
 
@@ -42,7 +43,10 @@ from gateware.sdr_processing import SDRProcessing
 # CRG ----------------------------------------------------------------------------------------------
 
 class CRG(LiteXModule):
-    def __init__(self, platform, sys_clk_freq, with_dram=False, with_fft_window=False):
+    def __init__(self, platform, sys_clk_freq, with_dram=False, with_fft_window=False,
+        fir_clk_freq = None,
+        fft_clk_freq = None,
+        ):
         self.rst          = Signal()
         self.cd_sys       = ClockDomain()
         self.cd_sys4x     = ClockDomain()
@@ -51,6 +55,12 @@ class CRG(LiteXModule):
 
         if with_fft_window:
             self.cd_sys2x = ClockDomain()
+        if fir_clk_freq:
+            self.cd_fir   = ClockDomain()
+        if fft_clk_freq:
+            self.cd_fft   = ClockDomain()
+            if with_fft_window:
+                self.cd_fft2x = ClockDomain()
 
         # Clk/Rst.
         clk200    = platform.request("clk200")
@@ -76,6 +86,20 @@ class CRG(LiteXModule):
         if with_fft_window:
             pll.create_clkout(self.cd_sys2x, 2 * sys_clk_freq)
 
+        # MAIA FIR/FFT DSP PLL (faster clock domains, CDC FIFOs in the cores).
+        if fir_clk_freq or fft_clk_freq:
+            self.dsp_pll = dsp_pll = S7PLL()
+            self.comb += dsp_pll.reset.eq(self.rst)
+            dsp_pll.register_clkin(self.cd_sys.clk, sys_clk_freq)
+            if fir_clk_freq:
+                dsp_pll.create_clkout(self.cd_fir, fir_clk_freq)
+                platform.add_false_path_constraints(self.cd_sys.clk, self.cd_fir.clk)
+            if fft_clk_freq:
+                dsp_pll.create_clkout(self.cd_fft, fft_clk_freq)
+                platform.add_false_path_constraints(self.cd_sys.clk, self.cd_fft.clk)
+                if with_fft_window:
+                    dsp_pll.create_clkout(self.cd_fft2x, 2 * fft_clk_freq)
+
 # BaseSoC -----------------------------------------------------------------------------------------
 
 class BaseSoC(SoCCore):
@@ -84,9 +108,25 @@ class BaseSoC(SoCCore):
         with_led_chaser    = True,
         with_uartbone      = True,
         with_litedram_fifo = False,
+        with_capture       = False,
         with_fft_window    = False,
         fft_radix          = 2,
         fft_order_log2     = 10,
+        with_fft_averager  = False,
+        with_fft_decimator = False,
+        with_fft_hold      = False,
+        with_fft_overlap   = False,
+        with_fft_buffer    = False,
+        with_fft_reorder   = False,
+        with_fft_bfp       = False,
+        fft_bfp_width      = 16,
+        with_pfb           = False,
+        with_timestamps    = False,
+        with_ddc           = False,
+        with_cic           = False,
+        fir_coeff_banks    = False,
+        fir_clk_freq       = None,
+        fft_clk_freq       = None,
         **kwargs):
         platform      = sqrl_acorn.Platform(variant=variant)
         platform.name = "acorn" # Keep target name
@@ -107,12 +147,14 @@ class BaseSoC(SoCCore):
 
         # CRG --------------------------------------------------------------------------------------
         self.crg = CRG(platform, sys_clk_freq,
-            with_dram       = with_litedram_fifo,
+            with_dram       = with_litedram_fifo or with_capture,
             with_fft_window = with_fft_window,
+            fir_clk_freq    = fir_clk_freq,
+            fft_clk_freq    = fft_clk_freq,
         )
 
         # DDR3 SDRAM -------------------------------------------------------------------------------
-        if with_litedram_fifo:
+        if with_litedram_fifo or with_capture:
             self.ddrphy = s7ddrphy.A7DDRPHY(platform.request("ddram"),
                 memtype        = "DDR3",
                 nphases        = 4,
@@ -128,7 +170,7 @@ class BaseSoC(SoCCore):
             self.pcie_phy = S7PCIEPHY(platform, platform.request("pcie_x1"),
                 data_width = 64,
                 bar0_size  = 0x20000)
-            self.add_pcie(phy=self.pcie_phy, ndmas=1)
+            self.add_pcie(phy=self.pcie_phy, ndmas={True: 2, False: 1}[with_capture])
             platform.toolchain.pre_placement_commands.append("reset_property LOC [get_cells -hierarchical -filter {{NAME=~pcie_s7/*gtp_channel.gtpe2_channel_i}}]")
             platform.toolchain.pre_placement_commands.append("set_property LOC GTPE2_CHANNEL_X0Y7 [get_cells -hierarchical -filter {{NAME=~pcie_s7/*gtp_channel.gtpe2_channel_i}}]")
 
@@ -164,6 +206,13 @@ class BaseSoC(SoCCore):
                 with_bypass = True,
             )
 
+        # Snapshot Capture DRAM --------------------------------------------------------------------
+
+        if with_capture:
+            # Circular pre-trigger buffer after the LiteDRAMFIFO area, written/read by DMAs.
+            self.capture_writer = LiteDRAMDMAWriter(self.sdram.crossbar.get_port(mode="write"), fifo_depth=32)
+            self.capture_reader = LiteDRAMDMAReader(self.sdram.crossbar.get_port(mode="read"),  fifo_depth=32)
+
         # DMA Converters ---------------------------------------------------------------------------
 
         self.pre_conv  = ResetInserter()(stream.Converter(64, 32))
@@ -183,6 +232,18 @@ class BaseSoC(SoCCore):
             # External FIFO.
             with_litedram      = with_litedram_fifo,
 
+            # Performance Counters.
+            with_perf_counters = True,
+
+            # Frame Headers (Timestamps).
+            with_timestamps    = with_timestamps,
+
+            # Snapshot Capture (DRAM).
+            with_capture       = with_capture,
+            capture_port_width = self.capture_writer.port.data_width if with_capture else 128,
+            capture_base       = 0x1000_0000, # 256MB.
+            capture_depth      = 0x1000_0000, # 256MB (64M samples).
+
             # FIR.
             with_fir           = True,
             fir_data_in_width  = 16,
@@ -192,7 +253,8 @@ class BaseSoC(SoCCore):
             fir_oper_width     = 7,
             fir_macc_trunc     = 0,
             fir_len_log2       = 8,
-            fir_clk_domain     = "sys",
+            fir_clk_domain     = "fir" if fir_clk_freq else "sys",
+            fir_coeff_banks    = fir_coeff_banks,
             fir_with_csr       = True,
 
             # FFT.
@@ -202,7 +264,18 @@ class BaseSoC(SoCCore):
             fft_radix          = fft_radix,
             fft_window         = with_fft_window,
             fft_cmult3x        = False,
-            fft_clk_domain     = "sys",
+            fft_clk_domain     = "fft" if fft_clk_freq else "sys",
+            with_fft_averager  = with_fft_averager,
+            with_fft_decimator = with_fft_decimator,
+            with_fft_hold      = with_fft_hold,
+            with_fft_overlap   = with_fft_overlap,
+            with_fft_buffer    = with_fft_buffer,
+            with_fft_reorder   = with_fft_reorder,
+            with_fft_bfp       = with_fft_bfp,
+            fft_bfp_width      = fft_bfp_width,
+            with_pfb           = with_pfb,
+            with_ddc           = with_ddc,
+            with_cic           = with_cic,
         )
 
         self.comb += [
@@ -216,6 +289,10 @@ class BaseSoC(SoCCore):
             sdr_processing.reset.eq(~self.pcie_dma0.writer.enable),
         ]
 
+        # SDR Processing Time (Frame Headers/Capture): sys clock cycles (no TimeGenerator on this target).
+        if with_timestamps or with_capture:
+            self.sync += sdr_processing.time.eq(sdr_processing.time + 1)
+
         # LiteDRAMFIFO specials endpoints
         if with_litedram_fifo:
             self.comb += [
@@ -223,6 +300,21 @@ class BaseSoC(SoCCore):
                 dram_fifo.source.connect(sdr_processing.ext_fifo_sink),
             ]
 
+        # Snapshot Capture: DRAM DMAs, snapshots drained to DMA1 (armed while DMA1 is recording).
+        if with_capture:
+            capture = sdr_processing.capture
+            self.capture_conv = ResetInserter()(stream.Converter(32, 64))
+            self.comb += [
+                capture.reset.eq(~self.pcie_dma1.writer.enable),
+                capture.dram_write.connect(self.capture_writer.sink),
+                capture.write_busy.eq(self.capture_writer.port.wdata.valid),
+                capture.dram_read_cmd.connect(self.capture_reader.sink),
+                self.capture_reader.source.connect(capture.dram_read_data),
+                capture.source.connect(self.capture_conv.sink, omit=["first", "last"]),
+                self.capture_conv.source.connect(self.pcie_dma1.sink),
+                self.capture_conv.reset.eq(~self.pcie_dma1.writer.enable),
+            ]
+
         # Leds -------------------------------------------------------------------------------------
         if with_led_chaser:
             self.leds = LedChaser(
@@ -266,9 +358,25 @@ def main():
     parser.add_argument("--with-fft-window", action="store_true",      help="Enable FFT Windowing.")
     parser.add_argument("--fft-radix",       default="2",              help="Radix 2/4.")
     parser.add_argument("--fft-order-log2",  default=5,    type=int,   help="Log2 of the FFT order.")
+    parser.add_argument("--with-fft-averager", action="store_true",    help="Enable FFT power averaging (optional log2) stage.")
+    parser.add_argument("--with-fft-decimator", action="store_true",   help="Enable FFT frame decimation (forward 1 out of K frames).")
+    parser.add_argument("--with-fft-hold",   action="store_true",      help="Enable FFT max/min-hold stage (dumped on demand).")
+    parser.add_argument("--with-fft-overlap", action="store_true",     help="Enable FFT overlapping frames (50%%/75%%) buffer.")
+    parser.add_argument("--with-fft-buffer",  action="store_true",     help="Enable FFT output frames buffer (whole frames dropped when the DMA stalls).")
+    parser.add_argument("--with-fft-reorder", action="store_true",     help="Enable FFT natural order (optional fftshift) reorder buffer.")
+    parser.add_argument("--with-fft-bfp",     action="store_true",     help="Enable FFT block floating point output (frame exponent header + mantissas).")
+    parser.add_argument("--fft-bfp-width",    default=16,  type=int,   help="FFT block floating point mantissas width (16 or 8, 2 per DMA word).", choices=[8, 16])
+    parser.add_argument("--with-pfb",         action="store_true",     help="Enable PFB channelizer mode (polyphase filter bank + FFT + channels selection).")
+    parser.add_argument("--with-timestamps",  action="store_true",     help="Enable timestamp headers on the FFT frames.")
+    parser.add_argument("--with-ddc",        action="store_true",      help="Enable DDC (NCO + mixer, before CIC/FIR).")
+    parser.add_argument("--with-fir-coeff-banks", action="store_true", help="Enable FIR double-buffered coefficient banks (shadow write + swap).")
+    parser.add_argument("--with-cic",        action="store_true",      help="Enable CIC Decimator (before FIR, 4 stages, up to 1024).")
+    parser.add_argument("--fir-clk-freq",    default=0,    type=float, help="FIR clock frequency (0: sys_clk, else own domain with CDC FIFOs, ex 250e6).")
+    parser.add_argument("--fft-clk-freq",    default=0,    type=float, help="FFT clock frequency (0: sys_clk, else own domain with CDC FIFOs).")
 
     # Stream options.
     parser.add_argument("--with-litedram-fifo", action="store_true",   help="Enable LiteDRAM between DMA Writer and Reader.")
+    parser.add_argument("--with-capture",       action="store_true",   help="Enable LiteDRAM triggered snapshot capture (drained to DMA1).")
 
     # Litescope Analyzer Probes.
     probeopts = parser.add_mutually_exclusive_group()
@@ -281,9 +389,25 @@ def main():
         with_pcie          = True,
         with_uartbone      = True,
         with_litedram_fifo = args.with_litedram_fifo,
+        with_capture       = args.with_capture,
         with_fft_window    = args.with_fft_window,
         fft_radix          = args.fft_radix,
         fft_order_log2     = args.fft_order_log2,
+        with_fft_averager  = args.with_fft_averager,
+        with_fft_decimator = args.with_fft_decimator,
+        with_fft_hold      = args.with_fft_hold,
+        with_fft_overlap   = args.with_fft_overlap,
+        with_fft_buffer    = args.with_fft_buffer,
+        with_fft_reorder   = args.with_fft_reorder,
+        with_fft_bfp       = args.with_fft_bfp,
+        fft_bfp_width      = args.fft_bfp_width,
+        with_pfb           = args.with_pfb,
+        with_timestamps    = args.with_timestamps,
+        with_ddc           = args.with_ddc,
+        with_cic           = args.with_cic,
+        fir_coeff_banks    = args.with_fir_coeff_banks,
+        fir_clk_freq       = args.fir_clk_freq,
+        fft_clk_freq       = args.fft_clk_freq,
     )
 
     if args.with_fft_datapath_probe:
@@ -57,12 +57,16 @@ from litex_m2sdr.gateware.measurement import MultiClkMeasurement
 
 from litex_m2sdr.software import generate_litepcie_software
 
-from gateware.sdr_processing import SDRProcessing
+from gateware.sdr_processing      import SDRProcessing
+from gateware.channel_interleaver import ChannelInterleaver
 
 # CRG ----------------------------------------------------------------------------------------------
 
 class CRG(LiteXModule):
-    def __init__(self, platform, sys_clk_freq, with_eth=False, with_sata=False, with_fft=False):
+    def __init__(self, platform, sys_clk_freq, with_eth=False, with_sata=False, with_fft=False,
+        fir_clk_freq = None,
+        fft_clk_freq = None,
+        ):
         self.rst            = Signal()
         self.cd_sys         = ClockDomain()
         self.cd_clk10       = ClockDomain()
@@ -73,6 +77,12 @@ class CRG(LiteXModule):
 
         if with_fft:
             self.cd_sys2x = ClockDomain()
+        if fir_clk_freq:
+            self.cd_fir   = ClockDomain()
+        if fft_clk_freq:
+            self.cd_fft   = ClockDomain()
+            if with_fft:
+                self.cd_fft2x = ClockDomain()
 
         # # #
 
@@ -106,6 +116,20 @@ class CRG(LiteXModule):
         if with_fft:
             pll.create_clkout(self.cd_sys2x, 2 * sys_clk_freq)
 
+        # MAIA FIR/FFT DSP PLL (faster clock domains, CDC FIFOs in the cores).
+        if fir_clk_freq or fft_clk_freq:
+            self.dsp_pll = dsp_pll = S7PLL(speedgrade=-3)
+            self.comb += dsp_pll.reset.eq(self.rst)
+            dsp_pll.register_clkin(self.cd_sys.clk, sys_clk_freq)
+            if fir_clk_freq:
+                dsp_pll.create_clkout(self.cd_fir, fir_clk_freq)
+                platform.add_false_path_constraints(self.cd_sys.clk, self.cd_fir.clk)
+            if fft_clk_freq:
+                dsp_pll.create_clkout(self.cd_fft, fft_clk_freq)
+                platform.add_false_path_constraints(self.cd_sys.clk, self.cd_fft.clk)
+                if with_fft:
+                    dsp_pll.create_clkout(self.cd_fft2x, 2 * fft_clk_freq)
+
 # BaseSoC ------------------------------------------------------------------------------------------
 
 class BaseSoC(SoCMini):
@@ -154,12 +178,29 @@ class BaseSoC(SoCMini):
         with_sata     = False, sata_gen="gen2",
         with_jtagbone = True,
         with_rfic_oversampling = True,
-        with_fft        = False,
-        with_fft_window = False,
-        fft_order_log2  = 5,
-        fft_radix       = 2,
-        with_fir        = False,
-        macc_trunc      = 17,
+        with_fft           = False,
+        with_fft_window    = False,
+        fft_order_log2     = 5,
+        fft_radix          = 2,
+        with_fft_averager  = False,
+        with_fft_decimator = False,
+        with_fft_hold      = False,
+        with_fft_overlap   = False,
+        with_fft_buffer    = False,
+        with_fft_reorder   = False,
+        with_fft_bfp       = False,
+        fft_bfp_width      = 16,
+        with_pfb           = False,
+        with_timestamps    = False,
+        with_ddc           = False,
+        with_cic           = False,
+        with_fir           = False,
+        macc_trunc         = 17,
+        fir_coeff_banks    = False,
+        fir_coeff_dma      = False,
+        fir_clk_freq       = None,
+        fft_clk_freq       = None,
+        with_dual_channel  = False,
     ):
         # Platform ---------------------------------------------------------------------------------
 
@@ -180,9 +221,11 @@ class BaseSoC(SoCMini):
 
         # General.
         self.crg = CRG(platform, sys_clk_freq,
-            with_eth  = with_eth,
-            with_sata = with_sata,
-            with_fft  = with_fft_window,
+            with_eth     = with_eth,
+            with_sata    = with_sata,
+            with_fft     = with_fft_window,
+            fir_clk_freq = fir_clk_freq,
+            fft_clk_freq = fft_clk_freq,
         )
 
         # Shared QPLL.
@@ -484,14 +527,21 @@ class BaseSoC(SoCMini):
                 self.pcie_dma1.synchronizer.pps.eq(1),
             ]
 
-        # DMA Converter ----------------------------------------------------------------------------
+        # SDR Processing ---------------------------------------------------------------------------
 
-        self.post_conv = ResetInserter()(stream.Converter(32, 64))
-        self.comb += self.post_conv.reset.eq(~self.pcie_dma2.writer.enable)
+        sdr_processing_params = dict(
+            # Performance Counters.
+            with_perf_counters = True,
 
-        # SDR Processing ---------------------------------------------------------------------------
+            # Frame Headers (Timestamps).
+            with_timestamps    = with_timestamps,
+
+            # DDC.
+            with_ddc           = with_ddc,
+
+            # CIC.
+            with_cic           = with_cic,
 
-        self.sdr_processing = sdr_processing = SDRProcessing(platform, self,
             # FIR.
             with_fir           = with_fir,
             fir_data_in_width  = 16,
@@ -501,7 +551,9 @@ class BaseSoC(SoCMini):
             fir_oper_width     = 7,
             fir_macc_trunc     = macc_trunc,
             fir_len_log2       = 8,
-            fir_clk_domain     = "sys",
+            fir_clk_domain     = "fir" if fir_clk_freq else "sys",
+            fir_coeff_banks    = fir_coeff_banks,
+            fir_coeff_sink     = fir_coeff_dma,
             fir_with_csr       = True,
 
             # FFT.
@@ -511,25 +563,90 @@ class BaseSoC(SoCMini):
             fft_radix          = fft_radix,
             fft_window         = with_fft_window,
             fft_cmult3x        = False,
-            fft_clk_domain     = "sys",
+            fft_clk_domain     = "fft" if fft_clk_freq else "sys",
+            with_fft_averager  = with_fft_averager,
+            with_fft_decimator = with_fft_decimator,
+            with_fft_hold      = with_fft_hold,
+            with_fft_overlap   = with_fft_overlap,
+            with_fft_buffer    = with_fft_buffer,
+            with_fft_reorder   = with_fft_reorder,
+            with_fft_bfp       = with_fft_bfp,
+            fft_bfp_width      = fft_bfp_width,
+            with_pfb           = with_pfb,
         )
 
+        self.sdr_processing = sdr_processing = SDRProcessing(platform, self, **sdr_processing_params)
+
         self.comb += [
             # AD9361 -> SDR Processing Sink.
             self.ad9361.source.connect(sdr_processing.sink, omit=["ready", "data"]),
-            sdr_processing.sink.data.eq(self.ad9361.source.data[:32]), # only keep first Channel
-
-            # SDR Processing Source -> Converter -> DMA2 Sink.
-            sdr_processing.source.connect(self.post_conv.sink),
-            self.post_conv.source.connect(self.pcie_dma2.sink, omit=["first", "last"]),
+            sdr_processing.sink.data.eq(self.ad9361.source.data[:32]), # First Channel.
 
             # Disable DMA2 synchronizer.
             self.pcie_dma2.synchronizer.pps.eq(1),
 
             # SDR Processing Reset.
             sdr_processing.reset.eq(~self.pcie_dma0.writer.enable),
+
+            # SDR Processing Time (Frame Headers).
+            sdr_processing.time.eq(time_sys),
         ]
 
+        # Single Channel: SDR Processing Source -> Converter -> DMA2.
+        # -----------------------------------------------------------
+        if not with_dual_channel:
+            self.post_conv = ResetInserter()(stream.Converter(32, 64))
+            self.comb += [
+                self.post_conv.reset.eq(~self.pcie_dma2.writer.enable),
+                sdr_processing.source.connect(self.post_conv.sink),
+                self.post_conv.source.connect(self.pcie_dma2.sink, omit=["first", "last"]),
+            ]
+
+        # Dual Channel: SDR Processing (x2) Sources -> Channel Interleaver -> DMA2.
+        # -------------------------------------------------------------------------
+        # Second channel processed by its own SDRProcessing (sdr_processing1 CSRs), packets (FFT
+        # frames) of both channels interleaved in DMA2 with channel tags (see ChannelInterleaver).
+        else:
+            self.sdr_processing1 = sdr_processing1 = SDRProcessing(platform, None, **sdr_processing_params)
+            # Packets: longest frame of the enabled stages (BFP/reorder/PFB) with its headers (even).
+            packet_len = sdr_processing.packet_len + sdr_processing.packet_len % 2
+            self.interleaver = ChannelInterleaver(n=2,
+                data_width = 32,
+                packet_len = packet_len,
+                fifo_depth = max(packet_len, 256),
+            )
+            self.comb += [
+                # AD9361 -> SDR Processing 1 Sink.
+                self.ad9361.source.connect(sdr_processing1.sink, omit=["ready", "data"]),
+                sdr_processing1.sink.data.eq(self.ad9361.source.data[32:]), # Second Channel.
+                sdr_processing1.reset.eq(~self.pcie_dma0.writer.enable),
+                sdr_processing1.time.eq(time_sys),
+
+                # SDR Processings Sources -> Channel Interleaver -> DMA2 Sink.
+                self.interleaver.reset.eq(~self.pcie_dma2.writer.enable),
+                sdr_processing.source.connect(self.interleaver.sinks[0]),
+                sdr_processing1.source.connect(self.interleaver.sinks[1]),
+                self.interleaver.source.connect(self.pcie_dma2.sink, omit=["first", "last"]),
+            ]
+
+        # FIR Coefficients: DMA1 Reader -> Converter -> SDR Processing(s) Coefficients Sink.
+        # ----------------------------------------------------------------------------------
+        # Burst upload of maia_sdr_fir.coefficient_words (DMA1 reader otherwise unused).
+        if with_fir and fir_coeff_dma:
+            self.coeff_conv = stream.Converter(64, 32)
+            self.comb += self.pcie_dma1.source.connect(self.coeff_conv.sink, omit=["first", "last"])
+            # Dual Channel: words broadcast to both channels, accepted when both are ready.
+            if with_dual_channel:
+                coeff_sinks = [sdr_processing.fir_coeff_sink, sdr_processing1.fir_coeff_sink]
+                for i, coeff_sink in enumerate(coeff_sinks):
+                    self.comb += [
+                        self.coeff_conv.source.connect(coeff_sink, omit=["valid", "ready"]),
+                        coeff_sink.valid.eq(self.coeff_conv.source.valid & coeff_sinks[1 - i].ready),
+                    ]
+                self.comb += self.coeff_conv.source.ready.eq(coeff_sinks[0].ready & coeff_sinks[1].ready)
+            else:
+                self.comb += self.coeff_conv.source.connect(sdr_processing.fir_coeff_sink)
+
     # LiteScope Probes (Debug) ---------------------------------------------------------------------
 
     def add_ad9361_spi_probe(self):
@@ -634,10 +751,29 @@ def main():
     parser.add_argument("--without-fft-window", action="store_true",     help="Enable FFT Window.")
     parser.add_argument("--fft-order-log2",     default=10,  type=int,   help="Log2 of the FFT order.")
     parser.add_argument("--fft-radix",          default="2",             help="Radix 2/4.")
+    parser.add_argument("--with-fft-averager",  action="store_true",     help="Enable FFT power averaging (optional log2) stage.")
+    parser.add_argument("--with-fft-decimator", action="store_true",     help="Enable FFT frame decimation (forward 1 out of K frames).")
+    parser.add_argument("--with-fft-hold",      action="store_true",     help="Enable FFT max/min-hold stage (dumped on demand).")
+    parser.add_argument("--with-fft-overlap",   action="store_true",     help="Enable FFT overlapping frames (50%%/75%%) buffer.")
+    parser.add_argument("--with-fft-buffer",    action="store_true",     help="Enable FFT output frames buffer (whole frames dropped when the DMA stalls).")
+    parser.add_argument("--with-fft-reorder",   action="store_true",     help="Enable FFT natural order (optional fftshift) reorder buffer.")
+    parser.add_argument("--with-fft-bfp",       action="store_true",     help="Enable FFT block floating point output (frame exponent header + mantissas).")
+    parser.add_argument("--fft-bfp-width",      default=16, type=int,    help="FFT block floating point mantissas width (16 or 8, 2 per DMA word).", choices=[8, 16])
+    parser.add_argument("--with-pfb",           action="store_true",     help="Enable PFB channelizer mode (polyphase filter bank + FFT + channels selection).")
+    parser.add_argument("--with-timestamps",    action="store_true",     help="Enable timestamp headers on the FFT frames (DMA2).")
+    parser.add_argument("--fft-clk-freq",       default=0, type=float,   help="FFT clock frequency (0: sys_clk, else own domain with CDC FIFOs).")
 
     # FIR parameters.
     parser.add_argument("--without-fir",        action="store_true",     help="Disable FIR Module.")
     parser.add_argument("--macc-trunc",         default=17, type=int,    help="Truncation length for output of each MACC.")
+    parser.add_argument("--with-fir-coeff-banks", action="store_true",   help="Enable FIR double-buffered coefficient banks (shadow write + swap).")
+    parser.add_argument("--with-fir-coeff-dma", action="store_true",     help="Enable FIR coefficients upload through DMA1 reader.")
+    parser.add_argument("--with-ddc",           action="store_true",     help="Enable DDC (NCO + mixer, before CIC/FIR).")
+    parser.add_argument("--with-cic",           action="store_true",     help="Enable CIC Decimator (before FIR, 4 stages, up to 1024).")
+    parser.add_argument("--fir-clk-freq",       default=0, type=float,   help="FIR clock frequency (0: sys_clk, else own domain with CDC FIFOs, ex 250e6).")
+
+    # Channels parameters.
+    parser.add_argument("--with-dual-channel",  action="store_true",     help="Process both RX channels (interleaved in DMA2 with channel tags).")
 
     # Litescope Analyzer Probes.
     probeopts = parser.add_mutually_exclusive_group()
@@ -669,14 +805,33 @@ def main():
         with_sata     = args.with_sata,
 
         # FFT.
-        with_fft        = not args.without_fft,
-        with_fft_window = not args.without_fft_window,
-        fft_order_log2  = args.fft_order_log2,
-        fft_radix       = args.fft_radix,
+        with_fft           = not args.without_fft,
+        with_fft_window    = not args.without_fft_window,
+        fft_order_log2     = args.fft_order_log2,
+        fft_radix          = args.fft_radix,
+        with_fft_averager  = args.with_fft_averager,
+        with_fft_decimator = args.with_fft_decimator,
+        with_fft_hold      = args.with_fft_hold,
+        with_fft_overlap   = args.with_fft_overlap,
+        with_fft_buffer    = args.with_fft_buffer,
+        with_fft_reorder   = args.with_fft_reorder,
+        with_fft_bfp       = args.with_fft_bfp,
+        fft_bfp_width      = args.fft_bfp_width,
+        with_pfb           = args.with_pfb,
+        with_timestamps    = args.with_timestamps,
 
         # FIR.
-        with_fir        = not args.without_fir,
-        macc_trunc      = args.macc_trunc,
+        with_fir           = not args.without_fir,
+        with_ddc           = args.with_ddc,
+        with_cic           = args.with_cic,
+        macc_trunc         = args.macc_trunc,
+        fir_coeff_banks    = args.with_fir_coeff_banks,
+        fir_coeff_dma      = args.with_fir_coeff_dma,
+        fir_clk_freq       = args.fir_clk_freq,
+        fft_clk_freq       = args.fft_clk_freq,
+
+        # Channels.
+        with_dual_channel  = args.with_dual_channel,
     )
 
     # LiteScope Analyzer Probes.
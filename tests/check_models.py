@@ -0,0 +1,1148 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.append("..")
+
+from gateware.cic                         import model as cic_model, gain_bits as cic_gain_bits
+from gateware.ddc                         import model as ddc_model, phase_increment
+from gateware.maia_sdr_fir               import MaiaSDRFIRModel, model as fir_model
+from gateware.maia_sdr_firdecimator3stage import MaiaSDRFIRModel as MaiaSDRFIR3StageModel
+from gateware.maia_sdr_fft                import MaiaSDRFFTModel, digit_reversed_order
+from gateware.sdr_planner                 import bram18_count, dsp48_count, fft_resources
+from gateware.spectrum                    import model as spectrum_model, hold_model
+from gateware.overlap                     import model as overlap_model
+from gateware.timestamp                   import header as frame_header, parse as parse_frames
+from gateware.capture                     import model as capture_model
+from gateware.pfb                         import model as pfb_model, prototype as pfb_prototype
+
+# Utils --------------------------------------------------------------------------------------------
+
+def random_fir_config(rng, max_len_log2=8):
+    decimation = int(rng.integers(1, 8))
+    length     = decimation * int(rng.integers(1, 2**max_len_log2 // decimation + 1))
+    coeff_bits = int(rng.integers(4, 19))
+    in_bits    = int(rng.integers(4, 17))
+    taps       = rng.integers(-2**(coeff_bits - 1), 2**(coeff_bits - 1), size=length)
+    n          = int(rng.integers(0, 4096))
+    re_in      = rng.integers(-2**(in_bits - 1), 2**(in_bits - 1), size=n)
+    im_in      = rng.integers(-2**(in_bits - 1), 2**(in_bits - 1), size=n)
+    return dict(
+        macc_trunc = int(rng.integers(0, 24)),
+        ow         = int(rng.integers(8, 25)),
+        taps       = [int(t) for t in taps],
+        decimation = decimation,
+        re_in      = re_in,
+        im_in      = im_in,
+    )
+
+def split_chunks(rng, x, max_chunk):
+    cuts = np.cumsum(rng.integers(0, max_chunk + 1, size=x.shape[-1] + 1))
+    cuts = cuts[cuts < x.shape[-1]]
+    return np.split(x, cuts, axis=-1)
+
+def check(name, ok):
+    print(f"{name}: {'OK' if ok else 'FAILED'}")
+    return ok
+
+def simulate_stream(rng, dut, re_in, im_in, frame_len, config, gaps=True, fields=["data"], status=[],
+    idle=0, drain=16):
+    """Feed re/im samples (last every frame_len, `idle` cycles between samples) to a Migen dut, return
+    its (*fields, last) words (collected until `drain` cycles after the last sample) and the final
+    values of the `status` signals."""
+    from migen.sim import run_simulation, passive
+    out    = []
+    values = []
+    def generator():
+        for signal, value in config.items():
+            yield signal.eq(value)
+        yield
+        for i in range(len(re_in)):
+            while gaps and rng.integers(0, 3) == 0:
+                yield dut.sink.valid.eq(0)
+                yield
+            yield dut.sink.valid.eq(1)
+            yield dut.sink.re.eq(int(re_in[i]))
+            yield dut.sink.im.eq(int(im_in[i]))
+            yield dut.sink.last.eq(i % frame_len == frame_len - 1)
+            yield
+            for _ in range(idle):
+                yield dut.sink.valid.eq(0)
+                yield
+        yield dut.sink.valid.eq(0)
+        for _ in range(drain):
+            yield
+        for signal in status:
+            values.append((yield signal))
+    @passive
+    def monitor():
+        while True:
+            if (yield dut.source.valid) and (yield dut.source.ready):
+                word = []
+                for field in fields + ["last"]:
+                    word.append((yield getattr(dut.source, field)))
+                out.append(tuple(word))
+            yield
+    run_simulation(dut, [generator(), monitor()])
+    return out, values
+
+# FIR ----------------------------------------------------------------------------------------------
+
+def check_fir_model(rng, iterations):
+    from maia_hdl.fir import FIR4DSP
+    ok = True
+    for _ in range(iterations):
+        cfg = random_fir_config(rng)
+        ref = FIR4DSP(macc_trunc=cfg["macc_trunc"], out_width=cfg["ow"]).model(
+            cfg["taps"], cfg["decimation"], cfg["re_in"], cfg["im_in"])
+        res = fir_model(**cfg)
+        ok &= all(np.array_equal(a, b) for a, b in zip(ref, res))
+    return check("FIR model vs FIR4DSP.model", ok)
+
+def check_fir_model_stream(rng, iterations):
+    ok = True
+    for _ in range(iterations):
+        cfg = random_fir_config(rng)
+        ref = fir_model(**cfg)
+        fir = MaiaSDRFIRModel(cfg["macc_trunc"], cfg["ow"], cfg["taps"], cfg["decimation"])
+        res = [fir.process(re, im) for re, im in split_chunks(rng, np.array([cfg["re_in"], cfg["im_in"]]), 300)]
+        res = [np.concatenate([r[i] for r in res]) for i in range(2)]
+        ok &= all(np.array_equal(a, b) for a, b in zip(ref, res))
+    return check("FIR streaming model vs model", ok)
+
+def check_fir_model_fft(rng, iterations):
+    ok = True
+    for _ in range(iterations):
+        cfg = random_fir_config(rng, max_len_log2=10)
+        ref = fir_model(**cfg, method="direct")
+        res = fir_model(**cfg, method="fft")
+        ok &= all(np.array_equal(a, b) for a, b in zip(ref, res))
+    return check("FIR FFT model vs direct model", ok)
+
+def check_fir_coeff_banks(rng):
+    # Swap the banks at random cycles: outputs must switch from bank 0 taps to bank 1 taps at once.
+    from amaranth.sim import Simulator
+    from gateware.maia_sdr_fir import fir4dsp_banks, compute_coefficients
+    ok = True
+    for decimation, operations, odd_operations in [(2, 4, False), (3, 3, True), (4, 1, False)]:
+        num_taps   = decimation * (2 * operations - odd_operations)
+        taps       = [rng.integers(-2**17, 2**17, size=num_taps).tolist() for _ in range(2)]
+        n          = 64 * decimation
+        re_in      = rng.integers(-2**15, 2**15, size=n)
+        im_in      = rng.integers(-2**15, 2**15, size=n)
+        swap_cycle = int(rng.integers(n // 4, n // 2) * operations)
+        dut        = fir4dsp_banks(macc_trunc=18, out_width=16)
+        out        = []
+        async def testbench(ctx):
+            for bank in range(2):
+                _, _, coeffs = compute_coefficients(operations, decimation, odd_operations, 256, taps[bank])
+                for addr, coeff in enumerate(coeffs):
+                    ctx.set(dut.coeff_wbank, bank)
+                    ctx.set(dut.coeff_waddr, addr)
+                    ctx.set(dut.coeff_wdata, int(coeff))
+                    ctx.set(dut.coeff_wren,  1)
+                    await ctx.tick()
+            ctx.set(dut.coeff_wren,           0)
+            ctx.set(dut.decimation,           decimation)
+            ctx.set(dut.operations_minus_one, operations - 1)
+            ctx.set(dut.odd_operations,       odd_operations)
+            await ctx.tick()
+            i = 0
+            for cycle in range(n * operations + 64):
+                ctx.set(dut.in_valid, i < n)
+                if i < n:
+                    ctx.set(dut.re_in, int(re_in[i]))
+                    ctx.set(dut.im_in, int(im_in[i]))
+                ctx.set(dut.coeff_rbank, cycle >= swap_cycle)
+                accepted = i < n and ctx.get(dut.in_ready)
+                if ctx.get(dut.strobe_out):
+                    out.append((ctx.get(dut.re_out), ctx.get(dut.im_out)))
+                await ctx.tick()
+                i += accepted
+        sim = Simulator(dut)
+        sim.add_clock(1e-6)
+        sim.add_testbench(testbench)
+        sim.run()
+        # FIR4DSP outputs are aligned on a decimation - 1 samples delayed input (the first one,
+        # computed from reset, is skipped).
+        delay = np.zeros(decimation - 1, dtype=int)
+        refs  = [fir_model(18, 16, t, decimation, np.concatenate([delay, re_in]), np.concatenate([delay, im_in]))
+            for t in taps]
+        refs  = [list(zip(re[2:].tolist(), im[2:].tolist())) for re, im in refs]
+        out   = out[1:len(refs[0]) + 1]
+        k     = next((j for j in range(len(out)) if out[j] != refs[0][j]), len(out))
+        ok   &= len(out) == len(refs[0]) and 0 < k < len(out) and out[k:] == refs[1][k:]
+    return check("FIR coefficient banks swap", ok)
+
+def check_fir_coeff_cdc(rng):
+    # Upload interrupted by a reset while its writes are still pending in the CDC FIFO (FIR side
+    # stalled): only the restarted upload reaches the FIR, for faster and slower FIR clocks.
+    from migen.sim import run_simulation, passive
+    from gateware.maia_sdr_fir import MaiaSDRFIRCoeffCDC
+    ok = True
+    for period in [4, 16]:
+        dut     = MaiaSDRFIRCoeffCDC(len_log2=8, coeff_width=18, clk_domain="fir")
+        aborted = [(int(a), int(d)) for a, d in zip(rng.integers(0, 256, 12), rng.integers(0, 2**18, 12))]
+        upload  = [(int(a), int(d)) for a, d in zip(rng.integers(0, 256, 64), rng.integers(0, 2**18, 64))]
+        state   = dict(drain=False)
+        out     = []
+        def generator():
+            for addr, data in aborted:
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.addr.eq(addr)
+                yield dut.sink.data.eq(data)
+                yield
+            yield dut.sink.valid.eq(0)
+            yield dut.reset.eq(1)
+            for _ in range(8):
+                yield
+            yield dut.reset.eq(0)
+            state["drain"] = True
+            for addr, data in upload:
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.addr.eq(addr)
+                yield dut.sink.data.eq(data)
+                yield
+                while not (yield dut.sink.ready):
+                    yield
+            yield dut.sink.valid.eq(0)
+            for _ in range(64):
+                yield
+        @passive
+        def monitor():
+            while True:
+                ready = int(state["drain"] and rng.integers(0, 4) != 0)
+                yield dut.source.ready.eq(ready)
+                yield
+                if (yield dut.source.valid) and ready:
+                    out.append(((yield dut.source.addr), (yield dut.source.data)))
+        run_simulation(dut, {"sys": [generator()], "fir": [monitor()]}, clocks={"sys": 10, "fir": period})
+        ok &= out == upload
+    return check("FIR coefficients CDC reset", ok)
+
+def check_fir_coeff_cdc_swap(rng):
+    # Shadow bank written then swapped at once while the FIR side stalls: the read bank must only
+    # switch once all the writes queued ahead of the swap are out (in both directions).
+    from migen.sim import run_simulation, passive
+    from gateware.maia_sdr_fir import MaiaSDRFIRCoeffCDC
+    ok = True
+    for period in [4, 16]:
+        dut     = MaiaSDRFIRCoeffCDC(len_log2=8, coeff_width=18, clk_domain="fir")
+        uploads = [[(int(a), int(d)) for a, d in zip(rng.integers(0, 256, 40), rng.integers(0, 2**18, 40))]
+            for _ in range(2)]
+        writes  = []
+        swaps   = []
+        def generator():
+            for _ in range(64): # Initial read bank sent.
+                yield
+            for bank, upload in zip([1, 0], uploads):
+                for addr, data in upload:
+                    yield dut.sink.valid.eq(1)
+                    yield dut.sink.addr.eq(addr)
+                    yield dut.sink.data.eq(data)
+                    yield dut.sink.bank.eq(bank)
+                    yield
+                    while not (yield dut.sink.ready):
+                        yield
+                yield dut.sink.valid.eq(0)
+                yield dut.rbank.eq(bank)
+                yield
+            for _ in range(2048):
+                yield
+        @passive
+        def monitor():
+            rbank = 0
+            while True:
+                ready = int(rng.integers(0, 4) == 0)
+                yield dut.source.ready.eq(ready)
+                yield
+                if (yield dut.source_rbank) != rbank:
+                    rbank = (yield dut.source_rbank)
+                    swaps.append((rbank, len(writes)))
+                if (yield dut.source.valid) and ready:
+                    writes.append(((yield dut.source.addr), (yield dut.source.data), (yield dut.source.bank)))
+        run_simulation(dut, {"sys": [generator()], "fir": [monitor()]}, clocks={"sys": 10, "fir": period})
+        ok &= writes == [(a, d, 1) for a, d in uploads[0]] + [(a, d, 0) for a, d in uploads[1]]
+        ok &= swaps == [(1, 40), (0, 80)]
+    return check("FIR coefficients CDC bank swap", ok)
+
+def check_fir3_model(rng, iterations):
+    # Each stage starts on its decimation phase (first output on its decimation-th input sample):
+    # compare against the one-shot model of every stage fed with one leading zero sample and its
+    # first output dropped, with the 3-stage input split in random chunks.
+    ok = True
+    for _ in range(iterations):
+        cfgs   = [random_fir_config(rng, max_len_log2=l) for l in [7, 6, 7]]
+        bypass = [False] + [bool(b) for b in rng.integers(0, 2, size=2)]
+        args   = [[cfg[k] for cfg in cfgs] for k in ["macc_trunc", "ow", "taps", "decimation"]]
+        x      = np.array([cfgs[0]["re_in"], cfgs[0]["im_in"]])
+        fir    = MaiaSDRFIR3StageModel(*args, bypass2=bypass[1], bypass3=bypass[2])
+        res    = [fir.process(re, im) for re, im in split_chunks(rng, x, 300)]
+        res    = [np.concatenate([r[i] for r in res]) for i in range(2)]
+        for j, (cfg, b) in enumerate(zip(cfgs, bypass)):
+            if not b:
+                stage = MaiaSDRFIRModel(cfg["macc_trunc"], cfg["ow"], cfg["taps"], cfg["decimation"],
+                    maccs = {True: 1, False: 2}[j == 1])
+                x = np.array(stage.process(*np.pad(x, ((0, 0), (1, 0)))))[:, 1:]
+        ok &= all(np.array_equal(a, b) for a, b in zip(x, res))
+    return check("FIR 3-stage model vs chained stage models", ok)
+
+def bench_fir_model(rng, samples, taps, decimation, method):
+    x = rng.integers(-2**15, 2**15, size=(2, samples))
+    h = rng.integers(-2**17, 2**17, size=taps)
+    t = time.perf_counter()
+    fir_model(17, 16, h, decimation, x[0], x[1], method=method)
+    t = time.perf_counter() - t
+    print(f"FIR model ({taps} taps, decimation {decimation}, {method}): {samples/t/1e6:.2f} MS/s")
+
+# DDC ----------------------------------------------------------------------------------------------
+
+def check_ddc_model(rng):
+    from gateware.ddc import DDC
+    ok = True
+    for iw, ow, lut_addr_width, lut_width, phase_inc in [
+        (16, 16, 10, 18, phase_increment(1.25e6, 30.72e6)),
+        (16, 16, 10, 18, phase_increment(-7e6, 30.72e6)),
+        (12, 14,  8, 16, int(rng.integers(0, 2**32))),
+        (16, 12,  6, 12, 2**31), # fs/2 (+ saturation).
+        ]:
+        dut   = DDC(iw, ow, lut_addr_width, lut_width, with_csr=False)
+        re_in = rng.integers(-2**(iw - 1), 2**(iw - 1), size=512)
+        im_in = rng.integers(-2**(iw - 1), 2**(iw - 1), size=512)
+        out, _ = simulate_stream(rng, dut, re_in, im_in, 64, {
+            dut.source.ready : 1,
+            dut.phase_inc    : phase_inc,
+        }, fields=["re", "im"])
+        re, im = ddc_model(re_in, im_in, phase_inc, iw, ow, lut_addr_width, lut_width)
+        ok &= [(r, i) for r, i, _ in out] == [(r % 2**ow, i % 2**ow) for r, i in zip(re, im)]
+        ok &= [l for _, _, l in out] == [i % 64 == 63 for i in range(len(re_in))]
+    return check("DDC model vs DDC", ok)
+
+# CIC ----------------------------------------------------------------------------------------------
+
+def check_cic_model(rng):
+    from gateware.cic import CICDecimator
+    ok = True
+    for stages, max_decimation, diff_delay, decimation, iw, ow, shift in [
+        (3, 16, 1, 16, 12, 12, None),
+        (4, 64, 1, 10, 16, 16, None),
+        (2,  8, 2,  5, 10, 14, None),
+        (3, 32, 1,  4, 12, 12, 9), # Larger shift than the gain.
+        (3, 16, 1, 16, 12, 12, 1), # Smaller shift than the gain (wraps).
+        ]:
+        dut   = CICDecimator(iw, ow, stages, max_decimation, diff_delay, with_csr=False)
+        shift = cic_gain_bits(decimation, stages, diff_delay) if shift is None else shift
+        re_in = rng.integers(-2**(iw - 1), 2**(iw - 1), size=24 * decimation)
+        im_in = rng.integers(-2**(iw - 1), 2**(iw - 1), size=24 * decimation)
+        out, _ = simulate_stream(rng, dut, re_in, im_in, 2**30, {
+            dut.source.ready         : 1,
+            dut.decimation_minus_one : decimation - 1,
+            dut.shift                : shift,
+        }, fields=["re", "im"])
+        re, im = cic_model(re_in, im_in, decimation, stages, diff_delay, iw, ow, max_decimation, shift)
+        ok &= [(r, i) for r, i, _ in out] == [(r % 2**ow, i % 2**ow) for r, i in zip(re, im)]
+    return check("CIC model vs CICDecimator", ok)
+
+# FFT ----------------------------------------------------------------------------------------------
+
+def random_fft_config(rng):
+    radix      = [2, 4, "R22"][int(rng.integers(0, 3))]
+    radix_log2 = {2: 1, 4: 2, "R22": 2}[radix]
+    order_log2 = radix_log2 * int(rng.integers(1, 10 // radix_log2 + 1))
+    nstages    = order_log2 // radix_log2
+    truncates  = None
+    if rng.integers(0, 2):
+        if radix == "R22":
+            truncates = [[int(t) for t in rng.integers(0, 2, size=2)] for _ in range(nstages)]
+        else:
+            truncates = [int(t) for t in rng.integers(0, radix_log2 + 1, size=nstages)]
+    return dict(
+        data_width = int(rng.integers(8, 17)),
+        order_log2 = order_log2,
+        radix      = radix,
+        window     = [None, "blackmanharris"][int(rng.integers(0, 2))],
+        truncates  = truncates,
+    )
+
+def check_fft_model(rng, iterations):
+    from maia_hdl.fft import FFT
+    ok = True
+    for _ in range(max(1, iterations // 4)):
+        cfg = random_fft_config(rng)
+        fft = FFT(cfg["data_width"], cfg["order_log2"], cfg["radix"],
+            width_twiddle = 16,
+            truncates     = cfg["truncates"],
+            window        = cfg["window"],
+            domain_2x     = "clk2x" if cfg["window"] is not None else None)
+        # Full scale re/im (beyond the allowed complex amplitude) also exercises twiddle wraps.
+        x   = rng.integers(-2**(cfg["data_width"] - 1), 2**(cfg["data_width"] - 1), size=(2, 4, 2**cfg["order_log2"]))
+        ref = fft.model(x[0].ravel(), x[1].ravel())
+        res = MaiaSDRFFTModel(**cfg).process(x[0], x[1])
+        ok &= all(np.array_equal(a, b.ravel()) for a, b in zip(ref, res))
+    return check("FFT model vs FFT.model", ok)
+
+def check_fft_order(rng):
+    ok = True
+    for radix in [2, 4, "R22"]:
+        k      = int(rng.integers(0, 256))
+        x      = np.round(2000 * np.exp(2j * np.pi * k * np.arange(256) / 256))
+        re, im = MaiaSDRFFTModel(16, 8, radix).process(x.real, x.imag)
+        ok    &= int(np.argmax(np.abs(re + 1j*im)[digit_reversed_order(8, radix)])) == k
+    return check("FFT digit reversed order", ok)
+
+def check_fft_reorder(rng):
+    # FFT-like frames (digit-reversed, no gaps/backpressure), natural order (fftshift) frames out, no
+    # drops without output stalls.
+    from migen.sim import run_simulation, passive
+    from gateware.maia_sdr_fft import FFTReorder
+    ok = True
+    order_log2 = 4
+    n          = 2**order_log2
+    for radix, fftshift, stalls in [(2, False, False), (4, True, False), ("R22", False, True), (4, False, True)]:
+        dut      = FFTReorder(data_width=16, order_log2=order_log2, radix=radix, with_csr=False)
+        re_in    = rng.integers(0, 2**16, size=16 * n)
+        im_in    = rng.integers(0, 2**16, size=16 * n)
+        natural  = (re_in + 1j * im_in).reshape(-1, n)[:, digit_reversed_order(order_log2, radix)]
+        natural  = np.fft.fftshift(natural, axes=1) if fftshift else natural
+        frames   = [[(int(x.real), int(x.imag)) for x in frame] for frame in natural]
+        out      = []
+        dropped  = []
+        def generator():
+            yield dut.fftshift.eq(fftshift)
+            yield
+            for i in range(len(re_in)):
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.re.eq(int(re_in[i]))
+                yield dut.sink.im.eq(int(im_in[i]))
+                yield dut.sink.last.eq(i % n == n - 1)
+                yield
+            yield dut.sink.valid.eq(0)
+            for _ in range(8 * n):
+                yield
+            dropped.append((yield dut.dropped))
+        @passive
+        def monitor():
+            while True:
+                ready = not (stalls and rng.integers(0, 2))
+                yield dut.source.ready.eq(ready)
+                yield
+                if (yield dut.source.valid) and ready:
+                    out.append(((yield dut.source.re), (yield dut.source.im), (yield dut.source.last)))
+        run_simulation(dut, [generator(), monitor()])
+        emitted = [out[k:k + n] for k in range(0, len(out), n)]
+        ok &= all(frame[-1][2] and not any(l for _, _, l in frame[:-1]) for frame in emitted)
+        emitted = [[(r, i) for r, i, _ in frame] for frame in emitted]
+        ok &= len(emitted) + dropped[0] == len(frames)
+        ok &= (dropped[0] > 0) == stalls
+        ok &= emitted == [frame for frame in frames if frame in emitted]
+    return check("FFTReorder natural order frames", ok)
+
+def check_bfp(rng):
+    # Frames of random amplitudes (exponents 0 to max, full scale negative sample) through the DMA
+    # 32 to 64-bit converter: model words out (no padding word), no drops when sustainable without
+    # output stalls, all the frames decoded, decoded samples within 2**exponent.
+    from migen import Module
+    from migen.sim import run_simulation, passive
+    from litex.soc.interconnect import stream
+    from gateware.bfp import BlockFloatingPoint, model as bfp_model, decode as bfp_decode, frame_words
+    ok = True
+    order_log2 = 4
+    n          = 2**order_log2
+    for mantissa_width, idle, stalls in [(16, 1, False), (8, 0, False), (8, 0, True), (16, 0, True)]:
+        dut    = BlockFloatingPoint(data_width=24, order_log2=order_log2, mantissa_width=mantissa_width, with_csr=False)
+        conv   = stream.Converter(32, 64)
+        top    = Module()
+        top.submodules += dut, conv
+        top.comb += dut.source.connect(conv.sink)
+        length = frame_words(order_log2, mantissa_width)
+        scales = [2**int(s) for s in rng.integers(0, 24, size=16)]
+        re_in  = np.concatenate([rng.integers(-s, s, size=n) for s in scales])
+        im_in  = np.concatenate([rng.integers(-s, s, size=n) for s in scales])
+        re_in[-1] = -2**23
+        ref    = bfp_model(re_in, im_in, order_log2, mantissa_width)
+        ref    = [ref[k:k + length] for k in range(0, len(ref), length)]
+        out     = []
+        dropped = []
+        def generator():
+            yield
+            for i in range(len(re_in)):
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.re.eq(int(re_in[i]) % 2**24)
+                yield dut.sink.im.eq(int(im_in[i]) % 2**24)
+                yield dut.sink.last.eq(i % n == n - 1)
+                yield
+                for _ in range(idle):
+                    yield dut.sink.valid.eq(0)
+                    yield
+            yield dut.sink.valid.eq(0)
+            for _ in range(8 * n):
+                yield
+            dropped.append((yield dut.dropped))
+        @passive
+        def monitor():
+            while True:
+                ready = not (stalls and rng.integers(0, 3))
+                yield conv.source.ready.eq(ready)
+                yield
+                if (yield conv.source.valid) and ready:
+                    data = (yield conv.source.data)
+                    last = (yield conv.source.last)
+                    out.extend([(data & 0xffff_ffff, 0), (data >> 32, last)])
+        run_simulation(top, [generator(), monitor()])
+        emitted = [out[k:k + length] for k in range(0, len(out), length)]
+        ok &= all(frame[-1][1] and not any(l for _, l in frame[:-1]) for frame in emitted)
+        emitted = [[w for w, _ in frame] for frame in emitted]
+        ok &= len(emitted) + dropped[0] == len(ref)
+        ok &= (dropped[0] > 0) == stalls
+        ok &= emitted == [frame for frame in ref if frame in emitted]
+        ok &= len(bfp_decode(sum(emitted, []), order_log2, mantissa_width)) == len(emitted)
+        for (e, samples), frame in zip(bfp_decode(sum(ref, []), order_log2, mantissa_width), range(len(ref))):
+            x   = re_in[frame * n:(frame + 1) * n] + 1j * im_in[frame * n:(frame + 1) * n]
+            ok &= np.all(np.abs((x - samples).real) < 2**e) and np.all(np.abs((x - samples).imag) < 2**e)
+            ok &= np.all(np.abs((x / 2**e).real) <= 2**(mantissa_width - 1))
+    return check("BlockFloatingPoint frames (DMA converter)", ok)
+
+def bench_fft_model(rng, samples, order_log2, radix, window, runs=5):
+    # Best of `runs`, against np.fft (floating point, single pass) on the same frames.
+    a = rng.uniform(0, 2**11 - 1, size=samples)
+    p = rng.uniform(0, 2*np.pi, size=samples)
+    x = np.round([a * np.cos(p), a * np.sin(p)])
+    m = MaiaSDRFFTModel(12, order_log2, radix, window)
+    def best(f):
+        times = []
+        for _ in range(runs):
+            t = time.perf_counter()
+            f()
+            times.append(time.perf_counter() - t)
+        return min(times)
+    t_model = best(lambda: m.process(x[0], x[1]))
+    t_numpy = best(lambda: np.fft.fft((x[0] + 1j*x[1]).reshape(-1, 2**order_log2), axis=-1))
+    print(f"FFT model (order_log2 {order_log2}, radix {radix}, window {window}): "
+        f"{samples/t_model/1e6:.2f} MS/s (np.fft: {samples/t_numpy/1e6:.2f} MS/s, x{t_model/t_numpy:.1f})")
+
+def check_overlap_buffer(rng):
+    from gateware.overlap import OverlapBuffer
+    ok = True
+    order_log2 = 4
+    n          = 2**order_log2
+    for ratio, idle in [(0, 0), (1, 1), (2, 3), (2, 0)]:
+        dut   = OverlapBuffer(data_width=12, order_log2=order_log2, with_csr=False)
+        re_in = rng.integers(-2**11, 2**11, size=8 * n)
+        im_in = rng.integers(-2**11, 2**11, size=8 * n)
+        out, (dropped,) = simulate_stream(rng, dut, re_in, im_in, n, {
+            dut.source.ready : 1,
+            dut.ratio        : ratio,
+        }, fields=["re", "im"], status=[dut.dropped], idle=idle, drain=2 * n + 16)
+        re, im = overlap_model(order_log2, re_in, im_in, ratio)
+        ref    = [(r % 2**12, i % 2**12) for r, i in zip(re.ravel(), im.ravel())]
+        frames = [out[k:k + n] for k in range(0, len(out), n)]
+        ok    &= all(frame[-1][2] and not any(l for _, _, l in frame[:-1]) for frame in frames)
+        if (idle + 1) >= 2**ratio:
+            # Sustainable (output rate <= 1 sample/cycle): all the frames.
+            ok &= dropped == 0 and [(r, i) for r, i, _ in out] == ref
+        else:
+            # Unsustainable: complete frames of the model, the others counted as dropped.
+            model_frames = [ref[k:k + n] for k in range(0, len(ref), n)]
+            ok &= dropped > 0 and len(frames) + dropped == len(model_frames)
+            ok &= all([(r, i) for r, i, _ in frame] in model_frames for frame in frames)
+    return check("OverlapBuffer frames vs model", ok)
+
+# Spectrum -----------------------------------------------------------------------------------------
+
+def check_spectrum_averager(rng):
+    from gateware.spectrum import SpectrumAverager
+    ok = True
+    for log2 in [False, True]:
+        for dw, order_log2, navg, shift, ow, lw in [(8, 3, 3, 1, 16, 8), (12, 4, 1, 0, 24, 12), (8, 3, 4, 0, 16, 8)]:
+            dut   = SpectrumAverager(dw, order_log2, out_width=ow, navg_width=4, log_width=lw, with_csr=False)
+            re_in = rng.integers(-2**(dw - 1), 2**(dw - 1), size=7 * 2**order_log2)
+            im_in = rng.integers(-2**(dw - 1), 2**(dw - 1), size=7 * 2**order_log2)
+            out, _ = simulate_stream(rng, dut, re_in, im_in, 2**order_log2, {
+                dut.source.ready   : 1,
+                dut.navg_minus_one : navg - 1,
+                dut.shift          : shift,
+                dut.log2           : log2,
+            })
+            words = 2**order_log2 // (2 if log2 else 1)
+            ref   = spectrum_model(order_log2, re_in, im_in, navg, shift, log2, ow, lw)
+            ok &= np.array_equal(np.array([d for d, _ in out], dtype=np.uint64), ref)
+            ok &= [i for i, (_, l) in enumerate(out) if l] == list(range(words - 1, len(out), words))
+    return check("SpectrumAverager vs model", ok)
+
+def check_frame_decimator(rng):
+    from gateware.spectrum import FrameDecimator
+    ok = True
+    for ratio, frames, frame_len in [(1, 5, 4), (3, 10, 8), (4, 9, 1)]:
+        dut   = FrameDecimator([("re", 8), ("im", 8)], with_csr=False)
+        re_in = rng.integers(-128, 128, size=frames * frame_len)
+        im_in = rng.integers(-128, 128, size=frames * frame_len)
+        out, dropped = simulate_stream(rng, dut, re_in, im_in, frame_len, {
+            dut.source.ready    : 1,
+            dut.ratio_minus_one : ratio - 1,
+        }, fields=["re", "im"], status=[dut.dropped])
+        keep = (np.arange(frames * frame_len) // frame_len) % ratio == 0
+        ok &= [(r, i) for r, i, _ in out] == [(r % 256, i % 256) for r, i in zip(re_in[keep], im_in[keep])]
+        ok &= sum(l for _, _, l in out) == keep.sum() // frame_len
+        ok &= dropped == [frames - keep.sum() // frame_len]
+    return check("FrameDecimator frames", ok)
+
+def check_frame_fifo(rng):
+    # Variable length frames without backpressure, stalled output: complete frames in order only.
+    from migen.sim import run_simulation, passive
+    from gateware.spectrum import FrameFIFO
+    ok = True
+    depth = 16
+    for stalls in [False, True]:
+        dut     = FrameFIFO([("re", 8), ("im", 8)], depth=depth, with_csr=False)
+        frames  = [[(int(r), int(i)) for r, i in rng.integers(0, 256, size=(rng.integers(1, depth // 2 + 1), 2))]
+            for _ in range(64)]
+        out     = []
+        dropped = []
+        def generator():
+            for frame in frames:
+                for j, (r, i) in enumerate(frame):
+                    while rng.integers(0, 4) == 0:
+                        yield dut.sink.valid.eq(0)
+                        yield
+                    yield dut.sink.valid.eq(1)
+                    yield dut.sink.re.eq(r)
+                    yield dut.sink.im.eq(i)
+                    yield dut.sink.last.eq(j == len(frame) - 1)
+                    yield
+            yield dut.sink.valid.eq(0)
+            for _ in range(32 * depth):
+                yield
+            dropped.append((yield dut.dropped))
+        @passive
+        def monitor():
+            while True:
+                ready = not (stalls and (len(out) // 32) % 2 and rng.integers(0, 8))
+                yield dut.source.ready.eq(ready)
+                yield
+                if (yield dut.source.valid) and ready:
+                    out.append(((yield dut.source.re), (yield dut.source.im), (yield dut.source.last)))
+        run_simulation(dut, [generator(), monitor()])
+        emitted, frame = [], []
+        for r, i, last in out:
+            frame.append((r, i))
+            if last:
+                emitted.append(frame)
+                frame = []
+        indexes = [frames.index(f) for f in emitted if f in frames]
+        ok &= frame == [] and len(indexes) == len(emitted) and indexes == sorted(set(indexes))
+        ok &= len(emitted) + dropped[0] == len(frames)
+        ok &= (dropped[0] > 0) == stalls
+    return check("FrameFIFO whole frames", ok)
+
+def check_spectrum_hold(rng):
+    # dump held high: alternate max-hold/min-hold frames from the first frame.
+    from gateware.spectrum import SpectrumHold
+    ok = True
+    for dw, order_log2, shift, ow in [(8, 3, 0, 16), (8, 2, 2, 12), (12, 4, 4, 16)]:
+        dut    = SpectrumHold(dw, order_log2, out_width=ow, with_csr=False)
+        re_in  = rng.integers(-2**(dw - 1), 2**(dw - 1), size=6 * 2**order_log2)
+        im_in  = rng.integers(-2**(dw - 1), 2**(dw - 1), size=6 * 2**order_log2)
+        out, _ = simulate_stream(rng, dut, re_in, im_in, 2**order_log2, {
+            dut.source.ready : 1,
+            dut.dump         : 1,
+            dut.shift        : shift,
+        })
+        hmax, hmin = hold_model(order_log2, re_in, im_in)
+        ref = np.where((np.arange(6) % 2 == 0)[:, None], hmax, hmin) >> np.uint64(shift)
+        ref = np.minimum(ref, np.uint64(2**ow - 1)).ravel()
+        ok &= np.array_equal(np.array([d for d, _ in out], dtype=np.uint64), ref)
+        ok &= [i for i, (_, l) in enumerate(out) if l] == list(range(2**order_log2 - 1, len(out), 2**order_log2))
+    return check("SpectrumHold vs hold_model", ok)
+
+# Channels -----------------------------------------------------------------------------------------
+
+def check_channel_interleaver(rng):
+    # Channel 0 with frames (last every 4 samples), channel 1 without (packet_len), DMA stalls.
+    from migen.sim import run_simulation, passive
+    from gateware.channel_interleaver import ChannelInterleaver, CHANNEL_TAG_MAGIC
+    dut  = ChannelInterleaver(n=2, packet_len=8, fifo_depth=32) # Holds a whole channel (no overflow).
+    data = [rng.integers(0, 2**32, size=64).tolist() for _ in range(2)]
+    out  = []
+    def generator():
+        yield
+        for i in range(64):
+            for c in range(2):
+                yield dut.sinks[c].valid.eq(1)
+                yield dut.sinks[c].data.eq(data[c][i])
+                yield dut.sinks[c].last.eq((c == 0) and (i % 4 == 3))
+            yield
+            for c in range(2):
+                yield dut.sinks[c].valid.eq(0)
+            if rng.integers(0, 2):
+                yield
+        for _ in range(64):
+            yield
+    @passive
+    def monitor():
+        while True:
+            yield dut.source.ready.eq(int(rng.integers(0, 4) != 0))
+            yield
+            if (yield dut.source.valid) and (yield dut.source.ready):
+                out.append(((yield dut.source.data), (yield dut.source.last)))
+    run_simulation(dut, [generator(), monitor()])
+
+    # Parse tag + packet words.
+    ok      = True
+    samples = {0: [], 1: []}
+    packets = {0: [], 1: []}
+    words   = iter(out)
+    for tag, _ in words:
+        ok &= (tag >> 48) == CHANNEL_TAG_MAGIC
+        channel = (tag >> 32) & 0xffff
+        packets[channel].append(tag & 0xffffffff)
+        for word, last in words:
+            samples[channel] += [word & 0xffffffff, word >> 32]
+            if last:
+                break
+    ok &= samples[0] == data[0] and samples[1] == data[1]
+    ok &= packets[0] == list(range(16)) and packets[1] == list(range(8))
+    return check("ChannelInterleaver packets", ok)
+
+# Timestamps ---------------------------------------------------------------------------------------
+
+def check_frame_header_inserter(rng):
+    # Frames (last every 8 samples) with gaps, DMA stalls, time counting the clock cycles.
+    from migen.sim import run_simulation, passive
+    from gateware.timestamp import FrameHeaderInserter
+    dut    = FrameHeaderInserter([("data", 32)], packet_len=8, with_csr=False)
+    data   = rng.integers(0, 2**32, size=64).tolist()
+    starts = []
+    out    = []
+    def generator():
+        for i in range(64):
+            while rng.integers(0, 2):
+                yield
+            yield dut.sink.valid.eq(1)
+            yield dut.sink.data.eq(data[i])
+            yield dut.sink.last.eq(i % 8 == 7)
+            yield
+            while not (yield dut.sink.ready):
+                yield
+            if i % 8 == 0:
+                starts.append((yield dut.time))
+            yield dut.sink.valid.eq(0)
+        for _ in range(64):
+            yield
+    @passive
+    def timer():
+        while True:
+            yield dut.time.eq((yield dut.time) + 1)
+            yield
+    @passive
+    def monitor():
+        while True:
+            yield dut.source.ready.eq(int(rng.integers(0, 4) != 0))
+            yield
+            if (yield dut.source.valid) and (yield dut.source.ready):
+                out.append((yield dut.source.data))
+    run_simulation(dut, [generator(), timer(), monitor()])
+    ref = sum([frame_header(t, k) + data[8*k:8*k + 8] for k, t in enumerate(starts)], [])
+    ok  = out == ref
+    ok &= [(t, k, w) for t, k, w in parse_frames(out, 8)] == [(t, k, data[8*k:8*k + 8]) for k, t in enumerate(starts)]
+    return check("FrameHeaderInserter headers", ok)
+
+# Capture ------------------------------------------------------------------------------------------
+
+def check_snapshot_capture(rng):
+    # 2 captures (power trigger, then forced after a re-arm) in a 256 samples DRAM buffer (wrapped
+    # during the pre-trigger phase), DRAM with random backpressure/read latency, DMA stalls.
+    from migen.sim import run_simulation, passive
+    from gateware.capture import SnapshotCapture
+    dut     = SnapshotCapture(data_width=16, port_data_width=128, base=0x100, depth=0x400, with_csr=False)
+    n       = 1024
+    re_in   = rng.integers(-100, 100, size=n)
+    im_in   = rng.integers(-100, 100, size=n)
+    pre     = [int(rng.integers(0, 100)), int(rng.integers(0, 100))]
+    post    = [int(rng.integers(1, 100)), int(rng.integers(1, 100))]
+    burst   = int(rng.integers(400, 600))
+    re_in[burst] = 30000
+    samples = [(int(r) & 0xffff) | (int(i) & 0xffff) << 16 for r, i in zip(re_in, im_in)]
+    mem     = {}
+    out     = []
+    status  = []
+    def feed(first, count):
+        for i in range(first, first + count):
+            while rng.integers(0, 3) == 0:
+                yield dut.sink.valid.eq(0)
+                yield
+            yield dut.sink.valid.eq(1)
+            yield dut.sink.re.eq(int(re_in[i]) & 0xffff)
+            yield dut.sink.im.eq(int(im_in[i]) & 0xffff)
+            yield
+        yield dut.sink.valid.eq(0)
+    def wait_done():
+        while not (yield dut.done):
+            yield
+        status.append(((yield dut.offset), (yield dut.length), (yield dut.overflow)))
+    def generator():
+        # Power trigger (on burst).
+        yield dut.pre.eq(pre[0])
+        yield dut.post.eq(post[0])
+        yield dut.power_enable.eq(1)
+        yield dut.power_threshold.eq(30000**2)
+        yield dut.arm.eq(1)
+        yield
+        yield dut.arm.eq(0)
+        yield
+        yield from feed(0, burst + post[0] + 8)
+        yield from wait_done()
+        # Forced trigger (samples restart from 0 at the re-arm).
+        yield dut.pre.eq(pre[1])
+        yield dut.post.eq(post[1])
+        yield dut.power_enable.eq(0)
+        yield dut.arm.eq(1)
+        yield
+        yield dut.arm.eq(0)
+        yield
+        first = burst + post[0] + 8
+        yield from feed(first, pre[1] + 5)
+        yield dut.force.eq(1)
+        yield
+        yield dut.force.eq(0)
+        yield from feed(first + pre[1] + 5, post[1] + 8)
+        yield from wait_done()
+    @passive
+    def dram_write():
+        while True:
+            yield dut.dram_write.ready.eq(int(rng.integers(0, 4) != 0))
+            yield
+            if (yield dut.dram_write.valid) and (yield dut.dram_write.ready):
+                mem[(yield dut.dram_write.address)] = (yield dut.dram_write.data)
+    @passive
+    def dram_read():
+        queue = []
+        cycle = 0
+        while True:
+            yield dut.dram_read_cmd.ready.eq(int(rng.integers(0, 2)))
+            if queue and queue[0][0] <= cycle:
+                yield dut.dram_read_data.valid.eq(1)
+                yield dut.dram_read_data.data.eq(mem.get(queue[0][1], 0))
+            else:
+                yield dut.dram_read_data.valid.eq(0)
+            yield
+            cycle += 1
+            if (yield dut.dram_read_data.valid) and (yield dut.dram_read_data.ready):
+                queue.pop(0)
+            if (yield dut.dram_read_cmd.valid) and (yield dut.dram_read_cmd.ready):
+                queue.append((cycle + int(rng.integers(4, 16)), (yield dut.dram_read_cmd.address)))
+    @passive
+    def monitor():
+        while True:
+            yield dut.source.ready.eq(int(rng.integers(0, 4) != 0))
+            yield
+            if (yield dut.source.valid) and (yield dut.source.ready):
+                out.append(((yield dut.source.data), (yield dut.source.last)))
+    run_simulation(dut, [generator(), dram_write(), dram_read(), monitor()])
+
+    # Snapshots (split on last).
+    snapshots = [[]]
+    for data, last in out:
+        snapshots[-1].append(data)
+        if last:
+            snapshots.append([])
+    first = burst + post[0] + 8
+    refs  = [
+        capture_model(samples, burst, pre[0], post[0]),
+        capture_model(samples[first:], pre[1] + 5, pre[1], post[1]),
+    ]
+    ok = snapshots[-1] == [] and len(snapshots) == 3
+    for (ref, offset), snapshot, (hw_offset, length, overflow) in zip(refs, snapshots, status):
+        ok &= snapshot == ref and hw_offset == offset and length == len(ref) and not overflow
+    ok &= min(mem) >= 0x10 and max(mem) < 0x10 + 64
+    return check("SnapshotCapture snapshots", ok)
+
+def check_bin_trigger(rng):
+    # Random frames (gaps), trigger indexes vs |X|^2 of the natural order bins in range.
+    from migen.sim import run_simulation
+    from gateware.capture import BinTrigger
+    ok = True
+    for radix in [2, 4]:
+        order_log2 = 4
+        dut   = BinTrigger(data_width=16, order_log2=order_log2, radix=radix, with_csr=False)
+        n     = 2**order_log2
+        re_in = rng.integers(-2**15, 2**15, size=8*n)
+        im_in = rng.integers(-2**15, 2**15, size=8*n)
+        power = re_in.astype(np.int64)**2 + im_in.astype(np.int64)**2
+        bins  = digit_reversed_order(order_log2, radix)[np.arange(8*n) % n]
+        th    = int(np.median(power))
+        ref   = [i for i in range(8*n) if (3 <= bins[i] <= 11) and power[i] >= th]
+        hits  = []
+        def generator():
+            yield dut.bin_min.eq(3)
+            yield dut.bin_max.eq(11)
+            yield dut.threshold.eq(th)
+            yield
+            for i in range(8*n):
+                while rng.integers(0, 3) == 0:
+                    yield dut.sink.valid.eq(0)
+                    yield
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.re.eq(int(re_in[i]) & 0xffff)
+                yield dut.sink.im.eq(int(im_in[i]) & 0xffff)
+                yield dut.sink.last.eq(i % n == n - 1)
+                yield
+                yield dut.sink.valid.eq(0)
+                yield
+                if (yield dut.trigger): # Registered.
+                    hits.append(i)
+        run_simulation(dut, generator())
+        ok &= hits == ref
+    return check("BinTrigger bins", ok)
+
+# PFB Channelizer ----------------------------------------------------------------------------------
+
+def check_pfb_model():
+    # Prototype + FFT: a tone centered on channel c must come out of FFT bin c (both samplings), the
+    # adjacent channels attenuated.
+    ok = True
+    order_log2, taps = 5, 4
+    n      = 2**order_log2
+    coeffs = pfb_prototype(order_log2, taps)
+    t      = np.arange(64 * n)
+    for oversampling in [False, True]:
+        for c in [0, 3, n - 5]:
+            x      = np.exp(2j * np.pi * c / n * t) * 2**13
+            re, im = pfb_model(np.round(x.real), np.round(x.imag), coeffs, order_log2, taps, oversampling)
+            power  = np.abs(np.fft.fft(re + 1j * im, axis=1))**2
+            ok    &= all(np.argmax(frame) == c for frame in power)
+            ok    &= np.all(power[:, (c + 1) % n] < power[:, c] / 10)
+    return check("PFB model channels", ok)
+
+def check_pfb(rng):
+    # Random coefficients (rounding/saturation) and samples, input gaps and backpressure.
+    from migen.sim import run_simulation, passive
+    from gateware.pfb import PolyphaseFilterBank
+    ok = True
+    order_log2, taps = 3, 3
+    n = 2**order_log2
+    for oversampling, gaps in [(False, True), (False, False), (True, True), (True, False)]:
+        dut    = PolyphaseFilterBank(data_width=16, coeff_width=18, order_log2=order_log2, taps=taps, with_csr=False)
+        coeffs = rng.integers(-2**17, 2**17, size=taps * n)
+        re_in  = rng.integers(-2**15, 2**15, size=12 * n)
+        im_in  = rng.integers(-2**15, 2**15, size=12 * n)
+        out    = []
+        def generator():
+            yield dut.coeff_wren.eq(1)
+            for addr, coeff in enumerate(coeffs):
+                yield dut.coeff_waddr.eq(addr)
+                yield dut.coeff_wdata.eq(int(coeff))
+                yield
+            yield dut.coeff_wren.eq(0)
+            yield dut.oversampling.eq(oversampling)
+            yield
+            i = 0
+            while i < len(re_in):
+                if gaps and rng.integers(0, 3) == 0:
+                    yield dut.sink.valid.eq(0)
+                    yield
+                    continue
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.re.eq(int(re_in[i]))
+                yield dut.sink.im.eq(int(im_in[i]))
+                yield
+                i += (yield dut.sink.ready)
+            yield dut.sink.valid.eq(0)
+            for _ in range(2 * n + 16):
+                yield
+        @passive
+        def monitor():
+            while True:
+                if (yield dut.source.valid): # No backpressure.
+                    out.append(((yield dut.source.re), (yield dut.source.im), (yield dut.source.last)))
+                yield
+        run_simulation(dut, [generator(), monitor()])
+        re, im = pfb_model(re_in, im_in, coeffs, order_log2, taps, oversampling)
+        ref    = [(r % 2**16, i % 2**16, int(k == n - 1))
+            for fr, fi in zip(re, im) for k, (r, i) in enumerate(zip(fr, fi))]
+        ok    &= out == ref
+    return check("PolyphaseFilterBank frames vs model", ok)
+
+def check_channel_selector(rng):
+    # Random channels table (odd counts rounded up), output stalls (dropped frames): header then
+    # selected natural order bins per frame, no drops at full rate (idle cycles for the header).
+    from migen.sim import run_simulation, passive
+    from gateware.pfb import ChannelSelector, channels_header, channels_header_words, decode
+    ok = True
+    order_log2 = 4
+    n          = 2**order_log2
+    for radix, stalls, count in [(2, False, n), (4, True, 2 * int(rng.integers(1, n // 2)) - 1),
+        (2, True, 2 * int(rng.integers(1, n // 2)))]:
+        dut      = ChannelSelector(data_width=16, order_log2=order_log2, radix=radix, with_csr=False)
+        channels = rng.permutation(n)[:count].tolist()
+        selected = channels + [len(channels)] * (len(channels) % 2) # Next (default) table entry.
+        re_in    = rng.integers(0, 2**16, size=16 * n)
+        im_in    = rng.integers(0, 2**16, size=16 * n)
+        bins     = digit_reversed_order(order_log2, radix)
+        header   = [(w & 0xffff, w >> 16, 0, 0) for w in channels_header(selected, order_log2)]
+        idle     = channels_header_words(len(selected))
+        frames   = []
+        for k in range(0, len(re_in), n):
+            natural = {int(bins[i]): (int(re_in[k + i]), int(im_in[k + i])) for i in range(n)}
+            frames.append(header + [natural[c] + (c, int(j == len(selected) - 1)) for j, c in enumerate(selected)])
+        out      = []
+        dropped  = []
+        def generator():
+            yield dut.table_wren.eq(1)
+            for addr, channel in enumerate(channels):
+                yield dut.table_waddr.eq(addr)
+                yield dut.table_wdata.eq(channel)
+                yield
+            yield dut.table_wren.eq(0)
+            yield dut.nchannels_minus_one.eq(len(channels) - 1)
+            yield
+            for i in range(len(re_in)): # FFT-like: no backpressure, idle cycles between frames.
+                yield dut.sink.valid.eq(1)
+                yield dut.sink.re.eq(int(re_in[i]))
+                yield dut.sink.im.eq(int(im_in[i]))
+                yield dut.sink.last.eq(i % n == n - 1)
+                yield
+                if i % n == n - 1:
+                    yield dut.sink.valid.eq(0)
+                    for _ in range(idle):
+                        yield
+            yield dut.sink.valid.eq(0)
+            for _ in range(8 * n):
+                yield
+            dropped.append((yield dut.dropped))
+        @passive
+        def monitor():
+            while True:
+                ready = not (stalls and rng.integers(0, 2))
+                yield dut.source.ready.eq(ready)
+                yield
+                if (yield dut.source.valid) and ready:
+                    out.append(((yield dut.source.re), (yield dut.source.im),
+                        (yield dut.source.channel), (yield dut.source.last)))
+        run_simulation(dut, [generator(), monitor()])
+        length  = len(frames[0])
+        emitted = [out[k:k + length] for k in range(0, len(out), length)]
+        ok &= len(out) % 2 == 0
+        ok &= len(emitted) + dropped[0] == len(frames)
+        ok &= stalls or dropped[0] == 0
+        ok &= all(frame in frames for frame in emitted)
+        ok &= [frames.index(frame) for frame in emitted] == sorted(frames.index(frame) for frame in emitted)
+        # Host decoding (32-bit words): channel ids and samples.
+        decoded = decode([re | im << 16 for re, im, _, _ in out], order_log2)
+        ok &= len(decoded) == len(emitted)
+        ok &= all(ids == selected for ids, _ in decoded)
+    return check("ChannelSelector channels vs frames", ok)
+
+# Planner ------------------------------------------------------------------------------------------
+
+def check_verilog_cache_key():
+    # The key covers the module of the generator: editing a helper it calls changes the key.
+    import importlib
+    import tempfile
+    from gateware.verilog_cache import cache_key
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        def key(helper):
+            with open(os.path.join(tmp, "cache_key_generator.py"), "w") as f:
+                f.write(f"def helper():\n    return {helper}\n\n"
+                    "def generator(output_path, width=8):\n    return helper()\n")
+            sys.modules.pop("cache_key_generator", None)
+            importlib.invalidate_caches()
+            return cache_key(importlib.import_module("cache_key_generator").generator, dict(width=8))
+        sys.path.insert(0, tmp)
+        try:
+            ok &= key(1) == key(1)
+            ok &= key(1) != key(12)
+        finally:
+            sys.path.remove(tmp)
+            sys.modules.pop("cache_key_generator", None)
+    return check("Verilog cache key vs generator module", ok)
+
+def check_planner_fft_resources():
+    # Count the resources from the storage selected by the maia_hdl FFT stages themselves.
+    from maia_hdl.fft import FFT, Twiddle
+    ok = True
+    for radix, radix_log2 in [(2, 1), (4, 2), ("R22", 2)]:
+        for order_log2 in range(2 * radix_log2, 15, radix_log2):
+            for window, cmult3x in [(None, False), ("blackmanharris", True)]:
+                fft = FFT(16, order_log2, radix,
+                    width_twiddle = 16,
+                    window        = window,
+                    cmult3x       = cmult3x,
+                    domain_2x     = "clk2x" if window is not None else None,
+                    domain_3x     = "clk3x" if cmult3x else None)
+                dsp48, bram18 = 0, 0
+                if window is not None:
+                    dsp48  += dsp48_count(16, 10)
+                    bram18 += bram18_count(2**(order_log2 - 1), 9)
+                for bfly in fft._butterflies:
+                    for b in [bfly.bfly0, bfly.bfly1] if radix == "R22" else [bfly]:
+                        if b.storage == "bram":
+                            bram18 += bram18_count(b.buff_len, 2 * getattr(b, "num_buffs", 1) * max(b.w, b.w_out))
+                for tw in fft._twiddles:
+                    if isinstance(tw, Twiddle):
+                        dsp48 += {False: 3, True: 1}[cmult3x] * dsp48_count(tw.sw + 1, tw.tw)
+                        if tw.storage == "bram":
+                            bram18 += bram18_count(len(tw.twiddles_elaborate()[0]), 2 * tw.tw)
+                ok &= fft_resources(16, order_log2, radix, window is not None, cmult3x) == dict(dsp48=dsp48, bram18=bram18)
+    return check("Planner FFT resources vs FFT storage", ok)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Python models against maia_hdl references.")
+    parser.add_argument("--iterations", default=100,  type=int, help="Random configurations to check.")
+    parser.add_argument("--seed",       default=0,    type=int, help="Random seed.")
+    parser.add_argument("--bench",      action="store_true",    help="Also report model throughput.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    ok  = check_fir_model(rng, args.iterations)
+    ok &= check_fir_model_stream(rng, args.iterations)
+    ok &= check_fir_model_fft(rng, args.iterations)
+    ok &= check_fir_coeff_banks(rng)
+    ok &= check_fir_coeff_cdc(rng)
+    ok &= check_fir_coeff_cdc_swap(rng)
+    ok &= check_fir3_model(rng, args.iterations)
+    ok &= check_ddc_model(rng)
+    ok &= check_cic_model(rng)
+    ok &= check_fft_model(rng, args.iterations)
+    ok &= check_fft_order(rng)
+    ok &= check_fft_reorder(rng)
+    ok &= check_bfp(rng)
+    ok &= check_overlap_buffer(rng)
+    ok &= check_spectrum_averager(rng)
+    ok &= check_frame_decimator(rng)
+    ok &= check_frame_fifo(rng)
+    ok &= check_spectrum_hold(rng)
+    ok &= check_channel_interleaver(rng)
+    ok &= check_frame_header_inserter(rng)
+    ok &= check_snapshot_capture(rng)
+    ok &= check_bin_trigger(rng)
+    ok &= check_pfb_model()
+    ok &= check_pfb(rng)
+    ok &= check_channel_selector(rng)
+    ok &= check_planner_fft_resources()
+    ok &= check_verilog_cache_key()
+    if args.bench:
+        for taps, decimation in [(32, 1), (256, 1), (256, 8), (1024, 1), (1024, 16)]:
+            for method in ["direct", "fft"]:
+                bench_fir_model(rng, 2**20, taps, decimation, method)
+        for radix in [2, 4, "R22"]:
+            for window in [None, "blackmanharris"]:
+                bench_fft_model(rng, 2**20, 12, radix, window)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ from scipy import signal
 
 sys.path.append("../..")
 from gateware.maia_sdr_fir import compute_coefficients
+from gateware.cic          import response as cic_response
+from gateware.pfb          import prototype as pfb_prototype
 
 def design_antialias_lowpass(decimation, transition_bandwidth, numtaps,
     stopband_weight = 1.0,
@@ -37,6 +39,32 @@ def design_antialias_lowpass(decimation, transition_bandwidth, numtaps,
         [1, 0], weight=[1, sweight], bigfloat=bigfloat)
     return design.impulse_response
 
+def design_cic_compensated_lowpass(decimation, transition_bandwidth, numtaps,
+    cic_decimation = 1,
+    cic_stages     = 4,
+    cic_diff_delay = 1,
+    segments       = 16):
+
+    passband_end   = 0.5 * (1 - transition_bandwidth) / decimation
+    stopband_start = 0.5 * (1 + transition_bandwidth) / decimation
+
+    # Passband follows the inverse of the CIC droop (piecewise linear over `segments` bands),
+    # frequencies are relative to the FIR input rate (CIC output rate).
+    edges   = np.linspace(0, passband_end, segments + 1)
+    inverse = 1 / cic_response(edges, cic_decimation, cic_stages, cic_diff_delay)
+    bands   = []
+    desired = []
+    for i in range(segments):
+        bands   += [edges[i], edges[i + 1]]
+        desired += [inverse[i], inverse[i + 1]]
+    bands   += [stopband_start, 0.5]
+    desired += [0, 0]
+
+    # Type I (odd length) least-squares design.
+    if numtaps % 2 == 0:
+        numtaps += 1
+    return signal.firls(numtaps, bands, desired, fs=1.0)
+
 def main():
     parser = argparse.ArgumentParser(description="FIR Generator.")
     parser.add_argument("--file",       default=None,            help="output coefficients file.")
@@ -56,6 +84,15 @@ def main():
     parser.add_argument("--decimation",     default=2,   type=int, help="Decimation factor.")
     parser.add_argument("--num-coeffs",     default=256, type=int, help="Maximum Number of coefficents.")
 
+    # CIC compensation (SDRProcessing CIC Decimator before the FIR).
+    parser.add_argument("--cic-stages",     default=0,   type=int, help="Compensate the droop of a CIC with this number of stages (0: disabled).")
+    parser.add_argument("--cic-decimation", default=1,   type=int, help="CIC decimation factor.")
+    parser.add_argument("--cic-diff-delay", default=1,   type=int, help="CIC differential delay.")
+
+    # PFB channelizer prototype filter (SDRProcessing PFB mode).
+    parser.add_argument("--pfb-taps",       default=0,   type=int, help="PFB taps per branch (0: disabled, FIR coefficients).")
+    parser.add_argument("--pfb-order-log2", default=10,  type=int, help="Log2 of the PFB channels (FFT order).")
+
     # Utils.
     parser.add_argument("display-coefficients", action="store_true", help="display coefficients table.")
 
@@ -63,12 +100,30 @@ def main():
 
     assert args.file is not None
 
+    # PFB prototype filter: pfb_taps x 2**pfb_order_log2 coefficients, coefficient i at address i.
+    if args.pfb_taps > 0:
+        with open(args.file, "wb") as fd:
+            for value in pfb_prototype(args.pfb_order_log2, args.pfb_taps, args.coeff_size):
+                fd.write(struct.pack('<i', int(value)))
+        return
+
     h        = []
     num_taps = args.length
     fs       = args.fs
     fc       = args.fc
     if not args.bypass_gen:
-        if args.model == "simple":
+        if args.cic_stages > 0:
+            # Normalize frequency to 0-1 range (Nyquist = 1), least-squares design (any model).
+            f_nyquist = fs / 2
+            f_norm    = fc / f_nyquist
+            h         = design_cic_compensated_lowpass(args.decimation, f_norm, args.length,
+                cic_decimation = args.cic_decimation,
+                cic_stages     = args.cic_stages,
+                cic_diff_delay = args.cic_diff_delay,
+            )
+            # Normalize to 1.
+            h         = h / np.max(np.abs(h))
+        elif args.model == "simple":
             # Normalized cutoff frequency
             fc_normalized = args.fc / args.fs
 
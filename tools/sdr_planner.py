@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gateware.sdr_planner import TARGETS, plan_sdr_processing, sweep_sdr_processing
+
+# Utils --------------------------------------------------------------------------------------------
+
+def values(arg, type=int):
+    """Parse "a,b,c" or "start:stop[:step]" (stop included) in a list."""
+    if ":" in arg:
+        r = [int(v) for v in arg.split(":")]
+        return list(range(r[0], r[1] + 1, r[2] if len(r) > 2 else 1))
+    return [type(v) for v in arg.split(",")]
+
+def radix(v):
+    return v if v == "R22" else int(v)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="SDRProcessing throughput/resource planner (lists/ranges sweep).")
+    parser.add_argument("--target",          default="litex_m2sdr", choices=TARGETS.keys(), help="Target.")
+    parser.add_argument("--sys-clk-freq",    default=None, type=float, help="System clock frequency (default: target's).")
+    parser.add_argument("--sample-rate",     default=None, type=float, help="Input sample rate (default: target's).")
+    parser.add_argument("--pcie-lanes",      default=None, type=int,   help="PCIe lanes (default: target's).")
+    parser.add_argument("--channels",        default="1",              help="Processed channels (list).")
+    parser.add_argument("--with-ddc",        action="store_true",      help="Enable DDC (NCO + mixer).")
+    parser.add_argument("--cic-decimation",  default=None,             help="CIC decimation (list/range, default: no CIC).")
+    parser.add_argument("--cic-stages",      default="4",              help="CIC stages (list).")
+    parser.add_argument("--without-fir",     action="store_true",      help="Disable FIR.")
+    parser.add_argument("--fir-taps",        default="32",             help="FIR taps (list/range).")
+    parser.add_argument("--fir-decimation",  default="1",              help="FIR decimation (list/range).")
+    parser.add_argument("--fir-clk-freq",    default=None, type=float, help="FIR clock frequency (default: sys_clk_freq).")
+    parser.add_argument("--without-fft",     action="store_true",      help="Disable FFT.")
+    parser.add_argument("--fft-data-width",  default="16",             help="FFT data width (list/range).")
+    parser.add_argument("--fft-order-log2",  default="10",             help="Log2 of the FFT order (list/range).")
+    parser.add_argument("--fft-radix",       default="2",              help="FFT radix 2/4/R22 (list).")
+    parser.add_argument("--fft-window",      default="1",              help="FFT window 0/1 (list).")
+    parser.add_argument("--fft-cmult3x",     default="0",              help="FFT cmult3x 0/1 (list).")
+    parser.add_argument("--fft-overlap",     default="0",              help="FFT frames overlap 0/1/2 (none/50%%/75%%, list).")
+    parser.add_argument("--fft-clk-freq",    default=None, type=float, help="FFT clock frequency (default: sys_clk_freq).")
+    parser.add_argument("--fft-frame-decimation", default="1",         help="FFT frames decimation (1 out of K forwarded, list/range).")
+    parser.add_argument("--with-fft-buffer", action="store_true",      help="Enable FFT output frames buffer (whole frames dropped).")
+    parser.add_argument("--with-fft-reorder", action="store_true",     help="Enable FFT natural order reorder buffer.")
+    parser.add_argument("--fft-bfp-width",   default="0",              help="FFT block floating point mantissas width 0/8/16 (list, default: none).")
+    parser.add_argument("--pfb-taps",        default="0",              help="PFB channelizer taps per branch (list/range, default: no PFB).")
+    parser.add_argument("--pfb-oversampling", default="0",             help="PFB 2x oversampling 0/1 (list).")
+    parser.add_argument("--pfb-channels",    default=None, type=int,   help="PFB channels forwarded (default: all).")
+    parser.add_argument("--with-timestamps", action="store_true",      help="Enable frame headers (timestamps).")
+    parser.add_argument("--only-ok",         action="store_true",      help="Only show sustainable configurations (sweep).")
+    args = parser.parse_args()
+
+    params = dict(
+        sys_clk_freq   = args.sys_clk_freq,
+        sample_rate    = args.sample_rate,
+        pcie_lanes     = args.pcie_lanes,
+        channels       = values(args.channels),
+        with_ddc       = args.with_ddc,
+        with_cic       = args.cic_decimation is not None,
+        cic_stages     = values(args.cic_stages),
+        cic_decimation = values(args.cic_decimation or "1"),
+        with_fir       = not args.without_fir,
+        fir_taps       = values(args.fir_taps),
+        fir_decimation = values(args.fir_decimation),
+        fir_clk_freq   = args.fir_clk_freq,
+        with_fft       = not args.without_fft,
+        fft_data_width = values(args.fft_data_width),
+        fft_order_log2 = values(args.fft_order_log2),
+        fft_radix      = values(args.fft_radix, type=radix),
+        fft_window     = [bool(v) for v in values(args.fft_window)],
+        fft_cmult3x    = [bool(v) for v in values(args.fft_cmult3x)],
+        fft_overlap    = values(args.fft_overlap),
+        fft_clk_freq   = args.fft_clk_freq,
+        fft_frame_decimation = values(args.fft_frame_decimation),
+        with_fft_buffer      = args.with_fft_buffer,
+        with_fft_reorder     = args.with_fft_reorder,
+        fft_bfp_width        = values(args.fft_bfp_width),
+        pfb_taps             = values(args.pfb_taps),
+        pfb_oversampling     = [bool(v) for v in values(args.pfb_oversampling)],
+        pfb_channels         = args.pfb_channels,
+        with_timestamps      = args.with_timestamps,
+    )
+
+    # Single configuration: detailed report.
+    if all(len(v) == 1 for v in params.values() if isinstance(v, list)):
+        plan = plan_sdr_processing(args.target, **{k: v[0] if isinstance(v, list) else v for k, v in params.items()})
+        print(plan)
+        sys.exit(0 if plan.ok else 1)
+
+    # Sweep: one line per configuration.
+    t     = time.perf_counter()
+    plans = 0
+    oks   = 0
+    for plan in sweep_sdr_processing(args.target, **params):
+        plans += 1
+        oks   += plan.ok
+        if plan.ok or not args.only_ok:
+            print(plan.summary())
+    print(f"{oks}/{plans} sustainable configurations ({time.perf_counter() - t:.2f}s).")
+
+if __name__ == "__main__":
+    main()
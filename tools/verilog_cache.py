@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+#
+# This file is part of LiteCompute PoC project.
+#
+# Copyright (c) 2025 Enjoy-Digital <enjoy-digital.fr>.
+#
+# SPDX-License-Identifier: BSD-2-Clause
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gateware.verilog_cache import cache_dir, cache_entries, cache_invalidate
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect/invalidate the generated Verilog cache.")
+    parser.add_argument("--list",       action="store_true", help="List cache entries.")
+    parser.add_argument("--invalidate", nargs="?", const="", help="Remove entries (all, or those whose key starts with the given prefix).")
+    args = parser.parse_args()
+
+    print(f"Cache directory: {cache_dir()}")
+
+    if args.list or args.invalidate is None:
+        for e in cache_entries():
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e["created"]))
+            params  = ", ".join(f"{k}={v}" for k, v in e["params"].items())
+            print(f"{e['key'][:12]} {created} {e['file']} ({e['generator']}, delay {e['delay']})")
+            print(f"    {params}")
+            print(f"    " + ", ".join(f"{k} {v}" for k, v in e["versions"].items()))
+
+    if args.invalidate is not None:
+        removed = cache_invalidate(args.invalidate or None)
+        print(f"Removed {removed} entries.")
+
+if __name__ == "__main__":
+    main()